@@ -0,0 +1 @@
+"""Performance benchmarks of the scraper, run them from the root of the repository"""
@@ -0,0 +1,64 @@
+"""Benchmarks the detection of the MTG formats of a corpus, article by article vs batch
+
+Usage:
+    python -m benchmarks.bench_format_corpus --nb-articles 5000 --workers 4
+"""
+
+import os
+import time
+import argparse
+from typing import Callable, List
+
+from mtgscrapper.items import MtgArticle
+from mtgscrapper.mtg_format_handler import FormatHandler
+from mtgscrapper.serialization import loads_article
+
+
+def load_articles(nb_articles: int) -> List[MtgArticle]:
+    """Creates a corpus of copies of the test article, without tags so that the text is searched"""
+    with open(os.path.join('data', 'test_article.json'), 'r', encoding='utf-8') as json_file:
+        json_string = json_file.read()
+
+    articles = []
+    for _ in range(nb_articles):
+        article = loads_article(json_string)
+        article.tags = []
+        articles.append(article)
+    return articles
+
+
+def articles_per_second(process: Callable[[List[MtgArticle]], None], nb_articles: int) -> float:
+    """Processes a fresh corpus, the loading time is not measured"""
+    articles = load_articles(nb_articles)
+    start = time.perf_counter()
+    process(articles)
+    return nb_articles / (time.perf_counter() - start)
+
+
+def main() -> None:
+    """Prints the articles per second of process_article and process_corpus"""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n', maxsplit=1)[0])
+    parser.add_argument('--nb-articles', type=int, default=5000, help='size of the corpus.')
+    parser.add_argument('--workers', type=int, default=1, help='processes of process_corpus.')
+    args = parser.parse_args()
+
+    for search_in_text in (False, True):
+        handler = FormatHandler(search_in_text=search_in_text)
+
+        def per_article(articles: List[MtgArticle], handler: FormatHandler = handler) -> None:
+            for article in articles:
+                handler.process_article(article)
+
+        def batch(articles: List[MtgArticle], handler: FormatHandler = handler) -> None:
+            handler.process_corpus(articles, workers=args.workers)
+
+        before = articles_per_second(per_article, args.nb_articles)
+        after = articles_per_second(batch, args.nb_articles)
+        print(
+            f'search_in_text={search_in_text}: process_article {before:.0f} articles/s, '
+            f'process_corpus {after:.0f} articles/s (x{after / before:.2f})'
+        )
+
+
+if __name__ == '__main__':
+    main()
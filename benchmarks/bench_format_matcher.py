@@ -0,0 +1,74 @@
+"""Benchmarks the detection of the MTG formats in blocks, one scan per format vs single regex
+
+Usage:
+    python -m benchmarks.bench_format_matcher --nb-blocks 100000
+"""
+
+import os
+import json
+import time
+import random
+import argparse
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from mtgscrapper.mtg_format_enum import MtgFormatEnum
+from mtgscrapper.mtg_format_handler import FORMAT_MATCHER
+
+
+def load_blocks(nb_blocks: int) -> List[str]:
+    """Creates a corpus of block texts from the test article, with format names sprinkled in"""
+    texts: List[str] = []
+
+    def collect(content: Dict) -> None:
+        if content['item_type'] == 'block':
+            texts.append(content['text'])
+        for child in content.get('content', []):
+            collect(child)
+
+    with open(os.path.join('data', 'test_article.json'), 'r', encoding='utf-8') as json_file:
+        collect(json.load(json_file))
+
+    rng = random.Random(0)  # nosec B311 # reproducible benchmark texts
+    formats = [format_.value.capitalize() for format_ in MtgFormatEnum]
+    return [
+        f'{rng.choice(texts)} Best {rng.choice(formats)} decks of the {rng.choice(formats)} meta.'
+        for _ in range(nb_blocks)
+    ]
+
+
+def most_common_per_format(text: str) -> MtgFormatEnum | None:
+    """Previous implementation of FormatHandler.process_block, one str.count per format"""
+    format_list = list(MtgFormatEnum)
+    format_occurences = np.array([text.lower().count(format_) for format_ in format_list])
+    if format_occurences.sum() == 0:
+        return None
+    return MtgFormatEnum(format_list[int(format_occurences.argmax())])
+
+
+def blocks_per_second(detect: Callable, blocks: List[str]) -> float:
+    """Detects the format of every block"""
+    start = time.perf_counter()
+    for text in blocks:
+        detect(text)
+    return len(blocks) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    """Prints the blocks per second of both format detectors"""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n', maxsplit=1)[0])
+    parser.add_argument('--nb-blocks', type=int, default=100000, help='size of the corpus.')
+    args = parser.parse_args()
+
+    blocks = load_blocks(args.nb_blocks)
+    before = blocks_per_second(most_common_per_format, blocks)
+    after = blocks_per_second(FORMAT_MATCHER.most_common, blocks)
+    print(
+        f'{args.nb_blocks} blocks: one scan per format {before:.0f} blocks/s, '
+        f'single regex {after:.0f} blocks/s (x{after / before:.2f})'
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""Benchmarks the memory used to load a corpus, MtgArticle vs CompactArticle
+
+Usage:
+    python -m benchmarks.bench_memory_items --nb-articles 2000
+"""
+
+import os
+import gc
+import json
+import argparse
+import tracemalloc
+from typing import Callable, Dict, List
+
+from mtgscrapper.compact_items import CompactArticle
+from mtgscrapper.items import MtgArticle
+
+
+def without_ids(element: Dict) -> Dict:
+    """Removes the ids of the nested items, like a corpus crawled without ids would be loaded"""
+    element = {key: value for key, value in element.items() if key != 'id_'}
+    if 'content' in element:
+        element['content'] = [without_ids(content) for content in element['content']]
+    return element
+
+
+def load_corpus(nb_articles: int) -> List[str]:
+    """Creates a JSONL corpus from the test article, without the ids of the nested items"""
+    with open(os.path.join('data', 'test_article.json'), 'r', encoding='utf-8') as json_file:
+        article_dict = without_ids(json.load(json_file))
+
+    corpus = []
+    for i in range(nb_articles):
+        article_dict['id_'] = f'post-{i}'
+        corpus.append(json.dumps(article_dict))
+    return corpus
+
+
+def measure(load: Callable, corpus: List[str]) -> float:
+    """Returns the number of MB held by the articles loaded from the corpus"""
+    gc.collect()
+    tracemalloc.start()
+    articles = [load(json.loads(line)) for line in corpus]
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del articles
+    return current / 1024**2
+
+
+def main() -> None:
+    """Prints the memory used to load the same corpus with both representations"""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n', maxsplit=1)[0])
+    parser.add_argument('--nb-articles', type=int, default=2000, help='size of the corpus.')
+    args = parser.parse_args()
+
+    for name, load in (
+        ('MtgArticle', MtgArticle.from_dict),
+        ('CompactArticle', CompactArticle.from_dict),
+    ):
+        corpus = load_corpus(args.nb_articles)
+        print(f'{name}: {measure(load, corpus):.1f} MB for {args.nb_articles} articles')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""Benchmarks the parsing of the content of an article, XPath selectors vs single pass lxml
+
+Usage:
+    python -m benchmarks.bench_parse_article --repeat 50
+"""
+
+import os
+import re
+import json
+import time
+import argparse
+from typing import Callable, Dict
+
+from scrapy.http import HtmlResponse
+
+from mtgscrapper.items import MtgArticle
+from mtgscrapper.spiders.mtgazone import MTGArenaZoneSpider
+
+ENTRY_CONTENT = re.compile(r'(<div class="entry-content">)(.*?)(</div>\s*</article>)', re.DOTALL)
+
+
+def load_article_page(nb_copies: int = 1) -> bytes:
+    """Loads the test article page, its content is repeated to mimic long tier-list articles"""
+    with open(os.path.join('data', 'test_article.html'), 'r', encoding='utf-8') as html_file:
+        html = html_file.read()
+    return ENTRY_CONTENT.sub(
+        lambda match: match.group(1) + match.group(2) * nb_copies + match.group(3), html
+    ).encode('utf-8')
+
+
+def load_article_metadata() -> Dict:
+    """Loads the listing metadata of the test article"""
+    with open(os.path.join('data', 'test_article.json'), 'r', encoding='utf-8') as json_file:
+        article_dict = json.load(json_file)
+    return {key: article_dict[key] for key in ('id_', 'title', 'date', 'url', 'tags', 'author')}
+
+
+def articles_per_second(parse: Callable, body: bytes, metadata: Dict, duration: float) -> float:
+    """Parses the same page from scratch for at least duration seconds"""
+    nb_articles = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        response = HtmlResponse(url=metadata['url'], body=body, encoding='utf-8')
+        parse(response, MtgArticle(**metadata))
+        nb_articles += 1
+    return nb_articles / (time.perf_counter() - start)
+
+
+def main() -> None:
+    """Prints the articles per second of both parsers on the test article and a long article"""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n', maxsplit=1)[0])
+    parser.add_argument('--repeat', type=int, default=50, help='copies of the long article.')
+    parser.add_argument('--duration', type=float, default=3.0, help='seconds per measure.')
+    args = parser.parse_args()
+
+    metadata = load_article_metadata()
+    xpath_spider = MTGArenaZoneSpider(fast_parse=False)
+    fast_spider = MTGArenaZoneSpider(fast_parse=True)
+
+    for name, nb_copies in (('test article', 1), (f'test article x{args.repeat}', args.repeat)):
+        body = load_article_page(nb_copies)
+        before = articles_per_second(
+            xpath_spider.parse_article_content, body, metadata, args.duration
+        )
+        after = articles_per_second(
+            fast_spider.parse_article_content, body, metadata, args.duration
+        )
+        print(
+            f'{name}: xpath {before:.1f} articles/s, single pass {after:.1f} articles/s '
+            f'(x{after / before:.2f})'
+        )
+
+
+if __name__ == '__main__':
+    main()
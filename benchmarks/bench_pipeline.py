@@ -0,0 +1,176 @@
+"""Offline benchmark suite of the crawl, the article parser, the format detection and the export
+
+The crawl benchmark serves copies of the recorded listing and article pages of the data folder
+from a local StandInServer, and runs the MTGArenaZoneSpider on it in a separate process, with the
+project settings and the JSONL export, like the crawl tests (see mtgscrapper.tests.helpers). The
+parser, format and serialization benchmarks run in this process.
+
+The results are written as JSON. Given the results of a previous run as baseline, the metrics that
+got worse by more than the tolerance are listed and the exit status is 1, so that a regression is
+caught before deploying.
+
+Usage:
+    python -m benchmarks.bench_pipeline -o results.json
+    python -m benchmarks.bench_pipeline -o new.json --baseline results.json --tolerance 0.2
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import resource
+import subprocess  # nosec B404 # the crawl runs in a separate process
+import tempfile
+from typing import Any, Dict, List
+
+import numpy as np
+from scrapy.http import HtmlResponse
+
+from benchmarks.bench_format_corpus import articles_per_second
+from benchmarks.bench_parse_article import load_article_metadata, load_article_page
+from benchmarks.bench_serialization import bench_serialization
+from mtgscrapper.items import MtgArticle
+from mtgscrapper.local_server import StandInServer
+from mtgscrapper.mtg_format_handler import FormatHandler
+from mtgscrapper.spiders.mtgazone import MTGArenaZoneSpider
+from mtgscrapper.tests.helpers import build_site, spider_command
+
+
+def bench_crawl(nb_listing_pages: int, latency: float) -> Dict[str, float]:
+    """Crawls the stand-in site, returns the pages per second and the peak RSS of the crawl"""
+    with StandInServer({}, latency=latency) as server, tempfile.TemporaryDirectory() as tmp_dir:
+        server.pages = build_site(server.url, nb_listing_pages)
+        stats_path = os.path.join(tmp_dir, 'stats.json')
+        subprocess.run(  # nosec B603 # runs the crawl script of the test helpers
+            spider_command(
+                f'{server.url}/articles/',
+                {'JSONL_EXPORT_DIR': os.path.join(tmp_dir, 'export'), 'LOG_LEVEL': 'ERROR'},
+                stats_path,
+            ),
+            check=True,
+            timeout=600,
+        )
+        with open(stats_path, 'r', encoding='utf-8') as stats_file:
+            stats = json.load(stats_file)
+
+    pages = stats.get('response_received_count', 0)
+    return {
+        'crawl/pages': pages,
+        'crawl/items': stats.get('item_scraped_count', 0),
+        'crawl/pages_per_second': pages / stats['elapsed_time_seconds'],
+        'crawl/peak_rss_mb': stats['process/peak_rss_kb'] / 1024,
+    }
+
+
+def bench_parse(nb_copies: int, nb_samples: int) -> Dict[str, float]:
+    """Returns the latency percentiles of parse_article_content on a page, in milliseconds"""
+    spider = MTGArenaZoneSpider()
+    metadata = load_article_metadata()
+    body = load_article_page(nb_copies)
+
+    latencies = []
+    for _ in range(nb_samples):
+        response = HtmlResponse(url=metadata['url'], body=body, encoding='utf-8')
+        start = time.perf_counter()
+        spider.parse_article_content(response, MtgArticle(**metadata))
+        latencies.append(1000 * (time.perf_counter() - start))
+
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+    return {
+        f'parse/x{nb_copies}/p50_ms': p50,
+        f'parse/x{nb_copies}/p90_ms': p90,
+        f'parse/x{nb_copies}/p99_ms': p99,
+    }
+
+
+def bench_formats(nb_articles: int) -> Dict[str, float]:
+    """Returns the articles per second of process_article and process_corpus on a corpus"""
+    handler = FormatHandler(search_in_text=True)
+
+    def per_article(articles: List[MtgArticle]) -> None:
+        for article in articles:
+            handler.process_article(article)
+
+    return {
+        f'formats/{nb_articles}/process_article_per_second': articles_per_second(
+            per_article, nb_articles
+        ),
+        f'formats/{nb_articles}/process_corpus_per_second': articles_per_second(
+            handler.process_corpus, nb_articles
+        ),
+    }
+
+
+def higher_is_better(metric: str) -> bool:
+    """Throughputs are better when higher, latencies and memory when lower"""
+    return metric.endswith('_per_second')
+
+
+def regressions(
+    metrics: Dict[str, float], baseline: Dict[str, float], tolerance: float
+) -> List[str]:
+    """Returns a description of the metrics that got worse than the baseline by the tolerance"""
+    found = []
+    for metric, reference in baseline.items():
+        value = metrics.get(metric)
+        if value is None or reference == 0 or metric in ('crawl/pages', 'crawl/items'):
+            continue
+        change = (value - reference) / reference
+        if (change < -tolerance) if higher_is_better(metric) else (change > tolerance):
+            found.append(f'{metric}: {reference:.4g} -> {value:.4g} ({100 * change:+.1f}%)')
+    return found
+
+
+def main() -> None:
+    """Runs the benchmarks, writes the results and compares them with a baseline"""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n', maxsplit=1)[0])
+    parser.add_argument('-o', '--output', required=True, help='path of the JSON results.')
+    parser.add_argument('--baseline', default=None, help='JSON results of a previous run.')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed relative change.')
+    parser.add_argument('--listing-pages', type=int, default=20, help='listing pages crawled.')
+    parser.add_argument('--latency', type=float, default=0.0, help='latency of the server.')
+    parser.add_argument('--samples', type=int, default=50, help='parses per article size.')
+    parser.add_argument(
+        '--corpus-sizes', type=int, nargs='+', default=[100, 1000], help='format corpus sizes.'
+    )
+    args = parser.parse_args()
+
+    metrics: Dict[str, float] = {}
+    metrics.update(bench_crawl(args.listing_pages, args.latency))
+    for nb_copies in (1, 10, 50):
+        metrics.update(bench_parse(nb_copies, args.samples))
+    for nb_articles in args.corpus_sizes:
+        metrics.update(bench_formats(nb_articles))
+        metrics.update(bench_serialization(nb_articles))
+    metrics['process/peak_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    results: Dict[str, Any] = {
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'arguments': vars(args),
+        'metrics': metrics,
+    }
+    with open(args.output, 'w', encoding='utf-8') as json_file:
+        json.dump(results, json_file, indent=2)
+
+    for metric, value in metrics.items():
+        print(f'{metric}: {value:.4g}')
+
+    if args.baseline is not None:
+        with open(args.baseline, 'r', encoding='utf-8') as json_file:
+            baseline = json.load(json_file)['metrics']
+        found = regressions(metrics, baseline, args.tolerance)
+        for regression in found:
+            print(f'REGRESSION {regression}')
+        if len(found) > 0:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
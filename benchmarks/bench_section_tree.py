@@ -0,0 +1,85 @@
+"""Benchmarks the nesting of the sections of an article, list.pop(0) vs SectionTreeBuilder
+
+Usage:
+    python -m benchmarks.bench_section_tree --nb-headings 10000
+"""
+
+import time
+import random
+import argparse
+from typing import Callable, List
+
+from mtgscrapper.items import MtgArticle, MtgBlock, MtgSection, SectionTreeBuilder
+
+
+def synthetic_sections(nb_headings: int, seed: int = 0) -> List[MtgSection]:
+    """Creates a flat list of sections of random levels, each with a block
+
+    The first section holds the blocks before the first heading, like the parsers do.
+    """
+    rng = random.Random(seed)  # nosec B311 # reproducible benchmark sections
+    sections = [MtgSection(date='', title='', level=int(1e4))]
+    for i in range(nb_headings):
+        sections.append(MtgSection(date='', title=f'heading {i}', level=rng.randint(1, 6)))
+    for section in sections:
+        section.content.append(MtgBlock(date='', text=f'text of {section.title}'))
+    return sections
+
+
+def new_article() -> MtgArticle:
+    """Creates an empty article"""
+    return MtgArticle(date='', title='article', url='', tags=[], author='')
+
+
+def nest_with_pop(section_list: List[MtgSection], article: MtgArticle) -> None:
+    """Previous implementation of ContentParser.add_package_content, quadratic"""
+    if len(section_list) == 1:
+        article.add(section_list)
+    else:
+        previous_section = section_list.pop(0)
+        while len(section_list) > 0:
+            current_section = section_list.pop(0)
+
+            if current_section.level <= previous_section.level:
+                article.add(previous_section)
+
+                previous_section = current_section
+            else:
+                previous_section.add(current_section)
+
+        article.add(previous_section)
+
+
+def nest_with_builder(section_list: List[MtgSection], article: MtgArticle) -> None:
+    """Current implementation of ContentParser.add_package_content"""
+    SectionTreeBuilder(article).extend(section_list)
+
+
+def seconds(nest: Callable[[List[MtgSection], MtgArticle], None], nb_headings: int) -> float:
+    """Nests a fresh list of sections, the creation of the sections is not measured"""
+    sections = synthetic_sections(nb_headings)
+    article = new_article()
+    start = time.perf_counter()
+    nest(sections, article)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    """Prints the time to nest the sections of articles of increasing numbers of headings"""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n', maxsplit=1)[0])
+    parser.add_argument('--nb-headings', type=int, default=10000, help='largest article.')
+    args = parser.parse_args()
+
+    nb_headings = 100
+    while nb_headings <= args.nb_headings:
+        before = seconds(nest_with_pop, nb_headings)
+        after = seconds(nest_with_builder, nb_headings)
+        print(
+            f'{nb_headings} headings: pop(0) {1000 * before:.2f} ms, '
+            f'builder {1000 * after:.2f} ms (x{before / after:.1f})'
+        )
+        nb_headings *= 10
+
+
+if __name__ == '__main__':
+    main()
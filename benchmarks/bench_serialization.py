@@ -0,0 +1,76 @@
+"""Benchmarks the JSONL export of the articles, serialized from their dictionaries vs streamed
+
+Writes copies of the test article to uncompressed JSON lines files:
+- json: json.dumps(article.to_dict()), the reference,
+- serialized: JsonLinesWriter, orjson on article.to_dict() when it is installed, the default,
+- streamed: JsonLinesWriter with stream_items (JSONL_EXPORT_STREAM_ITEMS), see dump_item.
+
+The exit status is 1 if the default is slower than the reference.
+
+Usage:
+    python -m benchmarks.bench_serialization --nb-articles 2000
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+from typing import Callable, Dict, List
+
+from benchmarks.bench_format_corpus import articles_per_second
+from mtgscrapper.items import MtgArticle
+from mtgscrapper.jsonl import JsonLinesWriter
+
+
+def bench_serialization(nb_articles: int) -> Dict[str, float]:
+    """Returns the articles per second written by each way of serializing them"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+
+        def reference(articles: List[MtgArticle]) -> None:
+            with open(os.path.join(tmp_dir, 'reference.jsonl'), 'wb') as jsonl_file:
+                for article in articles:
+                    jsonl_file.write(
+                        json.dumps(article.to_dict(), ensure_ascii=False).encode('utf-8') + b'\n'
+                    )
+
+        def writer(stream_items: bool) -> Callable[[List[MtgArticle]], None]:
+            def write(articles: List[MtgArticle]) -> None:
+                with JsonLinesWriter(
+                    tmp_dir, compression=None, stream_items=stream_items
+                ) as jsonl_writer:
+                    for article in articles:
+                        jsonl_writer.write(article)
+
+            return write
+
+        return {
+            f'serialize/{nb_articles}/json_per_second': articles_per_second(reference, nb_articles),
+            f'serialize/{nb_articles}/serialized_per_second': articles_per_second(
+                writer(False), nb_articles
+            ),
+            f'serialize/{nb_articles}/streamed_per_second': articles_per_second(
+                writer(True), nb_articles
+            ),
+        }
+
+
+def main() -> None:
+    """Prints the articles per second of each way of serializing them"""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n', maxsplit=1)[0])
+    parser.add_argument('--nb-articles', type=int, default=2000, help='size of the corpus.')
+    args = parser.parse_args()
+
+    rates = bench_serialization(args.nb_articles)
+    for metric, value in rates.items():
+        print(f'{metric}: {value:.0f} articles/s')
+
+    prefix = f'serialize/{args.nb_articles}'
+    ratio = rates[f'{prefix}/serialized_per_second'] / rates[f'{prefix}/json_per_second']
+    print(f'serialized vs json: x{ratio:.2f}')
+    if ratio < 1:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""Include and exclude rules deciding which articles of the listing pages are crawled
+
+The rules match the metadata of an article card, before its request is created:
+- tags and authors: exact names, case insensitive,
+- titles: substrings, case insensitive,
+- formats: MTG formats found in the tags or the title of the article, see MtgFormatEnum,
+- since and until: range of the listing dates, as ISO dates such as '2023-01-01'.
+
+An article is crawled if it matches none of the exclude rules and, for each kind of include rules
+that is given, at least one of them. For example, only the Explorer decklists since a date:
+
+    {"include": {"formats": ["explorer"], "titles": ["decklist", "deck guide"]},
+     "exclude": {"tags": ["Premium"]},
+     "since": "2023-01-01"}
+
+The rules are compiled once into sets and a single regular expression per kind of title rules. The
+previous format of the rule files, {"tags": [...], "titles": [...]}, holds exclude rules, matched
+case insensitive like the others: the previous forbidden_tags and forbidden_titles were case
+sensitive, a 'Premium' tag rule now excludes the 'premium' tag too.
+"""
+
+from __future__ import annotations
+
+import re
+import json
+from dataclasses import dataclass, field
+from datetime import date as Date
+from typing import Any, Dict, FrozenSet, List, Pattern
+
+from mtgscrapper.items import parse_date
+from mtgscrapper.mtg_format_enum import MtgFormatEnum
+from mtgscrapper.mtg_format_handler import FORMAT_MATCHER
+
+RULE_KINDS = ('tags', 'titles', 'authors', 'formats')
+
+
+@dataclass(kw_only=True)
+class FilterRules:
+    """Declarative rules of an ArticleFilter, the lists of include and exclude rules by kind"""
+
+    include: Dict[str, List[str]] = field(default_factory=dict)
+    exclude: Dict[str, List[str]] = field(default_factory=dict)
+    since: str | None = None
+    until: str | None = None
+
+    def __post_init__(self) -> None:
+        for rules in (self.include, self.exclude):
+            unknown = set(rules) - set(RULE_KINDS)
+            if unknown:
+                raise ValueError(f'unknown filter rules {sorted(unknown)}.')
+        for format_ in self.include.get('formats', []) + self.exclude.get('formats', []):
+            if not MtgFormatEnum.is_format(format_):
+                raise ValueError(f'unknown MTG format {format_}.')
+
+    @classmethod
+    def from_dict(cls, dict_: Dict[str, Any]) -> FilterRules:
+        """Creates the rules from their dictionary, or from the previous exclude-only format"""
+        if 'include' in dict_ or 'exclude' in dict_ or 'since' in dict_ or 'until' in dict_:
+            return cls(**dict_)
+        return cls(exclude=dict_)
+
+    @classmethod
+    def from_json(cls, path: str) -> FilterRules:
+        """Loads the rules from a JSON file, such as data/args_filter_articles.json"""
+        with open(path, 'r', encoding='utf-8') as json_file:
+            return cls.from_dict(json.load(json_file))
+
+
+def _names(names: List[str]) -> FrozenSet[str]:
+    return frozenset(name.strip().lower() for name in names)
+
+
+def _titles_pattern(titles: List[str]) -> Pattern | None:
+    if len(titles) == 0:
+        return None
+    alternatives = sorted({re.escape(title.strip().lower()) for title in titles})
+    return re.compile('|'.join(alternatives), re.IGNORECASE)
+
+
+class ArticleFilter:  # pylint: disable=too-many-instance-attributes
+    """Compiled FilterRules, decides from the metadata of a card whether an article is crawled"""
+
+    def __init__(self, rules: FilterRules) -> None:
+        self.rules = rules
+        self.include_tags = _names(rules.include.get('tags', []))
+        self.exclude_tags = _names(rules.exclude.get('tags', []))
+        self.include_authors = _names(rules.include.get('authors', []))
+        self.exclude_authors = _names(rules.exclude.get('authors', []))
+        self.include_formats = _names(rules.include.get('formats', []))
+        self.exclude_formats = _names(rules.exclude.get('formats', []))
+        self.include_titles = _titles_pattern(rules.include.get('titles', []))
+        self.exclude_titles = _titles_pattern(rules.exclude.get('titles', []))
+        self.since = Date.fromisoformat(rules.since) if rules.since is not None else None
+        self.until = Date.fromisoformat(rules.until) if rules.until is not None else None
+        self.uses_formats = len(self.include_formats) > 0 or len(self.exclude_formats) > 0
+
+    def rejection(  # pylint: disable=too-many-return-statements,too-many-branches
+        self, title: str, tags: List[str], author: str | None = None, date: str | None = None
+    ) -> str | None:
+        """Returns the first rule rejecting an article, such as 'exclude_tags', None if it passes"""
+        tag_names = {tag.strip().lower() for tag in tags}
+        if not self.exclude_tags.isdisjoint(tag_names):
+            return 'exclude_tags'
+        if self.exclude_titles is not None and self.exclude_titles.search(title):
+            return 'exclude_titles'
+        author_name = author.strip().lower() if author is not None else None
+        if author_name in self.exclude_authors:
+            return 'exclude_authors'
+
+        if self.uses_formats:
+            formats = {tag for tag in tag_names if MtgFormatEnum.is_format(tag)}
+            formats.update(format_.value for format_ in FORMAT_MATCHER.count(title))
+            if not self.exclude_formats.isdisjoint(formats):
+                return 'exclude_formats'
+            if self.include_formats and self.include_formats.isdisjoint(formats):
+                return 'include_formats'
+
+        if self.include_tags and self.include_tags.isdisjoint(tag_names):
+            return 'include_tags'
+        if self.include_titles is not None and not self.include_titles.search(title):
+            return 'include_titles'
+        if self.include_authors and author_name not in self.include_authors:
+            return 'include_authors'
+
+        if self.since is not None or self.until is not None:
+            day = parse_date(date)
+            if day is None:
+                return 'date'
+            if self.since is not None and day < self.since:
+                return 'since'
+            if self.until is not None and day > self.until:
+                return 'until'
+        return None
+
+    def accepts(
+        self, title: str, tags: List[str], author: str | None = None, date: str | None = None
+    ) -> bool:
+        """Returns True if the article passes all the rules"""
+        return self.rejection(title, tags, author=author, date=date) is None
+
+    def is_too_old(self, date: str | None) -> bool:
+        """Returns True if an article is older than the since rule, so are the next listing pages"""
+        if self.since is None:
+            return False
+        day = parse_date(date)
+        return day is not None and day < self.since
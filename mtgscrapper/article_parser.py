@@ -0,0 +1,158 @@
+"""Single pass parser of the content of a MTGAZone article
+
+The parser walks the children of the 'entry-content' element of an article once with lxml instead
+of evaluating an XPath expression per paragraph, heading and table row. It builds the same
+MtgSection, MtgBlock and Decklist objects as ContentParser.parse_sections.
+"""
+
+from __future__ import annotations
+
+import functools
+from typing import Callable, Dict, Generator, Iterable, List
+
+from lxml import etree
+
+from mtgscrapper.items import MtgArticle, MtgSection, MtgBlock, Decklist
+
+SECTION_TAGS = frozenset(['h1', 'h2', 'h3', 'h4', 'h6'])
+BLOCK_TAGS = frozenset(['p', 'ul'])
+
+# Classes of the divs of a deck block holding the metadata of the decklist
+DECK_FIELDS = frozenset(['name', 'format', 'bo', 'archetype'])
+CARD_ATTRIBUTES = frozenset(['data-quantity', 'data-name'])
+
+
+def parse_entry_content(entry_contents: Iterable[etree._Element], article: MtgArticle) -> List:
+    """Parses the 'entry-content' elements of an article into a flat list of MtgSection
+
+    The blocks and decklists are added to the content of the section that precedes them, the
+    sections are nested afterwards by ContentParser.add_package_content.
+    """
+    return list(iter_entry_content(entry_contents, article))
+
+
+def iter_entry_content(
+    entry_contents: Iterable[etree._Element],
+    article: MtgArticle,
+    decklist_parser: Callable[[etree._Element, MtgArticle], Decklist] | None = None,
+    assign_ids: bool = True,
+) -> Generator[MtgSection, None, None]:
+    """Yields the sections of parse_entry_content one by one, each once its content is complete
+
+    The deck blocks are parsed by decklist_parser if given, parse_decklist otherwise, such as
+    ContentParser.parse_decklist so that the decklists are timed like the ones of the selectors.
+    Without assign_ids, the items are created without id, see MtgItem.assign_id.
+    """
+    decklist_parser = decklist_parser or functools.partial(parse_decklist, assign_id=assign_ids)
+    section: MtgSection | None = None
+
+    for entry_content in entry_contents:
+        for element in entry_content:
+            tag = element.tag
+            if not isinstance(tag, str):  # Comments and processing instructions
+                continue
+
+            if tag in SECTION_TAGS:
+                if section is not None:
+                    yield section
+                section = MtgSection(
+                    date=article.date,
+                    title=''.join(element.itertext()),
+                    level=int(tag[1:]),
+                    assign_id=assign_ids,
+                )
+                continue
+
+            if tag in BLOCK_TAGS:
+                paragraph = ''.join(element.itertext())
+            elif tag == 'figure' and element.get('class') == 'wp-block-table':
+                paragraph = parse_table(element)
+            elif tag == 'div' and element.get('class') == 'deck-block':
+                if section is None:
+                    section = MtgSection(
+                        date=article.date, title='', level=int(1e4), assign_id=assign_ids
+                    )
+                section.content.append(decklist_parser(element, article))
+                continue
+            else:
+                continue
+
+            if section is None:
+                section = MtgSection(
+                    date=article.date, title='', level=int(1e4), assign_id=assign_ids
+                )
+            section.content.append(
+                MtgBlock(date=article.date, format_=None, text=paragraph, assign_id=assign_ids)
+            )
+
+    if section is not None:
+        yield section
+
+
+def parse_table(element: etree._Element) -> str:
+    """Converts a table to text, one line per row and one space between cells"""
+    return ''.join(
+        [' '.join([text.strip() for text in row.itertext()]) + '\n' for row in element.iter('tr')]
+    )
+
+
+def parse_decklist(
+    element: etree._Element, article: MtgArticle, assign_id: bool = True
+) -> Decklist:
+    """Parse decklist information and create a Decklist object
+
+    Walks the divs of the deck block once, the fields are the first text of the first div with the
+    matching class, in document order like the XPath selectors of ContentParser.parse_decklist.
+    """
+    fields: Dict[str, str] = {}
+    deck: List[str] = []
+    sideboard: List[str] = []
+
+    for div in element.iter('div'):
+        css_class = div.get('class')
+        if css_class in DECK_FIELDS:
+            if css_class not in fields:
+                text = first_text(div)
+                if text is not None:
+                    fields[css_class] = text
+        elif css_class == 'decklist main':
+            deck += card_attributes(div)
+        elif css_class == 'decklist sideboard':
+            sideboard += card_attributes(div)
+
+    best_of = fields.get('bo')
+
+    return Decklist(
+        title=fields.get('name'),  # type: ignore
+        date=article.date,
+        format_=fields.get('format'),  # type: ignore
+        deck=to_card_pairs(deck),
+        sideboard=to_card_pairs(sideboard) or None,
+        archetype=fields.get('archetype'),
+        best_of=int(best_of[-1]) if best_of is not None else None,
+        assign_id=assign_id,
+    )
+
+
+def first_text(element: etree._Element) -> str | None:
+    """Returns the first text node child of an element, like the XPath 'text()'"""
+    if element.text is not None:
+        return element.text
+    for child in element:
+        if child.tail is not None:
+            return child.tail
+    return None
+
+
+def card_attributes(decklist: etree._Element) -> List[str]:
+    """Returns the quantity and name attributes of the cards of a decklist, in document order"""
+    attributes = []
+    for div in decklist.iter('div'):
+        if div is not decklist and 'card' in div.get('class', ''):
+            attributes += [value for key, value in div.items() if key in CARD_ATTRIBUTES]
+    return attributes
+
+
+def to_card_pairs(attributes: List[str]) -> List:
+    """Groups the (quantity, name) attributes of the cards by pairs"""
+    return [attributes[i : i + 2] for i in range(0, len(attributes), 2)]
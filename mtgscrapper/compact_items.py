@@ -0,0 +1,266 @@
+"""Compact, read-mostly representation of the MtgItem hierarchy to load large corpora
+
+The classes of mtgscrapper.items are dataclasses with a __dict__ and a uuid4 id per object, which
+takes gigabytes once a full corpus is loaded with MtgArticle.from_dict. The classes of this module
+use __slots__, intern the repeated strings (dates, formats, tags, card names and quantities) and
+store the decklists as tuples. Nodes loaded without an id get a cheap integer id, only when their
+id is accessed.
+
+The dictionaries produced by to_dict are the same as the ones of the mtgscrapper.items classes,
+so both representations can be converted into each other.
+"""
+
+from __future__ import annotations
+
+import sys
+import itertools
+from typing import Dict, List, Tuple
+
+from mtgscrapper.items import MtgArticle
+
+_ID_COUNTER = itertools.count()
+
+CardList = Tuple[Tuple[str, str], ...]
+
+
+def intern(string: str | None) -> str | None:
+    """Interns a string that may be None"""
+    return sys.intern(string) if string is not None else None
+
+
+def intern_cards(card_list: List | None) -> CardList | None:
+    """Converts a list of [quantity, name] pairs to a tuple of interned tuples"""
+    if card_list is None:
+        return None
+    return tuple((sys.intern(quantity), sys.intern(name)) for quantity, name in card_list)
+
+
+def cards_to_list(card_list: CardList | None) -> List | None:
+    """Converts a tuple of cards back to the list of [quantity, name] pairs of a Decklist"""
+    if card_list is None:
+        return None
+    return [[quantity, name] for quantity, name in card_list]
+
+
+class CompactItem:
+    """Base class of the compact items, holds the date and the id"""
+
+    __slots__ = ('date', '_id')
+    item_type = ''
+
+    def __init__(self, *, date: str, id_: str | None = None) -> None:
+        self.date = intern(date)
+        self._id = id_
+
+    @property
+    def id_(self) -> str:
+        """Id of the item, generated on first access if the item was loaded without id"""
+        if self._id is None:
+            self._id = str(next(_ID_COUNTER))
+        return self._id
+
+    @staticmethod
+    def content_from_dict(content_dicts: List[Dict]) -> List[CompactItem]:
+        """Loads the content of an article or a section"""
+        content: List[CompactItem] = []
+        for content_dict in content_dicts:
+            match content_dict['item_type']:
+                case 'section':
+                    content.append(CompactSection.from_dict(content_dict))
+                case 'block':
+                    content.append(CompactBlock.from_dict(content_dict))
+                case 'decklist':
+                    content.append(CompactDecklist.from_dict(content_dict))
+        return content
+
+    def to_dict(self) -> Dict:
+        """Creates a dictionary containing all the info from the object
+
+        The subclasses add their own fields to the date, type and id of the base class.
+        """
+        return {'date': self.date, 'item_type': self.item_type, 'id_': self.id_}
+
+
+class CompactBlock(CompactItem):
+    """Compact version of MtgBlock"""
+
+    __slots__ = ('format_', 'text')
+    item_type = 'block'
+
+    def __init__(
+        self, *, date: str, text: str, format_: str | None = None, id_: str | None = None
+    ) -> None:
+        super().__init__(date=date, id_=id_)
+        self.format_ = intern(format_)
+        self.text = text
+
+    @classmethod
+    def from_dict(cls, dict_: Dict) -> CompactBlock:
+        return cls(
+            date=dict_['date'], text=dict_['text'], format_=dict_['format_'], id_=dict_.get('id_')
+        )
+
+    def to_dict(self) -> Dict:
+        return {
+            **super().to_dict(),
+            'format_': self.format_,
+            'text': self.text,
+        }
+
+
+class CompactDecklist(CompactItem):
+    """Compact version of Decklist, the cards are stored as tuples of interned strings"""
+
+    __slots__ = ('format_', 'title', 'deck', 'sideboard', 'archetype', 'best_of')
+    item_type = 'decklist'
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        *,
+        date: str,
+        title: str,
+        deck: CardList,
+        sideboard: CardList | None = None,
+        format_: str | None = None,
+        archetype: str | None = None,
+        best_of: int | None = None,
+        id_: str | None = None,
+    ) -> None:
+        super().__init__(date=date, id_=id_)
+        self.format_ = intern(format_)
+        self.title = title
+        self.deck = deck
+        self.sideboard = sideboard
+        self.archetype = intern(archetype)
+        self.best_of = best_of
+
+    @classmethod
+    def from_dict(cls, dict_: Dict) -> CompactDecklist:
+        return cls(
+            date=dict_['date'],
+            title=dict_['title'],
+            deck=intern_cards(dict_['deck']),  # type: ignore
+            sideboard=intern_cards(dict_['sideboard']),
+            format_=dict_['format_'],
+            archetype=dict_['archetype'],
+            best_of=dict_['best_of'],
+            id_=dict_.get('id_'),
+        )
+
+    def to_dict(self) -> Dict:
+        return {
+            **super().to_dict(),
+            'format_': self.format_,
+            'title': self.title,
+            'deck': cards_to_list(self.deck),
+            'sideboard': cards_to_list(self.sideboard),
+            'archetype': self.archetype,
+            'best_of': self.best_of,
+        }
+
+
+class CompactSection(CompactItem):
+    """Compact version of MtgSection"""
+
+    __slots__ = ('format_', 'title', 'level', 'content')
+    item_type = 'section'
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        *,
+        date: str,
+        title: str,
+        level: int,
+        content: List[CompactItem] | None = None,
+        format_: str | None = None,
+        id_: str | None = None,
+    ) -> None:
+        super().__init__(date=date, id_=id_)
+        self.format_ = intern(format_)
+        self.title = title
+        self.level = level
+        self.content = content if content is not None else []
+
+    @classmethod
+    def from_dict(cls, dict_: Dict) -> CompactSection:
+        return cls(
+            date=dict_['date'],
+            title=dict_['title'],
+            level=dict_['level'],
+            content=cls.content_from_dict(dict_['content']),
+            format_=dict_['format_'],
+            id_=dict_.get('id_'),
+        )
+
+    def to_dict(self) -> Dict:
+        return {
+            **super().to_dict(),
+            'format_': self.format_,
+            'title': self.title,
+            'content': [content.to_dict() for content in self.content],
+            'level': self.level,
+            'length': len(self.content),
+        }
+
+
+class CompactArticle(CompactItem):
+    """Compact version of MtgArticle"""
+
+    __slots__ = ('content', 'formats', 'title', 'url', 'tags', 'author')
+    item_type = 'article'
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        *,
+        date: str,
+        title: str,
+        url: str,
+        tags: List[str],
+        author: str,
+        content: List[CompactItem] | None = None,
+        formats: List[str] | None = None,
+        id_: str | None = None,
+    ) -> None:
+        super().__init__(date=date, id_=id_)
+        self.title = title
+        self.url = url
+        self.tags = tuple(sys.intern(tag) for tag in tags)
+        self.author = intern(author)
+        self.content = content if content is not None else []
+        self.formats = (
+            tuple(sys.intern(format_) for format_ in formats) if formats is not None else None
+        )
+
+    @classmethod
+    def from_dict(cls, dict_: Dict) -> CompactArticle:
+        return cls(
+            date=dict_['date'],
+            title=dict_['title'],
+            url=dict_['url'],
+            tags=dict_['tags'],
+            author=dict_['author'],
+            content=cls.content_from_dict(dict_['content']),
+            formats=dict_['formats'],
+            id_=dict_.get('id_'),
+        )
+
+    @classmethod
+    def from_article(cls, article: MtgArticle) -> CompactArticle:
+        """Creates a compact article from a MtgArticle"""
+        return cls.from_dict(article.to_dict())
+
+    def to_article(self) -> MtgArticle:
+        """Creates a MtgArticle from the compact article"""
+        return MtgArticle.from_dict(self.to_dict())  # type: ignore
+
+    def to_dict(self) -> Dict:
+        return {
+            **super().to_dict(),
+            'content': [content.to_dict() for content in self.content],
+            'formats': list(self.formats) if self.formats is not None else None,
+            'title': self.title,
+            'url': self.url,
+            'tags': list(self.tags),
+            'author': self.author,
+            'length': len(self.content),
+        }
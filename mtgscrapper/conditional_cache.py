@@ -0,0 +1,243 @@
+"""Downloader middleware revalidating the cached article pages with conditional GET requests
+
+The responses carrying an ETag or a Last-Modified header are stored on disk by a
+ConditionalCacheStorage, and the ConditionalCacheMiddleware sends the next requests of the same
+pages with If-None-Match / If-Modified-Since headers, see CONDITIONAL_CACHE_ENABLED.
+"""
+
+from __future__ import annotations
+
+import os
+import gzip
+import json
+import time
+from typing import Dict, Generator, List, Tuple
+
+from scrapy import signals, Request, Spider
+from scrapy.crawler import Crawler
+from scrapy.exceptions import NotConfigured
+from scrapy.http import Headers, Response
+from scrapy.responsetypes import responsetypes
+
+
+class ConditionalCacheStorage:
+    """Disk storage of the responses used by the ConditionalCacheMiddleware
+
+    Each response is stored under its request fingerprint as a gzip compressed body and a JSON
+    metadata file containing its url, status, headers and validators (ETag and Last-Modified).
+    The modification time of the body is the last time the response was stored or revalidated,
+    it is used to evict the oldest entries.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int | None = None, max_age: float | None = None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+    def _paths(self, key: str) -> Tuple[str, str]:
+        directory = os.path.join(self.cache_dir, key[:2])
+        return os.path.join(directory, f'{key}.json'), os.path.join(directory, f'{key}.gz')
+
+    def load_metadata(self, key: str) -> Dict | None:
+        """Returns the metadata of a cached response, None if the response is not cached"""
+        metadata_path, body_path = self._paths(key)
+        if not os.path.exists(metadata_path) or not os.path.exists(body_path):
+            return None
+        with open(metadata_path, 'r', encoding='utf-8') as json_file:
+            return json.load(json_file)
+
+    def load_body(self, key: str) -> bytes:
+        """Returns the uncompressed body of a cached response and marks it as recently used"""
+        _, body_path = self._paths(key)
+        with gzip.open(body_path, 'rb') as body_file:
+            body = body_file.read()
+        os.utime(body_path)
+        return body
+
+    def store(self, key: str, metadata: Dict, body: bytes) -> None:
+        """Stores a response, the files are written atomically"""
+        metadata_path, body_path = self._paths(key)
+        os.makedirs(os.path.dirname(metadata_path), exist_ok=True)
+
+        with open(f'{body_path}.tmp', 'wb') as body_file:
+            body_file.write(gzip.compress(body))
+        os.replace(f'{body_path}.tmp', body_path)
+
+        with open(f'{metadata_path}.tmp', 'w', encoding='utf-8') as json_file:
+            json.dump(metadata, json_file)
+        os.replace(f'{metadata_path}.tmp', metadata_path)
+
+    def iter_responses(self) -> Generator[Tuple[Dict, bytes], None, None]:
+        """Yields the (metadata, body) pairs of all the cached responses
+
+        Useful to run the parsers on a cached corpus without any network access.
+        """
+        for key, _, _ in self._entries():
+            metadata = self.load_metadata(key)
+            if metadata is not None:
+                _, body_path = self._paths(key)
+                with gzip.open(body_path, 'rb') as body_file:
+                    yield metadata, body_file.read()
+
+    def _entries(self) -> List[Tuple[str, float, int]]:
+        """Lists the (key, last_used, size) of the cached responses"""
+        entries: List[Tuple[str, float, int]] = []
+        if not os.path.isdir(self.cache_dir):
+            return entries
+
+        for directory in os.scandir(self.cache_dir):
+            if not directory.is_dir():
+                continue
+            for entry in os.scandir(directory.path):
+                if entry.name.endswith('.gz'):
+                    stat = entry.stat()
+                    entries.append((entry.name[: -len('.gz')], stat.st_mtime, stat.st_size))
+        return entries
+
+    def remove(self, key: str) -> None:
+        """Removes a response from the cache"""
+        for path in self._paths(key):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def evict(self) -> int:
+        """Removes the entries older than max_age, then the least recently used ones until the
+        cache holds at most max_bytes of compressed bodies
+
+        Returns the number of evicted responses.
+        """
+        entries = sorted(self._entries(), key=lambda entry: entry[1])
+        nb_evicted = 0
+
+        if self.max_age is not None:
+            oldest_allowed = time.time() - self.max_age
+            while len(entries) > 0 and entries[0][1] < oldest_allowed:
+                self.remove(entries.pop(0)[0])
+                nb_evicted += 1
+
+        if self.max_bytes is not None:
+            total_bytes = sum(size for _, _, size in entries)
+            for key, _, size in entries:
+                if total_bytes <= self.max_bytes:
+                    break
+                self.remove(key)
+                total_bytes -= size
+                nb_evicted += 1
+
+        return nb_evicted
+
+
+class ConditionalCacheMiddleware:
+    """Downloader middleware revalidating cached pages with conditional GET requests
+
+    Responses carrying an ETag or a Last-Modified header are stored on disk. On later runs the
+    request is sent with If-None-Match / If-Modified-Since headers and, if the server answers
+    304 Not Modified, the cached body is reused instead of being downloaded again.
+
+    Settings:
+        CONDITIONAL_CACHE_ENABLED: enables the middleware (default: False).
+        CONDITIONAL_CACHE_DIR: directory of the cache (default: '.conditional_cache').
+        CONDITIONAL_CACHE_MAX_BYTES: maximum size of the compressed bodies (default: 1GB).
+        CONDITIONAL_CACHE_MAX_AGE: number of seconds after which an entry that was not
+            revalidated is evicted (default: 30 days).
+    """
+
+    def __init__(self, storage: ConditionalCacheStorage, crawler: Crawler) -> None:
+        self.storage = storage
+        self.fingerprinter = crawler.request_fingerprinter
+        self.stats = crawler.stats
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler) -> ConditionalCacheMiddleware:
+        """Creates the middleware, raises NotConfigured if it is disabled"""
+        settings = crawler.settings
+        if not settings.getbool('CONDITIONAL_CACHE_ENABLED'):
+            raise NotConfigured
+
+        storage = ConditionalCacheStorage(
+            settings.get('CONDITIONAL_CACHE_DIR', '.conditional_cache'),
+            max_bytes=settings.getint('CONDITIONAL_CACHE_MAX_BYTES', 1024**3),
+            max_age=settings.getfloat('CONDITIONAL_CACHE_MAX_AGE', 30 * 24 * 3600),
+        )
+        middleware = cls(storage, crawler)
+        crawler.signals.connect(middleware.spider_closed, signal=signals.spider_closed)
+        return middleware
+
+    def process_request(  # pylint: disable=unused-argument
+        self, request: Request, spider: Spider
+    ) -> None:
+        """Adds the validators of the cached response of a request to its headers"""
+        if request.method != 'GET' or request.meta.get('dont_cache', False):
+            return None
+
+        key = self.fingerprinter.fingerprint(request).hex()
+        metadata = self.storage.load_metadata(key)
+        if metadata is None:
+            return None
+
+        request.meta['conditional_cache_key'] = key
+        if metadata['etag'] is not None:
+            request.headers.setdefault('If-None-Match', metadata['etag'])
+        if metadata['last_modified'] is not None:
+            request.headers.setdefault('If-Modified-Since', metadata['last_modified'])
+        return None
+
+    def process_response(  # pylint: disable=unused-argument
+        self, request: Request, response: Response, spider: Spider
+    ) -> Response:
+        """Returns the cached response on a 304 Not Modified, stores the cacheable responses"""
+        if request.method != 'GET' or request.meta.get('dont_cache', False):
+            return response
+
+        key = request.meta.get('conditional_cache_key')
+        if response.status == 304 and key is not None:
+            metadata = self.storage.load_metadata(key)
+            if metadata is not None:
+                self.stats.inc_value('conditional_cache/hit')
+                return self._cached_response(metadata, self.storage.load_body(key))
+
+        if response.status == 200:
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            if etag is not None or last_modified is not None:
+                self.stats.inc_value('conditional_cache/store')
+                self.storage.store(
+                    key or self.fingerprinter.fingerprint(request).hex(),
+                    self._metadata(response, etag, last_modified),
+                    response.body,
+                )
+            else:
+                self.stats.inc_value('conditional_cache/uncacheable')
+        return response
+
+    def spider_closed(self, spider: Spider) -> None:  # pylint: disable=unused-argument
+        """Evicts the old entries of the cache at the end of the crawl"""
+        nb_evicted = self.storage.evict()
+        self.stats.set_value('conditional_cache/evicted', nb_evicted)
+
+    @staticmethod
+    def _metadata(response: Response, etag: bytes | None, last_modified: bytes | None) -> Dict:
+        headers = {
+            key.decode('latin1'): [value.decode('latin1') for value in values]
+            for key, values in response.headers.items()
+            if key.lower() not in (b'content-encoding', b'content-length')
+        }
+        return {
+            'url': response.url,
+            'status': response.status,
+            'headers': headers,
+            'etag': etag.decode('latin1') if etag is not None else None,
+            'last_modified': last_modified.decode('latin1') if last_modified is not None else None,
+        }
+
+    @staticmethod
+    def _cached_response(metadata: Dict, body: bytes) -> Response:
+        headers = Headers(metadata['headers'])
+        response_cls = responsetypes.from_args(headers=headers, url=metadata['url'], body=body)
+        return response_cls(
+            url=metadata['url'],
+            status=metadata['status'],
+            headers=headers,
+            body=body,
+            flags=['cached'],
+        )
@@ -0,0 +1,192 @@
+"""Parses the content of the article pages of a site into sections, blocks and decklists
+
+The ContentParser of a SiteSpider evaluates the XPath selectors of its SiteConfig, or runs the
+single pass parser of the site if it has one (see mtgscrapper.article_parser). It then nests the
+sections, finds their formats and derives their ids, or streams the top-level sections of the
+article (see mtgscrapper.streaming).
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, Generator, Iterator, List, Tuple
+
+from mtgscrapper.hashing import assign_content_ids
+from mtgscrapper.items import (
+    MtgArticle,
+    MtgSection,
+    MtgBlock,
+    Decklist,
+    SectionTreeBuilder,
+)
+from mtgscrapper.mtg_format_handler import FormatHandler
+from mtgscrapper.sites import CompiledSite, SiteConfig
+from mtgscrapper.streaming import iter_article_items
+
+H_TAG = re.compile(r'h\d')
+
+
+class ContentParser:
+    """Parser of the entry content elements of the article pages of a site
+
+    Args:
+        site (SiteConfig): site of the article pages.
+        selectors (CompiledSite): compiled selectors of the site.
+        fast_parse (bool): parses with the single pass parser of the site, if it has one.
+        content_ids (bool): derives the ids of the content from the content, see hashing.
+    """
+
+    def __init__(
+        self,
+        site: SiteConfig,
+        selectors: CompiledSite,
+        fast_parse: bool = True,
+        content_ids: bool = False,
+    ) -> None:
+        self.site = site
+        self.selectors = selectors
+        self.fast_parse = fast_parse and site.entry_parser is not None
+        self.content_ids = content_ids
+
+        # Created once, its stages can then be timed by the Instrumentation extension
+        self.format_handler = FormatHandler(search_in_text=False)
+
+    def parse(self, content: List, article: MtgArticle) -> MtgArticle:
+        """Fills the content of an article, formats and ids included, and returns it"""
+        self.add_package_content(list(self.iter_sections(content, article)), article)
+
+        self.format_handler.process_article(article)
+
+        if self.content_ids:
+            assign_content_ids(article)
+
+        return article
+
+    def stream(self, content: List, article: MtgArticle) -> Generator[Dict, None, None]:
+        """Yields the top-level sections of an article and their decklists as they are parsed
+
+        The article is yielded last without its content, see streaming.iter_article_items.
+        """
+        return iter_article_items(
+            self.iter_sections(content, article),
+            article,
+            self.format_handler,
+            content_ids=self.content_ids,
+        )
+
+    def iter_sections(self, content: List, article: MtgArticle) -> Iterator[MtgSection]:
+        """Yields the flat list of the sections of an article, see parse_sections
+
+        With content ids, the items are created without a uuid4 id (assign_id=False), their ids are
+        derived from the content once it is parsed.
+        """
+        if self.fast_parse:
+            return self.site.entry_parser(  # type: ignore
+                content,
+                article,
+                decklist_parser=self.parse_decklist,
+                assign_ids=not self.content_ids,
+            )
+        return iter(self.parse_sections(content, article))
+
+    def parse_sections(self, content: List, article: MtgArticle) -> List[MtgSection]:
+        """Parses the entry content elements of an article into a flat list of MtgSection
+
+        Evaluates the XPath selectors of the site, slower reference implementation of the single
+        pass parser, such as article_parser.iter_entry_content.
+        """
+        selectors = self.selectors
+        decklist_tag, table_tag = self.site.decklist_tag, self.site.table_tag
+        assign_id = not self.content_ids
+        section_list = []
+
+        for entry_content in content:
+            for element in selectors.all('content_elements', entry_content):
+                block_tag = element.tag
+
+                if H_TAG.match(block_tag):  # If is a section, i.e h1, h2 ....
+                    section_list.append(
+                        MtgSection(
+                            date=article.date,
+                            title=selectors.text('element_text', element),
+                            level=int(block_tag[1:]),
+                            assign_id=assign_id,
+                        )
+                    )
+                    continue
+
+                # The blocks and decklists before the first heading go in an untitled section
+                if len(section_list) == 0:
+                    section_list.append(
+                        MtgSection(date=article.date, title='', level=int(1e4), assign_id=assign_id)
+                    )
+
+                if block_tag == decklist_tag:
+                    item = self.parse_decklist(element, article)  # type: Decklist | MtgBlock
+                else:
+                    if block_tag == table_tag:
+                        paragraph = ''
+                        for row in selectors.all('table_rows', element):
+                            paragraph += (
+                                ' '.join(
+                                    [text.strip() for text in selectors.all('element_text', row)]
+                                )
+                                + '\n'
+                            )
+                    else:
+                        paragraph = selectors.text('element_text', element)
+                    item = MtgBlock(
+                        date=article.date, format_=None, text=paragraph, assign_id=assign_id
+                    )
+
+                section_list[-1].content.append(item)
+
+        return section_list
+
+    def add_package_content(self, section_list: List[MtgSection], article: MtgArticle) -> None:
+        """Nests the sections inside the content of the article and of their parent section
+
+        See SectionTreeBuilder, the sections are nested in a single pass over the list.
+        """
+        if len(section_list) == 0:
+            raise ValueError(f'article of id {article.id_} with url {article.url} is empty.')
+        SectionTreeBuilder(article).extend(section_list)
+
+    def parse_decklist(self, element: Any, article: MtgArticle) -> Decklist:
+        """Parse decklist information and create a Decklist object
+
+        Called by the single pass parser of the site too, with its own decklist parser, so that the
+        decklists of both parsers are a timed stage of the Instrumentation extension.
+        """
+        if self.fast_parse and self.site.decklist_parser is not None:
+            return self.site.decklist_parser(element, article, assign_id=not self.content_ids)
+
+        selectors = self.selectors
+        best_of = selectors.first('decklist_best_of', element)
+        if best_of is not None:
+            best_of = int(best_of[-1])
+
+        return Decklist(
+            title=selectors.first('decklist_title', element),
+            date=article.date,
+            format_=selectors.first('decklist_format', element),
+            deck=self.parse_deck(selectors.all('decklist_main_cards', element)),
+            sideboard=self.parse_sideboard(selectors.all('decklist_sideboard_cards', element)),
+            archetype=selectors.first('decklist_archetype', element),
+            best_of=best_of,
+            assign_id=not self.content_ids,
+        )
+
+    def parse_deck(self, card_list: List[str]) -> List[Tuple[str, str]]:
+        """Groups the quantity and name attributes of the cards of a deck by pairs"""
+        card_pairs = [card_list[i : i + 2] for i in range(0, len(card_list), 2)]
+        return card_pairs  # type: ignore
+
+    def parse_sideboard(self, card_list: List[str]) -> List[Tuple[str, str]] | None:
+        """Parse the cards inside of a sideboard
+
+        The only difference with deck is that it can be None
+        """
+        card_pairs = self.parse_deck(card_list)
+
+        return card_pairs if len(card_pairs) > 0 else None
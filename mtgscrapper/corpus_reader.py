@@ -0,0 +1,265 @@
+"""Lazy reader of a JSON lines corpus of articles, with random access by article id
+
+The reader memory-maps an uncompressed JSONL file, such as the output of the JsonLinesWriter with
+no compression, and keeps a sidecar index of its articles: the id, day, formats and tags of each
+article and the byte range of its line. The index is written next to the file ('<path>.index') and
+only the lines appended since it was written are read again, so opening a corpus costs the load of
+its index, not the parsing of its articles.
+
+The articles are filtered on the index, without reading their lines. An article is parsed only when
+it is accessed, and the sections, blocks and decklists of each level of its content are built on
+first access, see LazyContent. An article crawled again later in the file replaces its previous
+version.
+
+Usage:
+    with CorpusReader('articles.jsonl') as reader:
+        entries = reader.find(format_='explorer', since='2023-01-01')
+        articles = reader.articles(entries)
+"""
+
+from __future__ import annotations
+
+import os
+import mmap
+from datetime import date as Date
+from typing import Any, Dict, Generator, Iterable, List, NamedTuple
+
+from mtgscrapper.corpus_store import ARTICLE_FIELDS, iso_day
+from mtgscrapper.items import Decklist, MtgArticle, MtgBlock, MtgItem, MtgSection
+from mtgscrapper.jsonl import dumps, loads
+
+INDEX_VERSION = 1
+TAIL_SIZE = 64
+
+
+class ArticleEntry(NamedTuple):
+    """Metadata of an article in the index of a corpus, and the byte range of its line"""
+
+    id_: str
+    day: str | None
+    formats: List[str]
+    tags: List[str]
+    offset: int
+    length: int
+
+
+class LazyContent(list):
+    """Content of an article whose items are built from their dictionaries on first access
+
+    Indexing and iterating build the items and keep them, the other list methods see the items
+    already built and the dictionaries of the others. The content of a section is lazy too.
+    """
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(len(self))[index]]
+        item = super().__getitem__(index)
+        if isinstance(item, dict):
+            item = build_item(item)
+            super().__setitem__(index, item)
+        return item
+
+    def __iter__(self) -> Generator[Any, None, None]:
+        for index in range(len(self)):
+            yield self[index]
+
+
+def build_item(item_dict: Dict) -> MtgItem:
+    """Builds a section, block or decklist from its dictionary, like MtgContent.from_dict
+
+    The content of a section is not built, see with_lazy_content.
+    """
+    match item_dict['item_type']:
+        case 'section':
+            return with_lazy_content(MtgSection, item_dict)
+        case 'block':
+            return MtgBlock.from_dict(item_dict)
+        case 'decklist':
+            return Decklist.from_dict(item_dict)
+    raise ValueError(f'unknown item type {item_dict["item_type"]}.')
+
+
+def with_lazy_content(cls: Any, item_dict: Dict, fields: Iterable[str] | None = None) -> Any:
+    """Creates a MtgContent of the class cls whose content is a LazyContent of its dictionaries
+
+    Args:
+        cls (type): MtgContent class, such as MtgArticle or MtgSection.
+        item_dict (Dict): dictionary of the item, with its content.
+        fields (Iterable[str] | None): keys of item_dict given to cls, all of them if None.
+    """
+    item = cls(
+        **{
+            key: value
+            for key, value in item_dict.items()
+            if key not in ('content', 'length') and (fields is None or key in fields)
+        }
+    )
+    item.content = LazyContent(item_dict['content'])
+    item.length = len(item.content)
+    return item
+
+
+class CorpusReader:
+    """Memory-mapped JSONL corpus of articles with a sidecar index
+
+    Args:
+        path (str): path of the uncompressed JSONL file.
+        index_path (str | None): path of the index, '<path>.index' if None.
+    """
+
+    def __init__(self, path: str, index_path: str | None = None) -> None:
+        if path.endswith(('.gz', '.zst')):
+            raise ValueError(f'{path} is compressed, only plain JSONL files can be memory-mapped.')
+
+        self.path = path
+        self.index_path = index_path if index_path is not None else f'{path}.index'
+        self.entries: Dict[str, ArticleEntry] = {}
+        # Number of lines read to update the index when the reader was opened
+        self.nb_indexed_lines = 0
+
+        self.file = open(path, 'rb')  # pylint: disable=consider-using-with
+        self.size = os.fstat(self.file.fileno()).st_size
+        self.mmap = (
+            mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if self.size > 0 else None
+        )
+        self.update_index()
+
+    def __enter__(self) -> CorpusReader:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, article_id: str) -> bool:
+        return article_id in self.entries
+
+    def __getitem__(self, article_id: str) -> MtgArticle:
+        return self.load(self.entries[article_id])
+
+    def close(self) -> None:
+        """Unmaps and closes the corpus file"""
+        if self.mmap is not None:
+            self.mmap.close()
+            self.mmap = None
+        self.file.close()
+
+    def update_index(self) -> None:
+        """Loads the index, indexes the lines appended since it was saved and saves it
+
+        The index is built again from the start if the file is smaller than when it was indexed or
+        if its indexed part changed.
+        """
+        indexed_size = 0
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'rb') as index_file:
+                index = loads(index_file.read())
+            if (
+                index['version'] == INDEX_VERSION
+                and index['size'] <= self.size
+                and index['tail'] == self._tail(index['size'])
+            ):
+                indexed_size = index['size']
+                for entry in index['entries']:
+                    article_entry = ArticleEntry(*entry)
+                    self.entries[article_entry.id_] = article_entry
+
+        if indexed_size == self.size:
+            return
+
+        self._index_lines(indexed_size)
+        self.save_index()
+
+    def _tail(self, size: int) -> str:
+        # Last bytes of the indexed part of the file, a file written again is indexed again
+        if self.mmap is None:
+            return ''
+        return self.mmap[max(0, size - TAIL_SIZE) : size].hex()
+
+    def _index_lines(self, start: int) -> None:
+        if self.mmap is None:
+            raise RuntimeError(f'the file {self.path} is not mapped, it is empty or closed.')
+        offset = start
+        while offset < self.size:
+            end = self.mmap.find(b'\n', offset)
+            if end == -1:
+                end = self.size
+            self.nb_indexed_lines += 1
+            line = self.mmap[offset:end].strip()
+            if line:
+                item = loads(line)
+                if item.get('item_type') == 'article' and 'nb_sections' in item:
+                    raise ValueError(
+                        f'{self.path} holds streamed articles without their content, rebuild them '
+                        'first, see streaming.assemble_article.'
+                    )
+                if item.get('item_type') == 'article':
+                    # The previous version of an article crawled again is forgotten
+                    self.entries.pop(item['id_'], None)
+                    self.entries[item['id_']] = ArticleEntry(
+                        id_=item['id_'],
+                        day=iso_day(item.get('date')),
+                        formats=[str(format_) for format_ in item.get('formats') or []],
+                        tags=list(item.get('tags') or []),
+                        offset=offset,
+                        length=end - offset,
+                    )
+            offset = end + 1
+
+    def save_index(self) -> None:
+        """Writes the index next to the corpus, through a temporary file like SeenArticleIndex"""
+        index = {
+            'version': INDEX_VERSION,
+            'size': self.size,
+            'tail': self._tail(self.size),
+            'entries': [list(entry) for entry in self.entries.values()],
+        }
+        tmp_path = f'{self.index_path}.tmp'
+        with open(tmp_path, 'wb') as index_file:
+            index_file.write(dumps(index))
+        os.replace(tmp_path, self.index_path)
+
+    def find(
+        self,
+        format_: str | None = None,
+        tag: str | None = None,
+        since: str | Date | None = None,
+        until: str | Date | None = None,
+    ) -> List[ArticleEntry]:
+        """Returns the entries of the articles matching all the given filters, from the index
+
+        The days are compared as ISO dates, such as '2023-02-13', the articles without a day only
+        match when no date range is given.
+        """
+        since, until = iso_day(since), iso_day(until)
+        found = []
+        for entry in self.entries.values():
+            if format_ is not None and format_ not in entry.formats:
+                continue
+            if tag is not None and tag not in entry.tags:
+                continue
+            if since is not None and (entry.day is None or entry.day < since):
+                continue
+            if until is not None and (entry.day is None or entry.day > until):
+                continue
+            found.append(entry)
+        return found
+
+    def load_dict(self, entry: ArticleEntry) -> Dict:
+        """Returns the dictionary of an article, parsed from its line"""
+        if self.mmap is None:
+            raise ValueError('the corpus file is closed or empty.')
+        return loads(self.mmap[entry.offset : entry.offset + entry.length])
+
+    def load(self, entry: ArticleEntry) -> MtgArticle:
+        """Creates an article from its line, its content is built lazily, see LazyContent"""
+        return with_lazy_content(MtgArticle, self.load_dict(entry), ARTICLE_FIELDS)
+
+    def articles(
+        self, entries: Iterable[ArticleEntry] | None = None
+    ) -> Generator[MtgArticle, None, None]:
+        """Yields the articles of entries, such as the result of find, all the articles if None"""
+        for entry in entries if entries is not None else list(self.entries.values()):
+            yield self.load(entry)
@@ -0,0 +1,358 @@
+"""Indexed SQLite store of the crawled articles, to query a corpus without loading all of it
+
+Each article is stored as one row holding its metadata and its JSON, from which the MtgArticle is
+rebuilt on demand. Its content is flattened into indexed tables:
+- nodes: one row per section, block and decklist, with its parent, position and format,
+- block_text: full-text index (FTS5) of the text of the blocks,
+- decklists and decklist_cards: one row per decklist and one row per card of a decklist.
+
+The dates are stored in the ISO format, so that date ranges are index lookups. Storing an article
+again replaces all its rows.
+
+Usage:
+    with CorpusStore('corpus.sqlite') as store:
+        rows = store.find_decklists(format_='explorer', since='2023-01-01', card='Duress')
+        articles = list(store.hydrate(rows))
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from dataclasses import fields
+from datetime import date as Date
+from typing import Any, Dict, Generator, Iterable, List, Tuple
+
+from mtgscrapper.items import MtgArticle, MtgItem, parse_date
+from mtgscrapper.jsonl import dumps
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS articles (
+    id TEXT PRIMARY KEY,
+    title TEXT,
+    day TEXT,
+    date TEXT,
+    url TEXT,
+    author TEXT,
+    data BLOB
+);
+CREATE INDEX IF NOT EXISTS articles_day ON articles (day);
+CREATE TABLE IF NOT EXISTS article_tags (article_id TEXT, tag TEXT);
+CREATE INDEX IF NOT EXISTS article_tags_tag ON article_tags (tag);
+CREATE INDEX IF NOT EXISTS article_tags_article ON article_tags (article_id);
+CREATE TABLE IF NOT EXISTS article_formats (article_id TEXT, format TEXT);
+CREATE INDEX IF NOT EXISTS article_formats_format ON article_formats (format);
+CREATE INDEX IF NOT EXISTS article_formats_article ON article_formats (article_id);
+CREATE TABLE IF NOT EXISTS nodes (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT,
+    article_id TEXT,
+    parent_id TEXT,
+    position INTEGER,
+    item_type TEXT,
+    format TEXT,
+    title TEXT,
+    level INTEGER
+);
+CREATE INDEX IF NOT EXISTS nodes_article ON nodes (article_id);
+CREATE INDEX IF NOT EXISTS nodes_format ON nodes (format, item_type);
+CREATE VIRTUAL TABLE IF NOT EXISTS block_text USING fts5 (text);
+CREATE TABLE IF NOT EXISTS decklists (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT,
+    article_id TEXT,
+    day TEXT,
+    title TEXT,
+    format TEXT,
+    archetype TEXT,
+    best_of INTEGER
+);
+CREATE INDEX IF NOT EXISTS decklists_format_day ON decklists (format, day);
+CREATE INDEX IF NOT EXISTS decklists_day ON decklists (day);
+CREATE INDEX IF NOT EXISTS decklists_article ON decklists (article_id);
+CREATE TABLE IF NOT EXISTS decklist_cards (
+    decklist INTEGER,
+    card TEXT,
+    quantity INTEGER,
+    sideboard INTEGER
+);
+CREATE INDEX IF NOT EXISTS decklist_cards_card ON decklist_cards (card);
+CREATE INDEX IF NOT EXISTS decklist_cards_decklist ON decklist_cards (decklist);
+'''
+
+# Fields of the MtgArticle dataclass, the other fields of a stored dictionary (such as the
+# 'content_hash' added by the ContentDedupPipeline) are left out when an article is rebuilt
+ARTICLE_FIELDS = frozenset(field.name for field in fields(MtgArticle))
+
+
+def iso_day(date: str | Date | None) -> str | None:
+    """Converts the date of an item ('February 13, 2023') or a datetime.date to '2023-02-13'"""
+    if date is None or isinstance(date, Date):
+        return date.isoformat() if date is not None else None
+    day = parse_date(date)
+    return day.isoformat() if day is not None else date
+
+
+def to_quantity(quantity: str) -> int | None:
+    """Converts the quantity of a card of a decklist, such as '4', to an integer"""
+    return int(quantity) if quantity.strip().isdigit() else None
+
+
+class CorpusStore:
+    """SQLite store of articles, indexed on format, date, tag and card name
+
+    Args:
+        path (str): path of the SQLite database, created if needed. ':memory:' for a temporary
+            store.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self) -> CorpusStore:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.connection.execute('SELECT COUNT(*) FROM articles').fetchone()[0]
+
+    def commit(self) -> None:
+        """Commits the articles added since the last commit"""
+        self.connection.commit()
+
+    def close(self) -> None:
+        """Commits and closes the database"""
+        self.connection.commit()
+        self.connection.close()
+
+    def add(self, article: MtgArticle | Dict) -> None:
+        """Stores an article and its content, replacing the article of the same id if any
+
+        The article is written in the current transaction, see commit.
+        """
+        article_dict = article.to_dict() if isinstance(article, MtgItem) else article
+        article_id = article_dict['id_']
+        day = iso_day(article_dict['date'])
+
+        self.delete(article_id)
+        self.connection.execute(
+            'INSERT INTO articles VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (
+                article_id,
+                article_dict['title'],
+                day,
+                article_dict['date'],
+                article_dict['url'],
+                article_dict['author'],
+                dumps(article_dict),
+            ),
+        )
+        self.connection.executemany(
+            'INSERT INTO article_tags VALUES (?, ?)',
+            [(article_id, tag) for tag in article_dict['tags']],
+        )
+        self.connection.executemany(
+            'INSERT INTO article_formats VALUES (?, ?)',
+            [(article_id, format_) for format_ in article_dict.get('formats') or []],
+        )
+        self._add_content(article_dict, article_id, day)
+
+    def _add_content(self, node: Dict, article_id: str, day: str | None) -> None:
+        for position, child in enumerate(node['content']):
+            item_type = child['item_type']
+            rowid = self.connection.execute(
+                'INSERT INTO nodes (id, article_id, parent_id, position, item_type, format, title, '
+                'level) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (
+                    child['id_'],
+                    article_id,
+                    node['id_'],
+                    position,
+                    item_type,
+                    child.get('format_'),
+                    child.get('title'),
+                    child.get('level'),
+                ),
+            ).lastrowid
+
+            if item_type == 'section':
+                self._add_content(child, article_id, day)
+            elif item_type == 'block':
+                self.connection.execute(
+                    'INSERT INTO block_text (rowid, text) VALUES (?, ?)', (rowid, child['text'])
+                )
+            elif item_type == 'decklist':
+                self._add_decklist(child, rowid, article_id, iso_day(child['date']) or day)
+
+    def _add_decklist(
+        self, decklist: Dict, rowid: int | None, article_id: str, day: str | None
+    ) -> None:
+        self.connection.execute(
+            'INSERT INTO decklists VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (
+                rowid,
+                decklist['id_'],
+                article_id,
+                day,
+                decklist['title'],
+                decklist['format_'],
+                decklist['archetype'],
+                decklist['best_of'],
+            ),
+        )
+        cards = [
+            (rowid, name, to_quantity(quantity), sideboard)
+            for sideboard, card_list in enumerate((decklist['deck'], decklist['sideboard'] or []))
+            for quantity, name in card_list
+        ]
+        self.connection.executemany('INSERT INTO decklist_cards VALUES (?, ?, ?, ?)', cards)
+
+    def delete(self, article_id: str) -> None:
+        """Removes an article and its content from the store"""
+        execute = self.connection.execute
+        execute(
+            'DELETE FROM decklist_cards WHERE decklist IN '
+            '(SELECT rowid FROM decklists WHERE article_id = ?)',
+            (article_id,),
+        )
+        execute('DELETE FROM decklists WHERE article_id = ?', (article_id,))
+        execute(
+            'DELETE FROM block_text WHERE rowid IN '
+            '(SELECT rowid FROM nodes WHERE article_id = ? AND item_type = \'block\')',
+            (article_id,),
+        )
+        execute('DELETE FROM nodes WHERE article_id = ?', (article_id,))
+        execute('DELETE FROM article_formats WHERE article_id = ?', (article_id,))
+        execute('DELETE FROM article_tags WHERE article_id = ?', (article_id,))
+        execute('DELETE FROM articles WHERE id = ?', (article_id,))
+
+    def find_articles(
+        self,
+        *,
+        format_: str | None = None,
+        tag: str | None = None,
+        since: str | Date | None = None,
+        until: str | Date | None = None,
+    ) -> List[sqlite3.Row]:
+        """Returns the metadata rows of the articles, newest first
+
+        Args:
+            format_ (str | None): format found in the article, see FormatHandler.
+            tag (str | None): tag of the article, in lower case.
+            since, until (str | Date | None): dates of the first and last days, included.
+        """
+        conditions, parameters = self._day_conditions(since, until)
+        if format_ is not None:
+            conditions.append('id IN (SELECT article_id FROM article_formats WHERE format = ?)')
+            parameters.append(format_)
+        if tag is not None:
+            conditions.append('id IN (SELECT article_id FROM article_tags WHERE tag = ?)')
+            parameters.append(tag)
+
+        return self._select(
+            'SELECT id, title, day, date, url, author FROM articles', conditions, parameters
+        )
+
+    def find_decklists(
+        self,
+        *,
+        format_: str | None = None,
+        card: str | None = None,
+        archetype: str | None = None,
+        since: str | Date | None = None,
+        until: str | Date | None = None,
+    ) -> List[sqlite3.Row]:
+        """Returns the decklist rows, newest first
+
+        Args:
+            format_ (str | None): format of the decklist.
+            card (str | None): name of a card of the deck or the sideboard.
+            archetype (str | None): archetype of the decklist.
+            since, until (str | Date | None): dates of the first and last days, included.
+        """
+        conditions, parameters = self._day_conditions(since, until)
+        if format_ is not None:
+            conditions.append('format = ?')
+            parameters.append(format_)
+        if archetype is not None:
+            conditions.append('archetype = ?')
+            parameters.append(archetype)
+        if card is not None:
+            conditions.append('rowid IN (SELECT decklist FROM decklist_cards WHERE card = ?)')
+            parameters.append(card)
+
+        return self._select(
+            'SELECT rowid, id, article_id, day, title, format, archetype, best_of FROM decklists',
+            conditions,
+            parameters,
+        )
+
+    def cards(self, decklist: int) -> List[Tuple[int | None, str, bool]]:
+        """Returns the (quantity, name, in sideboard) of the cards of a decklist row"""
+        return [
+            (row['quantity'], row['card'], bool(row['sideboard']))
+            for row in self.connection.execute(
+                'SELECT quantity, card, sideboard FROM decklist_cards WHERE decklist = ? '
+                'ORDER BY rowid',
+                (decklist,),
+            )
+        ]
+
+    def search(self, query: str, limit: int = 20) -> List[sqlite3.Row]:
+        """Returns the blocks matching a full-text query, such as 'sheoldred AND removal'
+
+        The rows hold the id of the block, the id of its article and an extract of its text.
+        """
+        return self.connection.execute(
+            'SELECT nodes.id, nodes.article_id, snippet(block_text, 0, \'[\', \']\', \'...\', 16) '
+            'AS snippet FROM block_text JOIN nodes ON nodes.rowid = block_text.rowid '
+            'WHERE block_text MATCH ? ORDER BY rank LIMIT ?',
+            (query, limit),
+        ).fetchall()
+
+    def load_article(self, article_id: str) -> MtgArticle | None:
+        """Rebuilds a stored article, None if the article is unknown"""
+        row = self.connection.execute(
+            'SELECT data FROM articles WHERE id = ?', (article_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        article_dict = json.loads(row['data'])
+        return MtgArticle.from_dict(  # type: ignore
+            {key: value for key, value in article_dict.items() if key in ARTICLE_FIELDS}
+        )
+
+    def hydrate(self, rows: Iterable[sqlite3.Row]) -> Generator[MtgArticle, None, None]:
+        """Lazily rebuilds the articles of article or decklist rows, each article once"""
+        seen = set()
+        for row in rows:
+            article_id = row['article_id'] if 'article_id' in row.keys() else row['id']
+            if article_id in seen:
+                continue
+            seen.add(article_id)
+            article = self.load_article(article_id)
+            if article is not None:
+                yield article
+
+    def _select(self, query: str, conditions: List[str], parameters: List) -> List[sqlite3.Row]:
+        if len(conditions) > 0:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        return self.connection.execute(f'{query} ORDER BY day DESC, rowid', parameters).fetchall()
+
+    @staticmethod
+    def _day_conditions(
+        since: str | Date | None, until: str | Date | None
+    ) -> Tuple[List[str], List]:
+        conditions, parameters = [], []
+        if since is not None:
+            conditions.append('day >= ?')
+            parameters.append(iso_day(since))
+        if until is not None:
+            conditions.append('day <= ?')
+            parameters.append(iso_day(until))
+        return conditions, parameters
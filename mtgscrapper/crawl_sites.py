@@ -0,0 +1,74 @@
+"""Crawls several sites at once, in a single CrawlerProcess
+
+Each site spider gets its own crawler, with a share of the CONCURRENT_REQUESTS of the project so
+that the sites crawled together stay within the same request budget as a single crawl. The
+concurrency of each domain is set by the SiteConfig of its spider, see SiteSpider.update_settings.
+
+Usage:
+    python -m mtgscrapper.crawl_sites mtgazone
+    python -m mtgscrapper.crawl_sites mtgazone <other site> -a parse_article=false
+"""
+
+from __future__ import annotations
+
+import argparse
+from typing import Any, Dict, List
+
+from scrapy.crawler import Crawler, CrawlerProcess
+from scrapy.settings import Settings
+from scrapy.utils.project import get_project_settings
+
+
+def crawler_settings(settings: Settings, nb_sites: int) -> Settings:
+    """Returns the settings of the crawler of a site, crawled with nb_sites - 1 other sites"""
+    site_settings = settings.copy()
+    site_settings.set(
+        'CONCURRENT_REQUESTS',
+        max(1, settings.getint('CONCURRENT_REQUESTS') // nb_sites),
+        priority=settings.getpriority('CONCURRENT_REQUESTS') or 0,
+    )
+    return site_settings
+
+
+def crawl_sites(
+    spider_names: List[str], settings: Settings | None = None, **spider_kwargs: Any
+) -> Dict[str, Dict[str, Any]]:
+    """Runs the spiders of several sites concurrently until they all finish
+
+    Args:
+        spider_names (List[str]): names of the spiders, such as 'mtgazone'.
+        settings (Settings | None): settings shared by the crawlers, the project settings if None.
+        spider_kwargs: arguments of all the spiders.
+
+    Returns:
+        The stats of the crawl of each spider.
+    """
+    settings = settings if settings is not None else get_project_settings()
+    process = CrawlerProcess(settings)
+
+    crawlers = {}
+    for name in spider_names:
+        spider_class = process.spider_loader.load(name)
+        crawlers[name] = Crawler(spider_class, crawler_settings(settings, len(spider_names)))
+        process.crawl(crawlers[name], **spider_kwargs)
+    process.start()
+
+    return {name: crawler.stats.get_stats() for name, crawler in crawlers.items()}  # type: ignore
+
+
+def main() -> None:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n', maxsplit=1)[0])
+    parser.add_argument('spiders', nargs='+', help='names of the spiders of the sites.')
+    parser.add_argument(
+        '-a', dest='arguments', action='append', default=[], help='spider argument NAME=VALUE.'
+    )
+    args = parser.parse_args()
+
+    spider_kwargs = dict(argument.split('=', maxsplit=1) for argument in args.arguments)
+    for name, stats in crawl_sites(args.spiders, **spider_kwargs).items():
+        print(f'{name}: {stats.get("item_scraped_count", 0)} items')
+
+
+if __name__ == '__main__':
+    main()
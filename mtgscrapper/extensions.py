@@ -0,0 +1,404 @@
+"""Scrapy extensions of the mtgscrapper project"""
+
+from __future__ import annotations
+
+import os
+import json
+import time
+import types
+import logging
+import functools
+from typing import Any, Dict, Iterable, List
+
+from scrapy import signals, Request, Spider
+from scrapy.core.downloader import Slot
+from scrapy.crawler import Crawler
+from scrapy.exceptions import NotConfigured
+from scrapy.http import Response
+from scrapy.utils.asyncio import create_looping_call
+from scrapy.utils.httpobj import urlparse_cached
+
+from mtgscrapper.instrumentation import SlowestProfiles, StageTimer
+
+logger = logging.getLogger(__name__)
+
+
+class ThrottleController:  # pylint: disable=too-many-instance-attributes
+    """Adjusts the delay and the number of in-flight requests of a domain from its responses
+
+    Additive increase, multiplicative decrease: the concurrency grows by one slot per response
+    while the average latency stays under target_latency, an error status (429 Too Many Requests,
+    503 Service Unavailable) halves it and doubles the delay. The delay otherwise moves towards
+    latency / concurrency, the delay at which concurrency requests are in flight.
+
+    The latency and the error rate are exponential moving averages of the responses.
+
+    Args:
+        start_delay (float): delay before the first response, in seconds.
+        min_delay (float), max_delay (float): bounds of the delay, in seconds.
+        min_concurrency (int), max_concurrency (int): bounds of the concurrency.
+        target_latency (float): average latency under which the concurrency is increased. It is
+            decreased above twice the target latency.
+        max_error_rate (float): error rate above which the crawl does not speed up.
+    """
+
+    SMOOTHING = 0.3
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        *,
+        start_delay: float = 2.0,
+        min_delay: float = 0.25,
+        max_delay: float = 60.0,
+        min_concurrency: int = 1,
+        max_concurrency: int = 8,
+        target_latency: float = 1.0,
+        max_error_rate: float = 0.05,
+    ) -> None:
+        if not 0 < min_concurrency <= max_concurrency:
+            raise ValueError('the concurrency bounds must verify 0 < min <= max.')
+        if not 0 <= min_delay <= max_delay:
+            raise ValueError('the delay bounds must verify 0 <= min <= max.')
+
+        self.min_delay, self.max_delay = min_delay, max_delay
+        self.min_concurrency, self.max_concurrency = min_concurrency, max_concurrency
+        self.target_latency = target_latency
+        self.max_error_rate = max_error_rate
+
+        self.delay = min(max(start_delay, min_delay), max_delay)
+        self.concurrency = min_concurrency
+        self.latency: float | None = None
+        self.error_rate = 0.0
+
+    def on_response(
+        self, latency: float, throttled: bool, retry_after: float | None = None
+    ) -> None:
+        """Updates the state after a response
+
+        Args:
+            latency (float): download latency of the response, in seconds.
+            throttled (bool): True if the server asked to slow down (429 or 503 status).
+            retry_after (float | None): value of the Retry-After header, in seconds.
+        """
+        self.error_rate += self.SMOOTHING * (float(throttled) - self.error_rate)
+
+        if throttled:
+            self.concurrency = max(self.min_concurrency, self.concurrency // 2)
+            self.delay = self._clamp_delay(max(2 * self.delay, self.min_delay, retry_after or 0))
+            return
+
+        # Error pages are fast, only the successful responses are used for the latency
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += self.SMOOTHING * (latency - self.latency)
+
+        if self.error_rate > self.max_error_rate:
+            return
+
+        if self.latency <= self.target_latency:
+            self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+        elif self.latency > 2 * self.target_latency:
+            self.concurrency = max(self.min_concurrency, self.concurrency - 1)
+
+        target_delay = self.latency / self.concurrency
+        self.delay = self._clamp_delay((self.delay + target_delay) / 2)
+
+    def _clamp_delay(self, delay: float) -> float:
+        return min(max(delay, self.min_delay), self.max_delay)
+
+    def state(self) -> Dict[str, float]:
+        """Returns the current delay, concurrency, latency and error rate"""
+        return {
+            'delay': self.delay,
+            'concurrency': self.concurrency,
+            'latency': self.latency if self.latency is not None else 0.0,
+            'error_rate': self.error_rate,
+        }
+
+
+class AdaptiveThrottle:
+    """Extension replacing the fixed DOWNLOAD_DELAY of some domains by a ThrottleController
+
+    The delay and the concurrency of the downloader slots of the throttled domains are updated
+    after every response. The state of each domain is exposed in the stats under
+    'adaptive_throttle/<domain>/', along with the number of responses and throttled responses.
+
+    Settings:
+        ADAPTIVE_THROTTLE_ENABLED: enables the extension (default: False).
+        ADAPTIVE_THROTTLE_DOMAINS: throttled domains, subdomains included.
+        ADAPTIVE_THROTTLE_START_DELAY, ADAPTIVE_THROTTLE_MIN_DELAY, ADAPTIVE_THROTTLE_MAX_DELAY:
+            delays in seconds.
+        ADAPTIVE_THROTTLE_MIN_CONCURRENCY, ADAPTIVE_THROTTLE_MAX_CONCURRENCY: bounds of the
+            number of in-flight requests per domain.
+        ADAPTIVE_THROTTLE_TARGET_LATENCY: latency in seconds above which the concurrency stops
+            growing.
+        ADAPTIVE_THROTTLE_MAX_ERROR_RATE: error rate above which the crawl does not speed up.
+        ADAPTIVE_THROTTLE_HTTP_CODES: statuses meaning that the server is overloaded
+            (default: [429, 503]).
+    """
+
+    def __init__(self, crawler: Crawler, domains: Iterable[str], http_codes: Iterable[int]) -> None:
+        self.crawler = crawler
+        self.settings = crawler.settings
+        self.stats = crawler.stats
+        self.domains = [domain.lower().lstrip('.') for domain in domains]
+        self.http_codes = frozenset(http_codes)
+        self.controllers: Dict[str, ThrottleController] = {}
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler) -> AdaptiveThrottle:
+        """Creates the extension, raises NotConfigured if it is disabled"""
+        settings = crawler.settings
+        if not settings.getbool('ADAPTIVE_THROTTLE_ENABLED'):
+            raise NotConfigured
+
+        domains: List[str] = settings.getlist('ADAPTIVE_THROTTLE_DOMAINS')
+        if len(domains) == 0:
+            raise NotConfigured('ADAPTIVE_THROTTLE_DOMAINS is empty.')
+
+        extension = cls(
+            crawler,
+            domains,
+            [int(code) for code in settings.getlist('ADAPTIVE_THROTTLE_HTTP_CODES', [429, 503])],
+        )
+        crawler.signals.connect(
+            extension.request_reached_downloader, signal=signals.request_reached_downloader
+        )
+        crawler.signals.connect(extension.response_downloaded, signal=signals.response_downloaded)
+        return extension
+
+    def new_controller(self) -> ThrottleController:
+        """Creates the controller of a domain from the settings"""
+        settings = self.settings
+        return ThrottleController(
+            start_delay=settings.getfloat('ADAPTIVE_THROTTLE_START_DELAY', 2.0),
+            min_delay=settings.getfloat('ADAPTIVE_THROTTLE_MIN_DELAY', 0.25),
+            max_delay=settings.getfloat('ADAPTIVE_THROTTLE_MAX_DELAY', 60.0),
+            min_concurrency=settings.getint('ADAPTIVE_THROTTLE_MIN_CONCURRENCY', 1),
+            max_concurrency=settings.getint('ADAPTIVE_THROTTLE_MAX_CONCURRENCY', 8),
+            target_latency=settings.getfloat('ADAPTIVE_THROTTLE_TARGET_LATENCY', 1.0),
+            max_error_rate=settings.getfloat('ADAPTIVE_THROTTLE_MAX_ERROR_RATE', 0.05),
+        )
+
+    def throttled_domain(self, request: Request) -> str | None:
+        """Returns the throttled domain of the request, None if its domain is not throttled"""
+        hostname = (urlparse_cached(request).hostname or '').lower()
+        for domain in self.domains:
+            if hostname == domain or hostname.endswith(f'.{domain}'):
+                return domain
+        return None
+
+    def request_reached_downloader(  # pylint: disable=unused-argument
+        self, request: Request, spider: Spider
+    ) -> None:
+        """Applies the state of the controller to the slot before the request is scheduled"""
+        domain = self.throttled_domain(request)
+        slot = self._slot(request)
+        if domain is None or slot is None:
+            return
+
+        if domain not in self.controllers:
+            self.controllers[domain] = self.new_controller()
+            self._update_stats(domain)
+        self._apply(self.controllers[domain], slot)
+
+    def response_downloaded(  # pylint: disable=unused-argument
+        self, response: Response, request: Request, spider: Spider
+    ) -> None:
+        """Updates the controller of the domain with the latency and the status of the response"""
+        domain = self.throttled_domain(request)
+        latency = request.meta.get('download_latency')
+        slot = self._slot(request)
+        if domain is None or domain not in self.controllers or latency is None or slot is None:
+            return
+
+        throttled = response.status in self.http_codes
+        controller = self.controllers[domain]
+        controller.on_response(latency, throttled, retry_after=parse_retry_after(response))
+        self._apply(controller, slot)
+
+        self.stats.inc_value(f'adaptive_throttle/{domain}/responses')
+        if throttled:
+            self.stats.inc_value(f'adaptive_throttle/{domain}/throttled')
+            logger.debug(
+                'adaptive throttle: %s answered %d, delay %.2fs, concurrency %d',
+                domain,
+                response.status,
+                controller.delay,
+                controller.concurrency,
+            )
+        self._update_stats(domain)
+
+    def _slot(self, request: Request) -> Slot | None:
+        downloader = self.crawler.engine.downloader  # type: ignore
+        key = request.meta.get(downloader.DOWNLOAD_SLOT)
+        return downloader.slots.get(key) if key is not None else None
+
+    @staticmethod
+    def _apply(controller: ThrottleController, slot: Slot) -> None:
+        slot.delay = controller.delay
+        slot.concurrency = controller.concurrency
+
+    def _update_stats(self, domain: str) -> None:
+        for key, value in self.controllers[domain].state().items():
+            self.stats.set_value(f'adaptive_throttle/{domain}/{key}', value)
+        self.stats.max_value(
+            f'adaptive_throttle/{domain}/max_delay', self.controllers[domain].delay
+        )
+        self.stats.max_value(
+            f'adaptive_throttle/{domain}/max_concurrency', self.controllers[domain].concurrency
+        )
+
+
+def parse_retry_after(response: Response) -> float | None:
+    """Returns the number of seconds of the Retry-After header, None if absent or an HTTP date"""
+    value = response.headers.get('Retry-After')
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+class Instrumentation:  # pylint: disable=too-many-instance-attributes
+    """Extension measuring where the time of a crawl goes, the network or the parsing
+
+    The stages of the spider are timed (see mtgscrapper.instrumentation), and the stats get, under
+    'instrumentation/':
+    - '<stage>/calls', '<stage>/wall_time' and '<stage>/cpu_time' for each stage,
+    - 'items_per_second', 'bytes_downloaded', 'queue_depth' and 'max_queue_depth'.
+
+    The extension is disabled by default, the spider is then left untouched.
+
+    Settings:
+        INSTRUMENTATION_ENABLED: enables the extension (default: False).
+        INSTRUMENTATION_STAGES: dotted paths of the timed methods from the spider.
+        INSTRUMENTATION_DUMP_PATH: JSON lines file to which a snapshot of the measures is appended
+            periodically and when the spider closes (default: None).
+        INSTRUMENTATION_DUMP_INTERVAL: seconds between two snapshots, 0 to only write the last one.
+        INSTRUMENTATION_PROFILE_SLOWEST: number of slowest articles whose cProfile profile is
+            kept, every article is then profiled (default: 0).
+        INSTRUMENTATION_PROFILE_DIR: directory of the '.prof' files of the slowest articles.
+    """
+
+    PROFILED_STAGE = 'parse_article_content'
+
+    def __init__(self, crawler: Crawler, stages: Iterable[str]) -> None:
+        settings = crawler.settings
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.stages = list(stages)
+        self.timer = StageTimer()
+
+        self.dump_path: str | None = settings.get('INSTRUMENTATION_DUMP_PATH')
+        self.dump_interval = settings.getfloat('INSTRUMENTATION_DUMP_INTERVAL', 60.0)
+        nb_profiles = settings.getint('INSTRUMENTATION_PROFILE_SLOWEST', 0)
+        self.profiles = SlowestProfiles(nb_profiles) if nb_profiles > 0 else None
+        self.profile_dir = settings.get('INSTRUMENTATION_PROFILE_DIR', 'profiles')
+
+        self.start_time = time.perf_counter()
+        self.task: Any = None
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler) -> Instrumentation:
+        """Creates the extension, raises NotConfigured if it is disabled"""
+        settings = crawler.settings
+        if not settings.getbool('INSTRUMENTATION_ENABLED'):
+            raise NotConfigured
+
+        extension = cls(crawler, settings.getlist('INSTRUMENTATION_STAGES'))
+        crawler.signals.connect(extension.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(extension.spider_closed, signal=signals.spider_closed)
+        crawler.signals.connect(extension.response_downloaded, signal=signals.response_downloaded)
+        return extension
+
+    def spider_opened(self, spider: Spider) -> None:
+        """Instruments the stages of the spider and starts the periodic snapshots"""
+        self.start_time = time.perf_counter()
+        if self.profiles is not None and hasattr(spider, self.PROFILED_STAGE):
+            self._profile_articles(spider)
+
+        for stage in self.stages:
+            if not self.timer.instrument(spider, stage, stage=stage.rsplit('.', 1)[-1]):
+                logger.warning('instrumentation: %s has no method %s.', spider.name, stage)
+
+        if self.dump_path is not None and self.dump_interval > 0:
+            self.task = create_looping_call(self.dump)
+            self.task.start(self.dump_interval, now=False)
+
+    def _profile_articles(self, spider: Spider) -> None:
+        profiles = self.profiles
+        method = getattr(spider, self.PROFILED_STAGE)
+
+        @functools.wraps(method.__func__)
+        def profiled(spider: Spider, response: Response, *args: Any, **kwargs: Any) -> Any:
+            article = kwargs.get('article', args[0] if len(args) > 0 else None)
+            key = getattr(article, 'id_', None) or response.url
+            return profiles.call(  # type: ignore[union-attr]
+                key, method.__func__, spider, response, *args, **kwargs
+            )
+
+        setattr(spider, self.PROFILED_STAGE, types.MethodType(profiled, spider))
+
+    def response_downloaded(  # pylint: disable=unused-argument
+        self, response: Response, request: Request, spider: Spider
+    ) -> None:
+        """Counts the downloaded bytes and samples the number of scheduled requests"""
+        self.stats.inc_value('instrumentation/bytes_downloaded', len(response.body))
+        queue_depth = self.queue_depth()
+        if queue_depth is not None:
+            self.stats.set_value('instrumentation/queue_depth', queue_depth)
+            self.stats.max_value('instrumentation/max_queue_depth', queue_depth)
+
+    def queue_depth(self) -> int | None:
+        """Returns the number of requests waiting in the scheduler, None if unknown"""
+        engine = self.crawler.engine
+        slot = getattr(engine, '_slot', None) or getattr(engine, 'slot', None)
+        if slot is None or slot.scheduler is None:
+            return None
+        try:
+            return len(slot.scheduler)
+        except TypeError:
+            return None
+
+    def update_stats(self) -> Dict[str, Any]:
+        """Writes the measures to the stats, returns them"""
+        for stage, totals in self.timer.summary().items():
+            for key, value in totals.items():
+                self.stats.set_value(f'instrumentation/{stage}/{key}', value)
+
+        elapsed = time.perf_counter() - self.start_time
+        items_per_second = self.stats.get_value('item_scraped_count', 0) / max(elapsed, 1e-9)
+        self.stats.set_value('instrumentation/items_per_second', items_per_second)
+
+        return {
+            key: value
+            for key, value in self.stats.get_stats().items()
+            if key.startswith('instrumentation/')
+        }
+
+    def dump(self) -> None:
+        """Appends a snapshot of the measures to the dump file"""
+        snapshot = {'time': time.time(), **self.update_stats()}
+        with open(self.dump_path, 'a', encoding='utf-8') as dump_file:  # type: ignore[arg-type]
+            dump_file.write(json.dumps(snapshot) + '\n')
+
+    def spider_closed(self, spider: Spider, reason: str) -> None:  # pylint: disable=unused-argument
+        """Writes the final measures and the profiles of the slowest articles"""
+        if self.task is not None and self.task.running:
+            self.task.stop()
+
+        if self.dump_path is not None:
+            self.dump()
+        else:
+            self.update_stats()
+
+        if self.profiles is not None:
+            paths = self.profiles.dump(self.profile_dir)
+            logger.info(
+                'instrumentation: profiles of the %d slowest articles written to %s',
+                len(paths),
+                os.path.abspath(self.profile_dir),
+            )
@@ -0,0 +1,420 @@
+"""Shared frontier of a distributed crawl, several worker processes or nodes crawling one site
+
+The workers share the queue of the requests to crawl and the set of the requests already seen,
+stored in a Frontier backend:
+- SqliteFrontier: a SQLite file, for the workers of one machine or of a shared disk,
+- RedisFrontier: a Redis database, for the workers of several nodes, needs the redis package.
+
+A request is queued once for all the workers, identified by its Scrapy fingerprint. A worker
+claims the request of highest priority, and its claims are done once it is idle: all its requests
+were downloaded and parsed, and the requests they led to were queued. An idle worker looks for new
+requests at each heartbeat of the Scrapy engine, every 5 seconds. The crawl is finished when no
+request is queued nor claimed. The claims of a worker without news for FRONTIER_LEASE seconds, such
+as a crashed worker, are queued again.
+
+Each worker gets a share of the politeness budget of each domain, see DistributedCrawl: with
+FRONTIER_WORKERS workers, the concurrency of a domain is divided and its delay multiplied by their
+number, so that the workers together crawl a site as fast as a single crawl.
+
+Usage, in as many shells or nodes as FRONTIER_WORKERS:
+    scrapy crawl mtgazone -s FRONTIER_URI=sqlite:///crawls/frontier.sqlite -s FRONTIER_WORKERS=2
+"""
+
+from __future__ import annotations
+
+import os
+import abc
+import time
+import pickle  # nosec
+import socket
+import sqlite3
+from typing import Any, Dict
+
+from scrapy import signals
+from scrapy.core.scheduler import BaseScheduler
+from scrapy.crawler import Crawler
+from scrapy.exceptions import DontCloseSpider, NotConfigured
+from scrapy.http import Request
+from scrapy.settings import BaseSettings
+from scrapy.utils.request import request_from_dict
+
+try:
+    import redis
+except ImportError:  # pragma: no cover
+    redis = None
+
+PENDING, CLAIMED, DONE = 0, 1, 2
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS requests (
+    fingerprint TEXT PRIMARY KEY,
+    priority INTEGER,
+    state INTEGER,
+    worker TEXT,
+    data BLOB
+);
+CREATE INDEX IF NOT EXISTS requests_state ON requests (state, priority DESC);
+CREATE TABLE IF NOT EXISTS workers (worker TEXT PRIMARY KEY, heartbeat REAL);
+'''
+
+
+class Frontier(abc.ABC):
+    """Queue of the requests of a crawl and set of the requests already seen, shared by workers
+
+    The requests are identified by their fingerprint and stored as bytes, see FrontierScheduler.
+
+    Args:
+        lease (float): seconds without news of a worker after which its claims are queued again.
+    """
+
+    def __init__(self, lease: float = 300.0) -> None:
+        self.lease = lease
+
+    @abc.abstractmethod
+    def add(self, fingerprint: str, priority: int, data: bytes, worker: str | None = None) -> bool:
+        """Queues a request never seen before, returns False if it was already seen
+
+        A request claimed by the given worker is queued again, such as a retried request.
+        """
+
+    @abc.abstractmethod
+    def claim(self, worker: str) -> bytes | None:
+        """Returns the queued request of highest priority and marks it as claimed by the worker
+
+        The requests of the same priority are claimed in the order they were queued. The claims of
+        the workers without news for lease seconds are queued again first.
+        """
+
+    @abc.abstractmethod
+    def release(self, worker: str, done: bool = True) -> None:
+        """Marks the claims of a worker as done, or queues them again if done is False"""
+
+    @abc.abstractmethod
+    def heartbeat(self, worker: str) -> None:
+        """Tells the other workers that a worker is alive"""
+
+    @abc.abstractmethod
+    def nb_pending(self) -> int:
+        """Returns the number of queued requests"""
+
+    @abc.abstractmethod
+    def nb_claimed(self) -> int:
+        """Returns the number of claimed requests, being crawled by the workers"""
+
+    def is_finished(self) -> bool:
+        """Returns True if no request is queued nor claimed"""
+        return self.nb_pending() == 0 and self.nb_claimed() == 0
+
+    def close(self) -> None:
+        """Closes the connection to the backend"""
+
+
+class SqliteFrontier(Frontier):
+    """Frontier stored in a SQLite file, shared by the processes which can open it
+
+    Each statement is its own transaction, the claim of a request is a single UPDATE so that two
+    workers never claim the same request.
+
+    Args:
+        path (str): path of the SQLite database, created if needed.
+        lease (float): see Frontier.
+    """
+
+    def __init__(self, path: str, lease: float = 300.0) -> None:
+        super().__init__(lease)
+        self.path = path
+        self.connection = sqlite3.connect(path, timeout=60.0, isolation_level=None)
+        # Readers do not block the writer, the workers mostly read the queue
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.executescript(SCHEMA)
+
+    def add(self, fingerprint: str, priority: int, data: bytes, worker: str | None = None) -> bool:
+        cursor = self.connection.execute(
+            'INSERT INTO requests VALUES (?, ?, ?, NULL, ?) ON CONFLICT (fingerprint) DO UPDATE '
+            'SET state = excluded.state, worker = NULL, priority = excluded.priority, '
+            'data = excluded.data WHERE state = ? AND worker = ?',
+            (fingerprint, priority, PENDING, data, CLAIMED, worker),
+        )
+        return cursor.rowcount > 0
+
+    def claim(self, worker: str) -> bytes | None:
+        self.heartbeat(worker)
+        self.connection.execute(
+            'UPDATE requests SET state = ?, worker = NULL WHERE state = ? AND worker IN '
+            '(SELECT worker FROM workers WHERE heartbeat < ? AND worker != ?)',
+            (PENDING, CLAIMED, time.time() - self.lease, worker),
+        )
+        row = self.connection.execute(
+            'UPDATE requests SET state = ?, worker = ? WHERE rowid = (SELECT rowid FROM requests '
+            'WHERE state = ? ORDER BY priority DESC, rowid LIMIT 1) RETURNING data',
+            (CLAIMED, worker, PENDING),
+        ).fetchone()
+        return row[0] if row is not None else None
+
+    def release(self, worker: str, done: bool = True) -> None:
+        self.heartbeat(worker)
+        if done:
+            # Only the fingerprints of the requests done are kept, to dedup the next ones
+            self.connection.execute(
+                'UPDATE requests SET state = ?, worker = NULL, data = NULL '
+                'WHERE state = ? AND worker = ?',
+                (DONE, CLAIMED, worker),
+            )
+        else:
+            self.connection.execute(
+                'UPDATE requests SET state = ?, worker = NULL WHERE state = ? AND worker = ?',
+                (PENDING, CLAIMED, worker),
+            )
+
+    def heartbeat(self, worker: str) -> None:
+        self.connection.execute(
+            'INSERT OR REPLACE INTO workers VALUES (?, ?)', (worker, time.time())
+        )
+
+    def nb_pending(self) -> int:
+        return self._count(PENDING)
+
+    def nb_claimed(self) -> int:
+        return self._count(CLAIMED)
+
+    def _count(self, state: int) -> int:
+        return self.connection.execute(
+            'SELECT COUNT(*) FROM requests WHERE state = ?', (state,)
+        ).fetchone()[0]
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+# Pops the request of lowest score, moves it to the claims of a worker and returns its data
+REDIS_CLAIM = '''
+local popped = redis.call('ZPOPMIN', KEYS[1])
+if #popped == 0 then
+    return false
+end
+redis.call('HSET', KEYS[2], popped[1], ARGV[1])
+redis.call('HSET', KEYS[3], popped[1], popped[2])
+return redis.call('HGET', KEYS[4], popped[1])
+'''
+
+
+class RedisFrontier(Frontier):
+    """Frontier stored in a Redis database, shared by the workers of several nodes
+
+    The keys of the frontier start with a prefix:
+    - <prefix>:seen, set of the fingerprints of the requests seen,
+    - <prefix>:pending, sorted set of the queued fingerprints by priority then queuing order,
+    - <prefix>:claims and <prefix>:scores, hashes of the worker and the score of each claim,
+    - <prefix>:data, hash of the requests, <prefix>:workers, hash of the heartbeats.
+
+    Args:
+        url (str): URL of the database, such as 'redis://localhost:6379/0'.
+        prefix (str): prefix of the keys, one per crawl.
+        lease (float): see Frontier.
+    """
+
+    def __init__(self, url: str, prefix: str = 'frontier', lease: float = 300.0) -> None:
+        if redis is None:
+            raise NotConfigured('the redis package is needed by a Redis frontier.')
+        super().__init__(lease)
+        self.client = redis.Redis.from_url(url)
+        self.keys = {
+            name: f'{prefix}:{name}'
+            for name in ('seen', 'pending', 'claims', 'scores', 'data', 'workers', 'order')
+        }
+        self.claim_script = self.client.register_script(REDIS_CLAIM)
+
+    def score(self, priority: int) -> float:
+        """Returns the score of a request, the higher priorities and older requests come first"""
+        return -priority * 2**32 + self.client.incr(self.keys['order'])
+
+    def add(self, fingerprint: str, priority: int, data: bytes, worker: str | None = None) -> bool:
+        keys = self.keys
+        if self.client.sadd(keys['seen'], fingerprint) == 0:
+            if worker is None or self.client.hget(keys['claims'], fingerprint) != worker.encode():
+                return False
+            self.client.hdel(keys['claims'], fingerprint)
+            self.client.hdel(keys['scores'], fingerprint)
+        self.client.hset(keys['data'], fingerprint, data)
+        self.client.zadd(keys['pending'], {fingerprint: self.score(priority)})
+        return True
+
+    def claim(self, worker: str) -> bytes | None:
+        self.heartbeat(worker)
+        expired = time.time() - self.lease
+        for name, heartbeat in self.client.hgetall(self.keys['workers']).items():
+            if float(heartbeat) < expired and name != worker.encode():
+                self.release(name.decode(), done=False)
+        keys = self.keys
+        return self.claim_script(
+            keys=[keys['pending'], keys['claims'], keys['scores'], keys['data']], args=[worker]
+        )
+
+    def release(self, worker: str, done: bool = True) -> None:
+        keys = self.keys
+        claims = [
+            fingerprint
+            for fingerprint, name in self.client.hscan_iter(keys['claims'])
+            if name == worker.encode()
+        ]
+        if len(claims) == 0:
+            return
+        if done:
+            self.client.hdel(keys['data'], *claims)
+        else:
+            scores = self.client.hmget(keys['scores'], claims)
+            self.client.zadd(keys['pending'], dict(zip(claims, map(float, scores))))
+        self.client.hdel(keys['scores'], *claims)
+        self.client.hdel(keys['claims'], *claims)
+
+    def heartbeat(self, worker: str) -> None:
+        self.client.hset(self.keys['workers'], worker, time.time())
+
+    def nb_pending(self) -> int:
+        return self.client.zcard(self.keys['pending'])
+
+    def nb_claimed(self) -> int:
+        return self.client.hlen(self.keys['claims'])
+
+    def close(self) -> None:
+        self.client.close()
+
+
+def open_frontier(uri: str, lease: float = 300.0) -> Frontier:
+    """Opens the frontier of a URI: 'redis://...', 'sqlite:///<path>' or a SQLite file path"""
+    if uri.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisFrontier(uri, lease=lease)
+    return SqliteFrontier(uri.removeprefix('sqlite:///'), lease=lease)
+
+
+class FrontierScheduler(BaseScheduler):
+    """Scrapy scheduler queuing the requests in the frontier shared by the workers of a crawl
+
+    The requests are pickled like the requests of the disk queues of Scrapy, see JOBDIR, their
+    callbacks must be methods of the spider. When the worker is idle, its claims are done and it
+    waits for the requests of the other workers until the crawl is finished. A worker stopped
+    before the end of the crawl queues its claims again.
+    """
+
+    def __init__(self, crawler: Crawler, frontier: Frontier, worker: str) -> None:
+        self.crawler = crawler
+        self.frontier = frontier
+        self.worker = worker
+        self.spider: Any = None
+        if crawler.request_fingerprinter is None:
+            raise RuntimeError('the crawler has no request fingerprinter, see Crawler.crawl.')
+        self.fingerprinter = crawler.request_fingerprinter
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler) -> FrontierScheduler:
+        settings = crawler.settings
+        uri = settings.get('FRONTIER_URI')
+        if uri is None:
+            raise ValueError('the FRONTIER_URI setting is needed by the FrontierScheduler.')
+        worker = settings.get('FRONTIER_WORKER_ID') or f'{socket.gethostname()}-{os.getpid()}'
+        scheduler = cls(
+            crawler, open_frontier(uri, lease=settings.getfloat('FRONTIER_LEASE', 300.0)), worker
+        )
+        crawler.signals.connect(scheduler.spider_idle, signal=signals.spider_idle)
+        return scheduler
+
+    def __len__(self) -> int:
+        return self.frontier.nb_pending()
+
+    def open(self, spider: Any) -> None:
+        self.spider = spider
+        self.frontier.heartbeat(self.worker)
+
+    def close(self, reason: str) -> None:
+        self.frontier.release(self.worker, done=reason == 'finished')
+        self.frontier.close()
+
+    def has_pending_requests(self) -> bool:
+        return self.frontier.nb_pending() > 0
+
+    def enqueue_request(self, request: Request) -> bool:
+        added = self.frontier.add(
+            self.fingerprinter.fingerprint(request).hex(),
+            request.priority,
+            pickle.dumps(request.to_dict(spider=self.spider), protocol=4),
+            worker=self.worker if request.dont_filter else None,
+        )
+        self.inc_stats('frontier/enqueued' if added else 'frontier/duplicates')
+        return added
+
+    def next_request(self) -> Request | None:
+        data = self.frontier.claim(self.worker)
+        if data is None:
+            return None
+        self.inc_stats('frontier/claimed')
+        return request_from_dict(pickle.loads(data), spider=self.spider)  # nosec
+
+    def spider_idle(self, spider: Any) -> None:  # pylint: disable=unused-argument
+        """Marks the claims of the worker as done, keeps it open until the crawl is finished"""
+        self.frontier.release(self.worker)
+        if not self.frontier.is_finished():
+            raise DontCloseSpider
+
+    def inc_stats(self, key: str) -> None:
+        """Increments a stat of the crawl"""
+        if self.crawler.stats is not None:
+            self.crawler.stats.inc_value(key)
+
+
+class DistributedCrawl:
+    """Scrapy add-on crawling with the FrontierScheduler when the FRONTIER_URI setting is set
+
+    Splits the politeness budget of the domains among the FRONTIER_WORKERS workers: the
+    concurrency of the crawl, of each domain and of the adaptive throttling are divided by the
+    number of workers and the delays multiplied by it, the concurrency staying at least 1.
+    """
+
+    def __init__(self, crawler: Crawler) -> None:
+        if crawler.settings.get('FRONTIER_URI') is None:
+            raise NotConfigured
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler) -> DistributedCrawl:
+        """Creates the add-on, disabled unless the FRONTIER_URI setting is set"""
+        return cls(crawler)
+
+    def update_settings(self, settings: BaseSettings) -> None:
+        """Sets the scheduler and the budget of a worker"""
+        settings.set('SCHEDULER', 'mtgscrapper.frontier.FrontierScheduler', priority='addon')
+        nb_workers = settings.getint('FRONTIER_WORKERS', 1)
+        if nb_workers <= 1:
+            return
+
+        def share(name: str, default: int) -> int:
+            return max(1, settings.getint(name, default) // nb_workers)
+
+        max_concurrency = share('ADAPTIVE_THROTTLE_MAX_CONCURRENCY', 8)
+        max_delay = settings.getfloat('ADAPTIVE_THROTTLE_MAX_DELAY', 60.0)
+        budget: Dict[str, Any] = {
+            'DOWNLOAD_DELAY': settings.getfloat('DOWNLOAD_DELAY') * nb_workers,
+            # A worker claims as many requests as it downloads at once, not more
+            'CONCURRENT_REQUESTS': share('CONCURRENT_REQUESTS', 16),
+            'CONCURRENT_REQUESTS_PER_DOMAIN': share('CONCURRENT_REQUESTS_PER_DOMAIN', 8),
+            'ADAPTIVE_THROTTLE_MIN_CONCURRENCY': min(
+                settings.getint('ADAPTIVE_THROTTLE_MIN_CONCURRENCY', 1), max_concurrency
+            ),
+            'ADAPTIVE_THROTTLE_MAX_CONCURRENCY': max_concurrency,
+        }
+        for name, default in (
+            ('ADAPTIVE_THROTTLE_START_DELAY', 2.0),
+            ('ADAPTIVE_THROTTLE_MIN_DELAY', 0.25),
+        ):
+            budget[name] = min(settings.getfloat(name, default) * nb_workers, max_delay)
+
+        slots: Dict[str, Dict[str, Any]] = {}
+        for domain, slot in settings.getdict('DOWNLOAD_SLOTS').items():
+            slots[domain] = dict(slot)
+            if 'concurrency' in slot:
+                slots[domain]['concurrency'] = max(1, int(slot['concurrency']) // nb_workers)
+            if 'delay' in slot:
+                slots[domain]['delay'] = float(slot['delay']) * nb_workers
+        budget['DOWNLOAD_SLOTS'] = slots
+
+        # Set with the priority of the current values, such as the project or command line ones
+        for name, value in budget.items():
+            settings.set(name, value, priority=settings.getpriority(name) or 0)
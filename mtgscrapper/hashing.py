@@ -0,0 +1,194 @@
+"""Stable hashes of the content of the articles, to detect unchanged and edited articles
+
+The hash of an article covers its content tree only: the text of the blocks, the cards of the
+decklists and the titles and levels of the sections. The random ids, the dates, the lengths and the
+formats found by the FormatHandler are left out, so that two crawls of the same page give the same
+hash. The hash of a node is computed from the hashes of its children, like a Merkle tree, so the
+top-level sections that changed between two versions of an article can be found from their hashes.
+
+The same hashes give stable ids to the sections, blocks and decklists of an article, see
+assign_content_ids, in place of the random uuid4 ids of the MtgItem classes.
+"""
+
+from __future__ import annotations
+
+import os
+import json
+import hashlib
+from typing import Any, Dict, List, Tuple
+
+DIGEST_SIZE = 16
+
+
+def _fields(node: Any) -> Dict[str, Any]:
+    """Returns the fields of an item, either a MtgItem or its dictionary"""
+    return node if isinstance(node, dict) else vars(node)
+
+
+def normalize_text(text: str | None) -> str:
+    """Collapses the whitespaces of a text, which change between two renderings of a page"""
+    return ' '.join(text.split()) if text is not None else ''
+
+
+def _digest(*parts: str) -> bytes:
+    # The normalized texts and the hexadecimal digests never contain NUL characters
+    serialized = '\0'.join(parts).encode('utf-8')
+    return hashlib.blake2b(serialized, digest_size=DIGEST_SIZE).digest()
+
+
+def _cards(card_list: List | None) -> str:
+    return '\n'.join(f'{quantity} {name}' for quantity, name in card_list or [])
+
+
+def node_digest(node: Any) -> bytes:
+    """Returns the digest of a section, block or decklist, or of the content of an article"""
+    fields = _fields(node)
+    match fields['item_type']:
+        case 'block':
+            return _digest('block', normalize_text(fields['text']))
+        case 'decklist':
+            return _digest(
+                'decklist',
+                normalize_text(fields['title']),
+                _cards(fields['deck']),
+                _cards(fields['sideboard']),
+                str(fields['archetype']),
+                str(fields['best_of']),
+            )
+        case 'section':
+            return _section_digest(fields, child_digests(node))
+        case 'article':
+            return _digest('article', *child_digests(node))
+    raise ValueError(f'unknown item type {fields["item_type"]}.')
+
+
+def _section_digest(fields: Dict[str, Any], children: List[str]) -> bytes:
+    return _digest('section', normalize_text(fields['title']), str(fields['level']), *children)
+
+
+def child_digests(node: Any) -> List[str]:
+    """Returns the hexadecimal digests of the content of an article or a section"""
+    return [node_digest(child).hex() for child in _fields(node)['content']]
+
+
+def content_hash(article: Any) -> Tuple[str, List[str]]:
+    """Returns the hash of the content of an article and the hashes of its top-level content"""
+    children = child_digests(article)
+    return _digest('article', *children).hex(), children
+
+
+def assign_content_ids(article: Any) -> Tuple[str, List[str]]:
+    """Replaces the ids of the content of an article by ids derived from the article id
+
+    The id of a node is '<article id>/<position>/<hash>', the position being the indices of the node
+    and of its parent sections, such as '3.0.2', and the hash the first 12 hexadecimal digits of its
+    content hash. An unchanged node at the same position keeps its id from one crawl to another.
+    Computes the hashes in a single pass, and returns the same value as content_hash.
+    """
+    children = _assign_ids(_fields(article), f'{_fields(article)["id_"]}/')
+    return _digest('article', *children).hex(), children
+
+
+def assign_node_ids(node: Any, article_id: str, position: int) -> str:
+    """Gives content ids to a top-level node of an article and its content, returns its digest
+
+    See assign_content_ids, lets the sections of an article get their ids as they are parsed.
+    """
+    return _assign_node_id(_fields(node), f'{article_id}/', position)
+
+
+def _assign_ids(fields: Dict[str, Any], prefix: str) -> List[str]:
+    return [
+        _assign_node_id(_fields(child), prefix, position)
+        for position, child in enumerate(fields['content'])
+    ]
+
+
+def _assign_node_id(fields: Dict[str, Any], prefix: str, position: int) -> str:
+    if fields['item_type'] == 'section':
+        digest = _section_digest(fields, _assign_ids(fields, f'{prefix}{position}.'))
+    else:
+        digest = node_digest(fields)
+    hex_digest = digest.hex()
+    fields['id_'] = f'{prefix}{position}/{hex_digest[:12]}'
+    return hex_digest
+
+
+class ContentHashIndex:
+    """Persistent index of the content hashes of the articles
+
+    The index maps the id of an article to the hash of its content, its version number and the
+    short hashes of its top-level sections, blocks and decklists. It is stored as a JSON file,
+    written atomically like the SeenArticleIndex.
+    """
+
+    SHORT_HASH_SIZE = 16
+
+    def __init__(self, path: str | None = None) -> None:
+        self.path = path
+        self.articles: Dict[str, Dict[str, Any]] = {}
+        self.hashes: Dict[str, str] = {}
+
+        if path is not None and os.path.exists(path):
+            self.load()
+
+    def __contains__(self, article_id: str) -> bool:
+        return article_id in self.articles
+
+    def __len__(self) -> int:
+        return len(self.articles)
+
+    def is_unchanged(self, article_id: str, hash_: str) -> bool:
+        """Returns True if the article is known with the same content hash"""
+        entry = self.articles.get(article_id)
+        return entry is not None and entry['hash'] == hash_
+
+    def owner(self, hash_: str) -> str | None:
+        """Returns the id of the article having this content hash, None if the hash is unknown"""
+        return self.hashes.get(hash_)
+
+    def update(
+        self, article_id: str, hash_: str, children: List[str]
+    ) -> Tuple[int, List[int] | None]:
+        """Stores the hash of an article
+
+        Returns:
+            The version of the article, 1 for a new article and incremented at each change, and
+            the indices of its top-level content that did not exist in the previous version. The
+            indices are None for a new or unchanged article.
+        """
+        short_children = [child[: self.SHORT_HASH_SIZE] for child in children]
+        entry = self.articles.get(article_id)
+        if entry is None:
+            version, changed = 1, None
+        elif entry['hash'] == hash_:
+            return entry['version'], None
+        else:
+            version = entry['version'] + 1
+            old_children = set(entry['children'])
+            changed = [i for i, child in enumerate(short_children) if child not in old_children]
+            self.hashes.pop(entry['hash'], None)
+
+        self.articles[article_id] = {'hash': hash_, 'version': version, 'children': short_children}
+        self.hashes[hash_] = article_id
+        return version, changed
+
+    def load(self) -> None:
+        """Loads the index from its JSON file"""
+        if self.path is None:
+            raise ValueError('cannot load a content hash index without a path.')
+
+        with open(self.path, 'r', encoding='utf-8') as json_file:
+            self.articles = json.load(json_file)
+
+        self.hashes = {entry['hash']: article_id for article_id, entry in self.articles.items()}
+
+    def save(self) -> None:
+        """Writes the index to its JSON file, through a temporary file"""
+        if self.path is None:
+            raise ValueError('cannot save a content hash index without a path.')
+
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as json_file:
+            json.dump(self.articles, json_file, separators=(',', ':'))
+        os.replace(tmp_path, self.path)
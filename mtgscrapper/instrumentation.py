@@ -0,0 +1,151 @@
+"""Wall and CPU time of the stages of the spider, and profiles of the slowest articles
+
+The stages are methods of an object, such as the callbacks of a spider, that are replaced on the
+instance by timed wrappers: nothing is measured, and nothing costs anything, until a method is
+instrumented. The time of a generator callback, such as Spider.parse, is the time spent in its
+iterations, not the time to create it. The times of nested stages are included in the time of the
+stage calling them.
+
+See the Instrumentation extension of mtgscrapper.extensions to enable it during a crawl.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+import heapq
+import types
+import cProfile
+import functools
+from typing import Any, Callable, Dict, Generator, List, Tuple
+
+
+class StageTimer:
+    """Accumulates the number of calls, the wall time and the CPU time of named stages"""
+
+    def __init__(self) -> None:
+        self.stages: Dict[str, List[float]] = {}
+
+    def record(self, stage: str, wall_time: float, cpu_time: float, calls: int = 1) -> None:
+        """Adds the times of calls to a stage"""
+        totals = self.stages.setdefault(stage, [0, 0.0, 0.0])
+        totals[0] += calls
+        totals[1] += wall_time
+        totals[2] += cpu_time
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Returns the calls, wall time and CPU time of each stage, the times in seconds"""
+        return {
+            stage: {'calls': calls, 'wall_time': wall_time, 'cpu_time': cpu_time}
+            for stage, (calls, wall_time, cpu_time) in self.stages.items()
+        }
+
+    def wrap(self, stage: str, func: Callable) -> Callable:
+        """Returns a function timing the calls to func, and the iterations of its generators"""
+
+        @functools.wraps(func)
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            wall_start, cpu_start = time.perf_counter(), time.process_time()
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                self.record(
+                    stage, time.perf_counter() - wall_start, time.process_time() - cpu_start
+                )
+            if isinstance(result, types.GeneratorType):
+                return self._timed_generator(stage, result)
+            return result
+
+        return timed
+
+    def _timed_generator(self, stage: str, generator: Generator) -> Generator:
+        wall_time, cpu_time = 0.0, 0.0
+        try:
+            while True:
+                wall_start, cpu_start = time.perf_counter(), time.process_time()
+                try:
+                    value = next(generator)
+                except StopIteration as stop:
+                    return stop.value
+                finally:
+                    wall_time += time.perf_counter() - wall_start
+                    cpu_time += time.process_time() - cpu_start
+                yield value
+        finally:
+            # The call itself was already counted by the wrapper
+            self.record(stage, wall_time, cpu_time, calls=0)
+
+    def instrument(self, obj: Any, path: str, stage: str | None = None) -> bool:
+        """Replaces a method of an object by a timed method, on the instance only
+
+        Args:
+            obj (Any): object owning the method, such as a spider.
+            path (str): dotted path of the method from the object, such as
+                'format_handler.process_article'.
+            stage (str | None): name of the stage, the name of the method if not given.
+
+        Returns:
+            False if the object has no such method.
+        """
+        *owner_path, name = path.split('.')
+        owner = obj
+        for attribute in owner_path:
+            owner = getattr(owner, attribute, None)
+        method = getattr(owner, name, None)
+        if not isinstance(method, types.MethodType):
+            return False
+
+        # The wrapper stays a method of the same name, so that Scrapy can still find the callbacks
+        # of the requests from their names when they are serialized, see JOBDIR
+        timed = self.wrap(stage or name, method.__func__)
+        setattr(owner, name, types.MethodType(timed, owner))
+        return True
+
+
+class SlowestProfiles:
+    """Profiles calls with cProfile and keeps the profiles of the slowest ones
+
+    Args:
+        nb_profiles (int): number of profiles to keep.
+    """
+
+    def __init__(self, nb_profiles: int) -> None:
+        self.nb_profiles = nb_profiles
+        # Min-heap of (wall time, counter, key, profile), the fastest kept profile first
+        self.heap: List[Tuple[float, int, str, cProfile.Profile]] = []
+        self.counter = 0
+
+    def call(self, key: str, func: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Calls func under the profiler, keeps the profile if it is one of the slowest"""
+        profile = cProfile.Profile()
+        wall_start = time.perf_counter()
+        try:
+            return profile.runcall(func, *args, **kwargs)
+        finally:
+            self._keep(time.perf_counter() - wall_start, key, profile)
+
+    def _keep(self, wall_time: float, key: str, profile: cProfile.Profile) -> None:
+        self.counter += 1
+        entry = (wall_time, self.counter, key, profile)
+        if len(self.heap) < self.nb_profiles:
+            heapq.heappush(self.heap, entry)
+        elif wall_time > self.heap[0][0]:
+            heapq.heapreplace(self.heap, entry)
+
+    def slowest(self) -> List[Tuple[str, float]]:
+        """Returns the (key, wall time) of the kept profiles, slowest first"""
+        return [(key, wall_time) for wall_time, _, key, _ in sorted(self.heap, reverse=True)]
+
+    def dump(self, directory: str) -> List[str]:
+        """Writes the kept profiles as '<rank>-<key>.prof' files, returns their paths
+
+        The files can be read with pstats or snakeviz.
+        """
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for rank, (_, _, key, profile) in enumerate(sorted(self.heap, reverse=True), start=1):
+            safe_key = ''.join(char if char.isalnum() or char in '-_' else '_' for char in key)
+            path = os.path.join(directory, f'{rank:03d}-{safe_key}.prof')
+            profile.dump_stats(path)
+            paths.append(path)
+        return paths
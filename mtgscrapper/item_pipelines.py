@@ -0,0 +1,254 @@
+"""Item pipelines exporting the scraped articles, see ITEM_PIPELINES
+
+- ContentDedupPipeline drops the articles whose content did not change since the previous crawl,
+- CorpusStorePipeline stores the articles in an indexed SQLite database,
+- JsonLinesExportPipeline streams the items to compressed JSONL files.
+"""
+
+from __future__ import annotations
+
+import re
+from datetime import date as Date
+from typing import Any, List, Tuple
+
+from itemadapter import ItemAdapter
+from scrapy import Spider
+from scrapy.crawler import Crawler
+from scrapy.exceptions import DropItem, NotConfigured
+
+from mtgscrapper.corpus_store import CorpusStore
+from mtgscrapper.hashing import ContentHashIndex, content_hash
+from mtgscrapper.items import MtgArticle, MtgItem, parse_date
+from mtgscrapper.jsonl import JsonLinesWriter
+
+
+def to_serializable(item: Any) -> Any:
+    """Returns an item that the JsonLinesWriter can write
+
+    Dictionaries and MtgItem objects are written as is, other items are converted to dictionaries.
+    """
+    if isinstance(item, (dict, MtgItem)):
+        return item
+    return ItemAdapter(item).asdict()
+
+
+def date_sort_key(item: Any) -> Tuple[Date, int]:
+    """Sort key of an item by date, the items without date come last in descending order
+
+    Items of the same date are ordered by the number of their id, such as 'post-172366', which
+    grows with the publication time.
+    """
+    adapter = ItemAdapter(item)
+    date = parse_date(adapter.get('date')) or Date.min
+    match = re.search(r'\d+', str(adapter.get('id_') or ''))
+    return date, int(match.group()) if match is not None else 0
+
+
+class JsonLinesExportPipeline:  # pylint: disable=too-many-instance-attributes
+    """Streams each item as one line of compressed JSON, the memory used stays flat
+
+    Settings:
+        JSONL_EXPORT_DIR: output directory, the pipeline is disabled if not set.
+        JSONL_EXPORT_COMPRESSION: 'gzip' (default), 'zstd' or None.
+        JSONL_EXPORT_MAX_ITEMS: number of items after which a new file is started.
+        JSONL_EXPORT_MAX_BYTES: number of uncompressed bytes after which a new file is started.
+        JSONL_EXPORT_STREAM_ITEMS: streams the items to the files instead of serializing their
+            dictionaries, slower but with less memory per item, see JsonLinesWriter.
+        JSONL_EXPORT_SORT_BY_DATE: buffers the items and writes them from the newest to the
+            oldest when the spider closes, for the listing sweeps whose pages arrive in any
+            order. Every item of the crawl is then kept in memory until the end: the memory
+            grows with the number of items instead of staying flat, which is fine for the article
+            metadata of a sweep (a few hundred bytes each) but not for the parsed articles.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        directory: str,
+        compression: str | None = 'gzip',
+        max_items: int | None = None,
+        max_bytes: int | None = None,
+        stream_items: bool = False,
+        sort_by_date: bool = False,
+    ) -> None:
+        self.directory = directory
+        self.compression = compression
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.stream_items = stream_items
+        self.sort_by_date = sort_by_date
+        self.writer: JsonLinesWriter | None = None
+        self.buffer: List[Any] = []
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler) -> JsonLinesExportPipeline:
+        """Creates the pipeline, raises NotConfigured if it is disabled"""
+        settings = crawler.settings
+        if settings.get('JSONL_EXPORT_DIR') is None:
+            raise NotConfigured
+        return cls(
+            settings.get('JSONL_EXPORT_DIR'),
+            compression=settings.get('JSONL_EXPORT_COMPRESSION', 'gzip'),
+            max_items=settings.getint('JSONL_EXPORT_MAX_ITEMS') or None,
+            max_bytes=settings.getint('JSONL_EXPORT_MAX_BYTES') or None,
+            stream_items=settings.getbool('JSONL_EXPORT_STREAM_ITEMS'),
+            sort_by_date=settings.getbool('JSONL_EXPORT_SORT_BY_DATE'),
+        )
+
+    def open_spider(self, spider: Spider) -> None:
+        """Opens the writer, the files are prefixed with the name of the spider"""
+        self.writer = JsonLinesWriter(
+            self.directory,
+            prefix=spider.name,
+            compression=self.compression,
+            max_items=self.max_items,
+            max_bytes=self.max_bytes,
+            stream_items=self.stream_items,
+        )
+
+    def process_item(self, item: Any, spider: Spider) -> Any:  # pylint: disable=unused-argument
+        """Writes the item, or buffers it if the items are sorted by date"""
+        if self.sort_by_date:
+            self.buffer.append(to_serializable(item))
+        else:
+            self._opened_writer().write(to_serializable(item))
+        return item
+
+    def close_spider(self, spider: Spider) -> None:  # pylint: disable=unused-argument
+        """Writes the buffered items from the newest to the oldest and closes the writer"""
+        writer = self._opened_writer()
+        if self.sort_by_date:
+            self.buffer.sort(key=date_sort_key, reverse=True)
+            for item in self.buffer:
+                writer.write(item)
+            self.buffer = []
+        writer.close()
+
+    def _opened_writer(self) -> JsonLinesWriter:
+        if self.writer is None:
+            raise RuntimeError('the JSONL writer is not opened, see open_spider.')
+        return self.writer
+
+
+class ContentDedupPipeline:
+    """Drops the articles whose content did not change since the previous crawl
+
+    The content of each article is hashed (see mtgscrapper.hashing) and compared with the hash
+    stored in a ContentHashIndex:
+    - an article with the same hash as in the index is dropped,
+    - an article with the content of another article, re-syndicated under another id, is dropped,
+    - a new or changed article is kept, with 'content_hash' and 'content_version' fields. A changed
+      article also gets a 'changed_content' field, the indices of its top-level sections, blocks
+      and decklists that are new or edited.
+
+    The articles are hashed as they are, MtgArticle objects or dictionaries, without building the
+    dictionaries of their content. The new fields are added to the kept articles in place, as
+    attributes of the MtgArticle objects, and are written with their other fields.
+
+    Settings:
+        CONTENT_HASH_INDEX: path of the JSON index, the pipeline is disabled if not set.
+    """
+
+    def __init__(self, index_path: str, stats: Any = None) -> None:
+        self.index = ContentHashIndex(index_path)
+        self.stats = stats
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler) -> ContentDedupPipeline:
+        """Creates the pipeline, raises NotConfigured if it is disabled"""
+        index_path = crawler.settings.get('CONTENT_HASH_INDEX')
+        if index_path is None:
+            raise NotConfigured
+        return cls(index_path, stats=crawler.stats)
+
+    def process_item(self, item: Any, spider: Spider) -> Any:  # pylint: disable=unused-argument
+        """Drops the unchanged or duplicated articles, adds the hash fields to the others"""
+        adapter = ItemAdapter(item)
+        # The articles crawled without their content (parse_article=False) have nothing to hash
+        if adapter.get('item_type') != 'article' or not adapter.get('content'):
+            return item
+
+        article_id: str = adapter.get('id_') or adapter['url']
+        hash_, children = content_hash(item)
+
+        if self.index.is_unchanged(article_id, hash_):
+            self._inc_stats('unchanged')
+            raise DropItem(f'article {article_id} did not change.')
+
+        owner = self.index.owner(hash_)
+        if owner is not None and owner != article_id:
+            self._inc_stats('duplicate')
+            raise DropItem(f'article {article_id} has the same content as {owner}.')
+
+        version, changed_content = self.index.update(article_id, hash_, children)
+        fields = item if isinstance(item, dict) else vars(item)
+        fields['content_hash'] = hash_
+        fields['content_version'] = version
+        if changed_content is not None:
+            fields['changed_content'] = changed_content
+            self._inc_stats('changed')
+        else:
+            self._inc_stats('new')
+        return item
+
+    def close_spider(self, spider: Spider) -> None:  # pylint: disable=unused-argument
+        """Saves the index of the content hashes"""
+        self.index.save()
+
+    def _inc_stats(self, key: str) -> None:
+        if self.stats is not None:
+            self.stats.inc_value(f'content_dedup/{key}')
+
+
+class CorpusStorePipeline:
+    """Stores the articles with their content in an indexed SQLite database
+
+    See mtgscrapper.corpus_store for the tables and the query API. The articles crawled without
+    their content (parse_article=False) are stored with their metadata only.
+
+    Settings:
+        CORPUS_STORE_PATH: path of the SQLite database, the pipeline is disabled if not set.
+        CORPUS_STORE_COMMIT_EVERY: number of articles written in each transaction.
+    """
+
+    def __init__(self, path: str, commit_every: int = 100) -> None:
+        self.path = path
+        self.commit_every = commit_every
+        self.store: CorpusStore | None = None
+        self.nb_pending = 0
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler) -> CorpusStorePipeline:
+        """Creates the pipeline, raises NotConfigured if it is disabled"""
+        settings = crawler.settings
+        if settings.get('CORPUS_STORE_PATH') is None:
+            raise NotConfigured
+        return cls(
+            settings.get('CORPUS_STORE_PATH'),
+            commit_every=settings.getint('CORPUS_STORE_COMMIT_EVERY', 100),
+        )
+
+    def open_spider(self, spider: Spider) -> None:  # pylint: disable=unused-argument
+        """Opens the database"""
+        self.store = CorpusStore(self.path)
+
+    def process_item(self, item: Any, spider: Spider) -> Any:  # pylint: disable=unused-argument
+        """Stores the article, commits every CORPUS_STORE_COMMIT_EVERY articles"""
+        if ItemAdapter(item).get('item_type') != 'article':
+            return item
+
+        store = self._opened_store()
+        store.add(item if isinstance(item, (dict, MtgArticle)) else ItemAdapter(item).asdict())
+        self.nb_pending += 1
+        if self.nb_pending >= self.commit_every:
+            store.commit()
+            self.nb_pending = 0
+        return item
+
+    def close_spider(self, spider: Spider) -> None:  # pylint: disable=unused-argument
+        """Commits the last articles and closes the database"""
+        self._opened_store().close()
+
+    def _opened_store(self) -> CorpusStore:
+        if self.store is None:
+            raise RuntimeError('the corpus store is not opened, see open_spider.')
+        return self.store
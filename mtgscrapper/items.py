@@ -4,11 +4,25 @@ from __future__ import annotations
 import re
 
 from uuid import uuid4
-from typing import List, Tuple, Dict, Generator
-from dataclasses import dataclass, field
+from datetime import date as Date, datetime
+from typing import List, Tuple, Dict, Generator, Iterable
+from dataclasses import dataclass, field, InitVar
 
 from mtgscrapper.mtg_format_enum import MtgFormatEnum
 
+# Format of the dates of the MTGAZone website, such as 'February 13, 2023'
+DATE_FORMAT = '%B %d, %Y'
+
+
+def parse_date(date: str | None) -> Date | None:
+    """Converts the date of an item to a datetime.date, None if it is missing or malformed"""
+    if date is None:
+        return None
+    try:
+        return datetime.strptime(date.strip(), DATE_FORMAT).date()
+    except ValueError:
+        return None
+
 
 @dataclass(kw_only=True)
 class MtgItem:
@@ -18,10 +32,18 @@ class MtgItem:
     item_type: str
     id_: str | None = None
 
-    def __post_init__(self) -> None:
-        if self.id_ is None:
+    # The items created without id get a uuid4, unless their id is assigned later, such as the
+    # content ids derived from the parsed content, see hashing.assign_content_ids
+    assign_id: InitVar[bool] = True
+
+    def __post_init__(self, assign_id: bool = True) -> None:
+        if self.id_ is None and assign_id:
             self.id_ = str(uuid4())
 
+    def to_dict(self) -> Dict:
+        """Creates a dictionary containing all the info from the object"""
+        return dict(vars(self))
+
 
 @dataclass(kw_only=True)
 class MtgTitle(MtgItem):
@@ -29,11 +51,11 @@ class MtgTitle(MtgItem):
 
     title: str
 
-    def __post_init__(self) -> None:
+    def __post_init__(self, assign_id: bool = True) -> None:
         if self.title is None:
             raise ValueError('title must have a value.')
         self.title = self.title.strip()
-        return super().__post_init__()
+        return super().__post_init__(assign_id)
 
     def __str__(self) -> str:
         return f'{self.title}\n'
@@ -49,19 +71,19 @@ class MtgFormat(MtgItem):
 
     format_: MtgFormatEnum | None = None
 
-    def __post_init__(self) -> None:
+    def __post_init__(self, assign_id: bool = True) -> None:
         if self.format_ is not None:
             self.format_ = self.format_.lower()  # type: ignore
             if not MtgFormatEnum.is_format(self.format_):
                 raise ValueError(f'unkown MTG format {self.format_}.')
-        return super().__post_init__()
+        return super().__post_init__(assign_id)
 
     @classmethod
     def from_dict(cls, dict_: Dict) -> MtgFormat:
         return cls(**dict_)
 
     def to_dict(self) -> Dict:
-        return vars(self)
+        return dict(vars(self))
 
 
 @dataclass(kw_only=True)
@@ -88,10 +110,10 @@ class MtgContent(MtgItem):
     content: List[MtgSection | MtgBlock | Decklist] = field(default_factory=list)  # List of ids
     length = 0
 
-    def __post_init__(self) -> None:
+    def __post_init__(self, assign_id: bool = True) -> None:
         # Set length of object if called with @classmethod
         len(self)
-        return super().__post_init__()
+        return super().__post_init__(assign_id)
 
     def add(self, section: MtgSection | List[MtgSection]) -> None:
         """Adds a section to object to the class's content"""
@@ -140,14 +162,13 @@ class MtgContent(MtgItem):
         return cls(**cls_args)
 
     def to_dict(self) -> Dict:
-        """Creates a dictionary containing all the info from the object"""
-        self_dict = vars(self)
+        """Creates a dictionary containing all the info from the object
 
-        content_dict_list = []
-        for content in self_dict['content']:
-            content_dict_list.append(content.to_dict())
-
-        self_dict['content'] = content_dict_list
+        The object is left untouched, see mtgscrapper.serialization to write it without building
+        the dictionaries.
+        """
+        self_dict = dict(vars(self))
+        self_dict['content'] = [content.to_dict() for content in self.content]
         return self_dict
 
 
@@ -160,10 +181,10 @@ class MtgArticle(MtgTitle, MtgMultiFormat, MtgContent):
     author: str
     item_type: str = 'article'
 
-    def __post_init__(self) -> None:
+    def __post_init__(self, assign_id: bool = True) -> None:
         self.tags = [tag.lower() for tag in self.tags]
 
-        return super().__post_init__()
+        return super().__post_init__(assign_id)
 
     def set_format(self, format_: MtgFormatEnum) -> None:
         self._set_format_recursive(self.content, format_=format_)
@@ -210,6 +231,39 @@ class MtgSection(MtgContent, MtgTitle, MtgFormat):  # type: ignore
             super().add(section)
 
 
+class SectionTreeBuilder:
+    """Nests the sections of an article by level, as they come, in linear time
+
+    The builder keeps the stack of the open sections, from the top-level section to the last
+    added one. A new section closes the open sections of the same or a deeper level (a greater or
+    equal level), then becomes a subsection of the last open section, or a top-level section of
+    the article if none is left open. Gives the same tree as adding each section to the last
+    top-level section with MtgSection.add, without walking down the tree for each section.
+    """
+
+    def __init__(self, article: MtgContent) -> None:
+        self.article = article
+        self.stack: List[MtgSection] = []
+
+    def add(self, section: MtgSection) -> None:
+        """Adds the next section of the article"""
+        stack = self.stack
+        while len(stack) > 0 and stack[-1].level >= section.level:
+            stack.pop()
+
+        if len(stack) > 0:
+            # The last content of the parent is closed, MtgSection.add appends without recursion
+            stack[-1].add(section)
+        else:
+            self.article.add(section)
+        stack.append(section)
+
+    def extend(self, sections: Iterable[MtgSection]) -> None:
+        """Adds sections in their order in the article"""
+        for section in sections:
+            self.add(section)
+
+
 @dataclass(kw_only=True)
 class MtgBlock(MtgFormat):
     """A block can be a paragraph of a card
@@ -220,9 +274,9 @@ class MtgBlock(MtgFormat):
     text: str
     item_type: str = 'block'
 
-    def __post_init__(self) -> None:
+    def __post_init__(self, assign_id: bool = True) -> None:
         self.text = re.sub(r'(\n)\1+', r'\n', self.text).strip()
-        return super().__post_init__()
+        return super().__post_init__(assign_id)
 
     def __str__(self) -> str:
         return f'{self.text}\n\n'
@@ -253,11 +307,11 @@ class Decklist(MtgTitle, MtgFormat):
     best_of: int | None = None
     item_type: str = 'decklist'
 
-    def __post_init__(self) -> None:
+    def __post_init__(self, assign_id: bool = True) -> None:
         if len(self.deck) == 0:
             raise ValueError('deck must contain cards')
 
-        return super().__post_init__()
+        return super().__post_init__(assign_id)
 
     def __str__(self) -> str:
         metadata = f'Format: {self.format_}\n'
@@ -0,0 +1,175 @@
+"""Writes items as JSON lines, with optional compression and rotation of the files"""
+
+from __future__ import annotations
+
+import io
+import os
+import gzip
+import json
+import time
+from typing import Any, BinaryIO
+
+from mtgscrapper.items import MtgItem
+from mtgscrapper.serialization import dump_item
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+EXTENSIONS = {None: '', 'gzip': '.gz', 'zstd': '.zst'}
+
+
+def dumps(obj: Any) -> bytes:
+    """Serializes an object to JSON, uses orjson when it is installed
+
+    The MtgItem objects are serialized from their dictionaries, see MtgItem.to_dict.
+    """
+    if isinstance(obj, MtgItem):
+        obj = obj.to_dict()
+    if orjson is not None:
+        return orjson.dumps(obj)  # pylint: disable=no-member
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+
+def loads(data: bytes | str) -> Any:
+    """Deserializes a JSON document, uses orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(data)  # pylint: disable=no-member
+    return json.loads(data)
+
+
+class _CountingStream(io.RawIOBase):
+    """Binary stream forwarding its writes to another one and counting the written bytes"""
+
+    def __init__(self, stream: Any) -> None:
+        super().__init__()
+        self.stream = stream
+        self.name = getattr(stream, 'name', '')
+        self.nb_bytes = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        self.stream.write(data)
+        self.nb_bytes += len(data)
+        return len(data)
+
+
+class JsonLinesWriter:  # pylint: disable=too-many-instance-attributes
+    """Writes items as JSON lines into a rotating set of files
+
+    A new file is started once the current one holds max_items items or max_bytes bytes of
+    uncompressed JSON. Files are written under a '.part' name and renamed once closed, so a file
+    with its final name is always complete. With stream_items, the MtgItem objects are written to
+    the file as they are serialized (see serialization.dump_item), neither their dictionaries nor
+    their JSON are held in memory as a whole, but they are serialized several times slower.
+
+    Args:
+        directory (str): directory of the output files.
+        prefix (str): prefix of the output files, followed by a timestamp and the file index.
+        compression (str | None): 'gzip', 'zstd' (requires the zstandard package) or None.
+        max_items (int | None): maximum number of items per file.
+        max_bytes (int | None): maximum number of uncompressed bytes per file.
+        stream_items (bool): streams the MtgItem objects to the file, see serialization.dump_item.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        directory: str,
+        prefix: str = 'items',
+        compression: str | None = 'gzip',
+        max_items: int | None = None,
+        max_bytes: int | None = None,
+        stream_items: bool = False,
+    ) -> None:
+        if compression not in EXTENSIONS:
+            raise ValueError(f'unknown compression {compression}.')
+        if compression == 'zstd' and zstandard is None:
+            raise ValueError('zstd compression requires the zstandard package.')
+
+        self.directory = directory
+        self.prefix = f'{prefix}-{time.strftime("%Y%m%d-%H%M%S")}'
+        self.compression = compression
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.stream_items = stream_items
+
+        self.file_index = 0
+        self.nb_items = 0
+        self.nb_bytes = 0
+        self.path: str | None = None
+        self.raw_file: BinaryIO | None = None
+        self.file: Any = None
+        self.counter: _CountingStream | None = None
+        self.text: io.TextIOWrapper | None = None
+        self.paths: list[str] = []
+
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, item: Any) -> None:
+        """Writes an item on a single line, rotates the file if it is full"""
+        if self.text is None:
+            self._open()
+        if self.counter is None or self.text is None:
+            raise RuntimeError(f'cannot open the file {self.path}.')
+
+        if self.stream_items and isinstance(item, MtgItem):
+            dump_item(item, self.text)
+            self.text.write('\n')
+            self.text.flush()
+        else:
+            self.counter.write(dumps(item) + b'\n')
+        self.nb_items += 1
+        self.nb_bytes = self.counter.nb_bytes
+
+        if (self.max_items is not None and self.nb_items >= self.max_items) or (
+            self.max_bytes is not None and self.nb_bytes >= self.max_bytes
+        ):
+            self.close()
+
+    def close(self) -> None:
+        """Closes the current file and gives it its final name"""
+        if self.file is None or self.path is None or self.raw_file is None:
+            return
+
+        if self.text is not None:
+            # Only flushes the text wrapper and the counter, the file itself is closed below
+            self.text.close()
+        self.file.close()
+        if self.file is not self.raw_file:
+            self.raw_file.close()
+        os.replace(f'{self.path}.part', self.path)
+        self.paths.append(self.path)
+
+        self.file, self.raw_file, self.path = None, None, None
+        self.counter, self.text = None, None
+
+    def _open(self) -> None:
+        filename = f'{self.prefix}-{self.file_index:05d}.jsonl{EXTENSIONS[self.compression]}'
+        self.path = os.path.join(self.directory, filename)
+        self.raw_file = open(f'{self.path}.part', 'wb')  # pylint: disable=consider-using-with
+
+        if self.compression == 'gzip':
+            self.file = gzip.GzipFile(filename=filename, mode='wb', fileobj=self.raw_file)
+        elif self.compression == 'zstd':
+            self.file = zstandard.ZstdCompressor().stream_writer(self.raw_file)
+        else:
+            self.file = self.raw_file
+        self.counter = _CountingStream(self.file)
+        self.text = io.TextIOWrapper(self.counter, encoding='utf-8', newline='\n')
+
+        self.file_index += 1
+        self.nb_items, self.nb_bytes = 0, 0
+
+    def __enter__(self) -> JsonLinesWriter:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
@@ -0,0 +1,170 @@
+"""Local stand-in for the MTGAZone web server, to test and benchmark the crawler offline
+
+The server answers the paths of a dictionary of pages, after a configurable latency, and fails a
+configurable fraction of the requests with a 429 or 503 status.
+
+Usage:
+    python -m mtgscrapper.local_server --port 8000 --latency 0.2 --error-rate 0.1 data
+"""
+
+from __future__ import annotations
+
+import os
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+
+class StandInServer:  # pylint: disable=too-many-instance-attributes
+    """HTTP server answering fixed pages with a configurable latency and error rate
+
+    Args:
+        pages (Dict[str, bytes]): HTML body of each path, such as '/articles/'.
+        latency (float): seconds to wait before answering a request.
+        error_rate (float): fraction of the requests answered with an error status.
+        error_status (int): status of the failed requests, 429 or 503.
+        retry_after (int | None): value of the Retry-After header of the failed requests.
+        host (str), port (int): address of the server, port 0 picks a free port.
+        seed (int | None): seed of the random failures.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        pages: Dict[str, bytes],
+        *,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 429,
+        retry_after: int | None = None,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        seed: int | None = None,
+    ) -> None:
+        self.pages = pages
+        self.host = host
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+
+        self.random = random.Random(seed)  # nosec B311 # deterministic test error injection
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests: List[Dict[str, Any]] = []
+
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self.thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        """Base URL of the server, without trailing slash"""
+        return f'http://{self.host}:{self.httpd.server_address[1]}'
+
+    def start(self) -> StandInServer:
+        """Serves the pages from a background thread"""
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stops the server and closes its socket"""
+        if self.thread is not None:
+            self.httpd.shutdown()
+            self.thread.join()
+            self.thread = None
+        self.httpd.server_close()
+
+    def __enter__(self) -> StandInServer:
+        return self.start()
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
+
+    def answer(self, path: str) -> tuple[int, bytes, Dict[str, str]]:
+        """Waits for the latency, then returns the status, body and headers of a request"""
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            failed = self.random.random() < self.error_rate
+
+        try:
+            time.sleep(self.latency)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+                self.requests.append({'path': path, 'time': time.monotonic(), 'failed': failed})
+
+        if failed:
+            headers = {'Retry-After': str(self.retry_after)} if self.retry_after is not None else {}
+            return self.error_status, b'Slow down', headers
+
+        body = self.pages.get(path.split('?', 1)[0])
+        if body is None:
+            return 404, b'Not found', {}
+        return 200, body, {'Content-Type': 'text/html; charset=utf-8'}
+
+    def _handler_class(self) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """Answers the GET requests with the pages of the server"""
+
+            def do_GET(self) -> None:  # pylint: disable=invalid-name
+                """Answers the page of the path, or an error"""
+                status, body, headers = server.answer(self.path)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args: Any) -> None:  # pylint: disable=arguments-differ
+                pass
+
+        return Handler
+
+
+def load_pages(directory: str) -> Dict[str, bytes]:
+    """Maps the '/<name>/' paths to the content of the '<name>.html' files of a directory"""
+    pages = {}
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith('.html'):
+            with open(os.path.join(directory, filename), 'rb') as html_file:
+                pages[f'/{filename[: -len(".html")]}/'] = html_file.read()
+    return pages
+
+
+def main() -> None:
+    """Serves the HTML files of a directory until interrupted"""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n', maxsplit=1)[0])
+    parser.add_argument('directory', help='directory of the <name>.html pages.')
+    parser.add_argument('--port', type=int, default=8000, help='port of the server.')
+    parser.add_argument('--latency', type=float, default=0.0, help='latency in seconds.')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of failures.')
+    parser.add_argument('--error-status', type=int, default=429, help='status of the failures.')
+    args = parser.parse_args()
+
+    server = StandInServer(
+        load_pages(args.directory),
+        latency=args.latency,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        port=args.port,
+    )
+    print(f'serving {len(server.pages)} pages on {server.url}')
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
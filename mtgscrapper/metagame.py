@@ -0,0 +1,266 @@
+"""Card inclusion rates, average copies and archetype shares of a set of decklists
+
+The decklists are encoded as integers: the names of the cards, formats and archetypes are interned
+into tables, and the cards of all the decklists are stored as a sparse (decklist, card) matrix in
+coordinate format. The statistics of a format and a date window are then computed with a few NumPy
+operations instead of walking every Decklist in Python.
+
+New decklists can be added at any time, the arrays grow in amortized constant time per card.
+
+Usage:
+    metagame = DeckMatrix()
+    metagame.add_article(article)
+    metagame.card_stats(format_='explorer', since='2023-01-01')
+    metagame.archetype_shares(format_='explorer', since='2023-01-01')
+"""
+
+from __future__ import annotations
+
+from datetime import date as Date
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from mtgscrapper.corpus_store import iso_day, to_quantity
+from mtgscrapper.items import MtgItem
+
+
+def to_day(date: str | Date | None) -> np.datetime64:
+    """Converts the date of a decklist to a NumPy day, NaT if it is missing or malformed"""
+    day = iso_day(date)
+    try:
+        return np.datetime64(day or 'NaT', 'D')
+    except ValueError:
+        return np.datetime64('NaT', 'D')
+
+
+class Interner:
+    """Table of distinct names, each name is mapped to the index of its first insertion"""
+
+    def __init__(self) -> None:
+        self.indices: Dict[str, int] = {}
+        self.names: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __getitem__(self, index: int) -> str:
+        return self.names[index]
+
+    def intern(self, name: str) -> int:
+        """Returns the index of a name, adds the name to the table if it is unknown"""
+        index = self.indices.get(name)
+        if index is None:
+            index = self.indices[name] = len(self.names)
+            self.names.append(name)
+        return index
+
+    def get(self, name: str) -> int:
+        """Returns the index of a name, -1 if it is unknown"""
+        return self.indices.get(name, -1)
+
+
+class GrowingArray:
+    """One-dimensional NumPy array that doubles its capacity when it is full"""
+
+    def __init__(self, dtype: Any) -> None:
+        self.data = np.empty(16, dtype=dtype)
+        self.size = 0
+
+    def extend(self, values: List) -> None:
+        """Appends values at the end of the array"""
+        end = self.size + len(values)
+        if end > len(self.data):
+            data = np.empty(max(end, 2 * len(self.data)), dtype=self.data.dtype)
+            data[: self.size] = self.data[: self.size]
+            self.data = data
+        self.data[self.size : end] = values
+        self.size = end
+
+    @property
+    def values(self) -> np.ndarray:
+        """View of the filled part of the array"""
+        return self.data[: self.size]
+
+
+class DeckMatrix:  # pylint: disable=too-many-instance-attributes
+    """Sparse (decklist, card) matrix of the number of copies of each card
+
+    Each decklist is one row, with its format, archetype and day. The archetype of a decklist
+    without one is its title, such as 'Esper Midrange'. A card of both the deck and the sideboard
+    is stored twice, once with the sideboard flag.
+    """
+
+    def __init__(self) -> None:
+        self.cards = Interner()
+        self.formats = Interner()
+        self.archetypes = Interner()
+
+        # One value per decklist
+        self.deck_formats = GrowingArray(np.int32)
+        self.deck_archetypes = GrowingArray(np.int32)
+        self.deck_days = GrowingArray('datetime64[D]')
+
+        # One value per (decklist, card) entry
+        self.rows = GrowingArray(np.int32)
+        self.columns = GrowingArray(np.int32)
+        self.copies = GrowingArray(np.int32)
+        self.sideboard = GrowingArray(np.bool_)
+
+    def __len__(self) -> int:
+        return self.deck_formats.size
+
+    def add(self, decklist: Any, date: str | Date | None = None) -> int:
+        """Adds a Decklist, or its dictionary, returns its row
+
+        The fields of the decklist are read and converted before the matrix is modified, so that
+        a malformed decklist does not leave a partial row. A malformed date is stored as NaT.
+
+        Args:
+            decklist (Decklist | Dict): decklist to add.
+            date (str | Date | None): date of the decklist, the 'date' field of the decklist if
+                not given.
+        """
+        fields = vars(decklist) if isinstance(decklist, MtgItem) else decklist
+        format_ = fields['format_'] or ''
+        archetype = fields['archetype'] or fields['title']
+        day = to_day(date or fields['date'])
+        card_lists = [
+            [(name, to_quantity(quantity) or 0) for quantity, name in card_list]
+            for card_list in (fields['deck'], fields['sideboard'] or [])
+        ]
+
+        row = len(self)
+        self.deck_formats.extend([self.formats.intern(format_)])
+        self.deck_archetypes.extend([self.archetypes.intern(archetype)])
+        self.deck_days.extend([day])
+
+        for sideboard, card_list in enumerate(card_lists):
+            copies: Dict[int, int] = {}
+            for name, quantity in card_list:
+                column = self.cards.intern(name)
+                copies[column] = copies.get(column, 0) + quantity
+            self.rows.extend([row] * len(copies))
+            self.columns.extend(list(copies))
+            self.copies.extend(list(copies.values()))
+            self.sideboard.extend([bool(sideboard)] * len(copies))
+
+        return row
+
+    def extend(self, decklists: Iterable[Any]) -> None:
+        """Adds several decklists"""
+        for decklist in decklists:
+            self.add(decklist)
+
+    def add_article(self, article: Any) -> int:
+        """Adds all the decklists of an article, or its dictionary, returns their number"""
+        nb_decklists = 0
+        # Depth-first walk with a stack, in the order of the article
+        nodes = list(
+            reversed(
+                vars(article)['content'] if isinstance(article, MtgItem) else article['content']
+            )
+        )
+        while len(nodes) > 0:
+            node = nodes.pop()
+            fields = vars(node) if isinstance(node, MtgItem) else node
+            if fields['item_type'] == 'decklist':
+                self.add(fields)
+                nb_decklists += 1
+            elif fields['item_type'] == 'section':
+                nodes.extend(reversed(fields['content']))
+        return nb_decklists
+
+    def select(
+        self,
+        format_: str | None = None,
+        since: str | Date | None = None,
+        until: str | Date | None = None,
+    ) -> np.ndarray:
+        """Returns the boolean mask of the decklists of a format and a date window
+
+        The dates of the window are included, the decklists without date are only selected when
+        no window is given.
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if format_ is not None:
+            mask &= self.deck_formats.values == self.formats.get(format_)
+        if since is not None:
+            mask &= self.deck_days.values >= np.datetime64(iso_day(since), 'D')
+        if until is not None:
+            mask &= self.deck_days.values <= np.datetime64(iso_day(until), 'D')
+        return mask
+
+    def card_counts(
+        self, mask: np.ndarray, include_sideboard: bool = False
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the number of selected decklists including each card and their total copies
+
+        A card of both the deck and the sideboard counts as one inclusion.
+        """
+        entries = mask[self.rows.values]
+        if not include_sideboard:
+            entries &= ~self.sideboard.values
+
+        rows, columns = self.rows.values[entries], self.columns.values[entries]
+        copies = np.bincount(
+            columns, weights=self.copies.values[entries], minlength=len(self.cards)
+        )
+
+        if include_sideboard:
+            pairs = np.unique(rows.astype(np.int64) * len(self.cards) + columns)
+            columns = pairs % len(self.cards)
+        inclusions = np.bincount(columns, minlength=len(self.cards))
+        return inclusions, copies
+
+    def card_stats(  # pylint: disable=too-many-arguments
+        self,
+        format_: str | None = None,
+        since: str | Date | None = None,
+        until: str | Date | None = None,
+        *,
+        include_sideboard: bool = False,
+        min_inclusion: float = 0.0,
+    ) -> List[Tuple[str, float, float]]:
+        """Returns the (card, inclusion rate, average copies) of the decklists, most played first
+
+        The inclusion rate is the fraction of the selected decklists including the card, the
+        average copies is the mean number of copies in the decklists including it.
+        """
+        mask = self.select(format_, since, until)
+        nb_decklists = np.count_nonzero(mask)
+        if nb_decklists == 0:
+            return []
+
+        inclusions, copies = self.card_counts(mask, include_sideboard=include_sideboard)
+        rates = inclusions / nb_decklists
+        average_copies = np.divide(
+            copies, inclusions, out=np.zeros(len(copies)), where=inclusions > 0
+        )
+
+        columns = np.flatnonzero((inclusions > 0) & (rates >= min_inclusion))
+        columns = columns[np.argsort(-rates[columns], kind='stable')]
+        return [
+            (self.cards[int(column)], float(rates[column]), float(average_copies[column]))
+            for column in columns
+        ]
+
+    def archetype_shares(
+        self,
+        format_: str | None = None,
+        since: str | Date | None = None,
+        until: str | Date | None = None,
+    ) -> Dict[str, float]:
+        """Returns the fraction of the selected decklists of each archetype, largest first"""
+        mask = self.select(format_, since, until)
+        nb_decklists = np.count_nonzero(mask)
+        if nb_decklists == 0:
+            return {}
+
+        counts = np.bincount(self.deck_archetypes.values[mask], minlength=len(self.archetypes))
+        archetypes = np.flatnonzero(counts)
+        archetypes = archetypes[np.argsort(-counts[archetypes], kind='stable')]
+        return {
+            self.archetypes[int(archetype)]: float(counts[archetype] / nb_decklists)
+            for archetype in archetypes
+        }
@@ -3,15 +3,87 @@
 For more information on MTG formats:
 https://magic.wizards.com/en/formats
 """
+
 from __future__ import annotations
 
-from typing import Dict
+import re
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, Iterable, List, Tuple
 import numpy as np
 
 from mtgscrapper.items import MtgArticle, MtgBlock, MtgSection, Decklist
 from mtgscrapper.mtg_format_enum import MtgFormatEnum
 
 
+class FormatMatcher:
+    """Counts the occurrences of every MTG format in a text in a single pass
+
+    The format names are compiled once into a single regular expression. Names only match whole
+    words, so that 'standard' is not found in 'substandard'.
+    """
+
+    def __init__(self, formats: Iterable[MtgFormatEnum] = MtgFormatEnum) -> None:
+        self.formats = list(formats)
+        self.name_to_format = {format_.value: format_ for format_ in self.formats}
+        self.columns = {format_.value: column for column, format_ in enumerate(self.formats)}
+
+        # Same as r'\b(?:standard|historic|...)\b', but starting with the set of the first letters
+        # of the names lets the regex engine skip quickly to the candidate positions. The first
+        # letter must not follow a word character, the rest of the name must follow its own first
+        # letter. Longest names first, so that a name is never shadowed by one of its prefixes.
+        names = sorted(self.name_to_format, key=len, reverse=True)
+        first_letters = ''.join(sorted({re.escape(name[0]) for name in names}))
+        remainders = '|'.join(f'(?<={re.escape(name[0])}){re.escape(name[1:])}' for name in names)
+        self.pattern = re.compile(rf'[{first_letters}](?<!\w.)(?:{remainders})\b')
+
+    def count(self, text: str) -> Dict[MtgFormatEnum, int]:
+        """Returns the number of occurrences of each format found in the text"""
+        occurences: Dict[MtgFormatEnum, int] = {}
+        for name in self.pattern.findall(text.lower()):
+            format_ = self.name_to_format[name]
+            occurences[format_] = occurences.get(format_, 0) + 1
+        return occurences
+
+    def most_common(self, text: str) -> MtgFormatEnum | None:
+        """Returns the most frequent format of the text, the first format of the enum on ties"""
+        occurences = self.count(text)
+        if len(occurences) == 0:
+            return None
+        return max(self.formats, key=lambda format_: occurences.get(format_, 0))
+
+    def count_matrix(self, texts: List[str]) -> np.ndarray:
+        """Returns the (text, format) matrix of the occurrences of the formats in many texts
+
+        The texts are searched at once, separated by a NUL character which is not a word
+        character. The text of each match is found from its position. The positions are those of
+        the lowercased texts, str.lower can make a text longer ('İ' becomes 'i̇').
+        """
+        lowered = [text.lower() for text in texts]
+        ends = np.cumsum([len(text) + 1 for text in lowered])
+        positions, columns = [], []
+        for match in self.pattern.finditer('\0'.join(lowered)):
+            positions.append(match.start())
+            columns.append(self.columns[match.group()])
+
+        occurences = np.zeros((len(texts), len(self.formats)), dtype=np.int64)
+        rows = np.searchsorted(ends, np.array(positions, dtype=np.int64), side='right')
+        np.add.at(occurences, (rows, np.array(columns, dtype=np.int64)), 1)
+        return occurences
+
+    def single(self, text: str) -> MtgFormatEnum | None:
+        """Returns the format of the text if exactly one format is found"""
+        formats = set(self.pattern.findall(text.lower()))
+        if len(formats) == 1:
+            return self.name_to_format[formats.pop()]
+        return None
+
+
+FORMAT_MATCHER = FormatMatcher()
+
+# Kinds of the nodes of CorpusColumns
+ARTICLE, SECTION, BLOCK, DECKLIST = range(4)
+
+
 class FormatHandler:
     """Class that finds the MTG formats associated with the content of an article"""
 
@@ -20,6 +92,24 @@ class FormatHandler:
 
     def process_article(self, article: MtgArticle) -> None:
         """Predicts MTG formats from article content"""
+        priority_format, known_formats = self.start_article(article)
+
+        for content in article:
+            self.process_content(content, format_=priority_format, known_formats=known_formats)
+
+        content_format = self.finish_article(article, priority_format, known_formats)
+        if content_format is not None:
+            article.set_format(content_format)
+
+    def start_article(
+        self, article: MtgArticle
+    ) -> Tuple[MtgFormatEnum | None, Dict[MtgFormatEnum, int]]:
+        """Finds the formats of the tags and the title of an article, before its content
+
+        Returns:
+            The format given to all the content of the article, if any, and the occurrences of the
+            formats to pass to process_content for each content of the article.
+        """
         formats = [MtgFormatEnum(tag) for tag in article.tags if MtgFormatEnum.is_format(tag)]
         article.formats = formats
 
@@ -31,23 +121,35 @@ class FormatHandler:
         else:
             priority_format = self.check_format_in_title(article.title)
 
-        for content in article:
-            self.process_content(content, format_=priority_format, known_formats=known_formats)
+        return priority_format, known_formats
 
+    def finish_article(
+        self,
+        article: MtgArticle,
+        priority_format: MtgFormatEnum | None,
+        known_formats: Dict[MtgFormatEnum, int],
+    ) -> MtgFormatEnum | None:
+        """Sets the formats of an article once all its content is processed
+
+        Returns:
+            The format of all the content of the article when all the formats found in the content
+            are the same, None otherwise. process_article sets it to the content.
+        """
         article.formats = list(known_formats)
 
         if priority_format is None:
             format_occurences = np.array(list(known_formats.values()))
             sum_occurences = format_occurences.sum()
             if sum_occurences == 0:
-                return
+                return None
 
             max_key_index = int(format_occurences.argmax())
 
             format_list = list(known_formats.keys())
 
             if format_occurences[max_key_index] == sum_occurences:
-                article.set_format(format_list[max_key_index])
+                return format_list[max_key_index]
+        return None
 
     def process_content(
         self,
@@ -95,19 +197,13 @@ class FormatHandler:
 
         # Get most occurence of a format name in the text
         if self.search_in_text:
-            format_list = list(MtgFormatEnum)
-            format_occurences = np.array(
-                [block.text.lower().count(format_) for format_ in format_list]
-            )
-            if format_occurences.sum() == 0:
+            format_ = FORMAT_MATCHER.most_common(block.text)
+            if format_ is None:
                 return
 
-            format_ = MtgFormatEnum(format_list[int(format_occurences.argmax())])
             block.format_ = format_
-
-            if format_ is not None:
-                known_formats.setdefault(format_, 0)
-                known_formats[format_] += 1
+            known_formats.setdefault(format_, 0)
+            known_formats[format_] += 1
 
     def process_decklist(
         self,
@@ -135,9 +231,222 @@ class FormatHandler:
         if title is None:
             return None
 
-        formats_in_title = [
-            MtgFormatEnum(format_) for format_ in list(MtgFormatEnum) if format_ in title.lower()
-        ]
-        if len(formats_in_title) == 1:
-            return formats_in_title[0]
-        return None
+        return FORMAT_MATCHER.single(title)
+
+    def process_corpus(
+        self, articles: List[MtgArticle], workers: int = 1, chunk_size: int = 10000
+    ) -> None:
+        """Predicts MTG formats of many articles at once, same results as process_article
+
+        The sections, blocks and decklists of all the articles are flattened into columnar arrays
+        and the format occurrences of the whole corpus are counted in a single vectorized pass.
+
+        Args:
+            articles (List[MtgArticle]): articles to process, modified in place.
+            workers (int): number of processes searching the formats in the texts of the blocks,
+                only used with search_in_text. The articles stay in the main process.
+            chunk_size (int): number of block texts sent to a process at once.
+        """
+        columns = CorpusColumns(articles, self.search_in_text)
+        if workers <= 1:
+            columns.process()
+            return
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            columns.process(executor=executor, chunk_size=chunk_size)
+
+
+class CorpusColumns:  # pylint: disable=too-many-instance-attributes,too-few-public-methods
+    """Columnar view of the content of many articles, used by FormatHandler.process_corpus
+
+    Every article, section, block and decklist is a node, stored in pre-order, i.e the order in
+    which process_article visits them. The formats are integer codes of self.format_list, -1
+    meaning no format. The codes of the MtgFormatEnum come first, followed by the other formats
+    declared by the decklists.
+
+    Columns:
+        kind: ARTICLE, SECTION, BLOCK or DECKLIST.
+        parent: index of the parent node, -1 for the articles.
+        depth: 0 for the articles, 1 for their content and so on.
+        article: index of the article of the node.
+        own: format found in the node itself, i.e the priority format of an article, the format of
+            the title of a section, the most common format of a block if search_in_text and the
+            declared format of a decklist.
+    """
+
+    def __init__(self, articles: List[MtgArticle], search_in_text: bool) -> None:
+        self.articles = articles
+        self.format_list: List[MtgFormatEnum | str] = list(MtgFormatEnum)
+        self.format_codes: Dict[str, int] = {
+            format_: code for code, format_ in enumerate(self.format_list)
+        }
+        self.tag_formats: List[List[MtgFormatEnum]] = []
+        self.nodes: List[MtgArticle | MtgSection | MtgBlock | Decklist] = []
+        self.title_codes: Dict[str, int] = {}
+
+        # One (kind, parent, depth, article, own) row per node
+        rows: List[Tuple[int, int, int, int, int]] = []
+        block_texts: List[Tuple[int, str]] = []
+
+        for article_index, article in enumerate(articles):
+            tag_formats = [
+                MtgFormatEnum(tag) for tag in article.tags if MtgFormatEnum.is_format(tag)
+            ]
+            self.tag_formats.append(tag_formats)
+
+            if len(tag_formats) == 1:
+                priority_format: MtgFormatEnum | None = tag_formats[0]
+            else:
+                priority_format = FORMAT_MATCHER.single(article.title)
+
+            rows.append((ARTICLE, -1, 0, article_index, self._code(priority_format)))
+            self.nodes.append(article)
+            self._flatten(article.content, len(rows) - 1, 1, rows, block_texts)
+
+        columns = np.array(rows, dtype=np.int64).reshape(-1, 5).T
+        self.kind, self.parent, self.depth, self.article, self.own = columns
+        self.block_texts = block_texts if search_in_text else []
+
+    def _code(self, format_: str | None) -> int:
+        if format_ is None:
+            return -1
+        if format_ not in self.format_codes:
+            self.format_codes[format_] = len(self.format_list)
+            self.format_list.append(format_)
+        return self.format_codes[format_]
+
+    def _flatten(
+        self,
+        content: List[MtgSection | MtgBlock | Decklist],
+        parent: int,
+        depth: int,
+        rows: List[Tuple[int, int, int, int, int]],
+        block_texts: List[Tuple[int, str]],
+    ) -> None:
+        """Adds the content of an article or a section to the rows, in pre-order"""
+        article_index = rows[parent][3]
+        add_row, add_node = rows.append, self.nodes.append
+        for child in content:
+            node_index = len(rows)
+            if isinstance(child, MtgBlock):
+                add_row((BLOCK, parent, depth, article_index, -1))
+                block_texts.append((node_index, child.text))
+            elif isinstance(child, MtgSection):
+                add_row((SECTION, parent, depth, article_index, self._title_code(child.title)))
+            elif isinstance(child, Decklist):
+                add_row((DECKLIST, parent, depth, article_index, self._code(child.format_)))
+            else:
+                continue
+            add_node(child)
+            if isinstance(child, MtgSection):
+                self._flatten(child.content, node_index, depth + 1, rows, block_texts)
+
+    def _title_code(self, title: str | None) -> int:
+        """Format of a section title, the titles repeated across the corpus are matched once"""
+        if not title:
+            return -1
+        code = self.title_codes.get(title)
+        if code is None:
+            code = self.title_codes[title] = self._code(FORMAT_MATCHER.single(title))
+        return code
+
+    def process(self, executor: Executor | None = None, chunk_size: int = 10000) -> None:
+        """Applies the priority rules of process_article to all the articles and writes back
+
+        Args:
+            executor (Executor | None): executor searching the formats in the texts of the blocks
+                by chunks of chunk_size texts, the texts are searched in process if None.
+            chunk_size (int): number of block texts per task of the executor.
+        """
+        # A section or a block takes the format of its parent if it has one, a decklist keeps its
+        # own format if it has one. The formats are resolved from the root of the trees downwards.
+        inherited = np.full(len(self.nodes), -1, dtype=np.int64)
+        resolved = self.own.copy()
+        keeps_own = self.kind == DECKLIST
+
+        for depth in range(1, int(self.depth.max(initial=0)) + 1):
+            at_depth = np.flatnonzero(self.depth == depth)
+            inherited[at_depth] = resolved[self.parent[at_depth]]
+            use_own = (self.own[at_depth] != -1) & (
+                keeps_own[at_depth] | (inherited[at_depth] == -1)
+            )
+            resolved[at_depth] = np.where(use_own, self.own[at_depth], inherited[at_depth])
+
+        # Blocks have no content, so the text of a block is only searched if it does not inherit a
+        # format, after the resolution of the other formats
+        if self.block_texts:
+            self._search_blocks(inherited, resolved, executor, chunk_size)
+
+        # Formats counted in known_formats by process_article
+        counted = np.flatnonzero(
+            (self.own != -1) & (self.kind != ARTICLE) & (keeps_own | (inherited == -1))
+        )
+        shape = (len(self.articles), len(self.format_list))
+        occurences = np.zeros(shape, dtype=np.int64)
+        np.add.at(occurences, (self.article[counted], self.own[counted]), 1)
+        first_seen = np.full(shape, len(self.nodes), dtype=np.int64)
+        np.minimum.at(first_seen, (self.article[counted], self.own[counted]), counted)
+
+        self._write_formats(resolved)
+        self._write_article_formats(occurences, first_seen)
+
+    def _search_blocks(
+        self,
+        inherited: np.ndarray,
+        resolved: np.ndarray,
+        executor: Executor | None,
+        chunk_size: int,
+    ) -> None:
+        """Sets the most common format of the texts of the blocks without inherited format"""
+        block_indices = np.array([node_index for node_index, _ in self.block_texts])
+        searched = inherited[block_indices] == -1
+        texts = [text for (_, text), search in zip(self.block_texts, searched) if search]
+        if not texts:
+            return
+
+        if executor is None:
+            occurences = FORMAT_MATCHER.count_matrix(texts)
+        else:
+            chunks = [texts[i : i + chunk_size] for i in range(0, len(texts), chunk_size)]
+            occurences = np.vstack(list(executor.map(FORMAT_MATCHER.count_matrix, chunks)))
+
+        # argmax returns the first maximum, i.e the first format of the enum on ties
+        found = block_indices[searched]
+        self.own[found] = np.where(occurences.sum(axis=1) > 0, occurences.argmax(axis=1), -1)
+        resolved[found] = self.own[found]
+
+    def _write_formats(self, resolved: np.ndarray) -> None:
+        # Blocks without format and decklists with their own format are left untouched
+        written = np.flatnonzero(
+            (self.kind == SECTION)
+            | ((self.kind == BLOCK) & (resolved != -1))
+            | ((self.kind == DECKLIST) & (self.own == -1))
+        )
+        # The code -1 of the nodes without format is the last element, None
+        format_list = self.format_list + [None]  # type: ignore
+        for node_index, code in zip(written.tolist(), resolved[written].tolist()):
+            self.nodes[node_index].format_ = format_list[code]  # type: ignore
+
+    def _write_article_formats(self, occurences: np.ndarray, first_seen: np.ndarray) -> None:
+        totals = occurences.sum(axis=1)
+        # Without priority format, an article takes the format of its content if it is unique
+        unique_codes = np.where(
+            (self.own[self.kind == ARTICLE] == -1)
+            & (totals > 0)
+            & (occurences.max(axis=1, initial=0) == totals),
+            occurences.argmax(axis=1),
+            -1,
+        )
+        # The formats found in an article, by order of first occurrence, come first in its row
+        order = np.argsort(first_seen, axis=1, kind='stable').tolist()
+        nb_found = np.count_nonzero(occurences, axis=1).tolist()
+
+        for article_index, article in enumerate(self.articles):
+            known_formats = dict.fromkeys(self.tag_formats[article_index])
+            for code in order[article_index][: nb_found[article_index]]:
+                known_formats.setdefault(self.format_list[code])  # type: ignore
+            article.formats = list(known_formats)
+
+        for article_index in np.flatnonzero(unique_codes != -1).tolist():
+            format_ = self.format_list[unique_codes[article_index]]
+            self.articles[article_index].set_format(format_)  # type: ignore
@@ -0,0 +1,61 @@
+"""Parses article pages in worker processes, each one holding its own spider
+
+Used by the pool of parse workers of a SiteSpider (see SiteSpider.parse_article_content_offloaded)
+and by mtgscrapper.reparse. The module does not import the spiders, the class of the spider is an
+argument of the initializer of the workers.
+
+Usage:
+    executor = ProcessPoolExecutor(initializer=init_worker, initargs=(MTGArenaZoneSpider,))
+    article = executor.submit(parse_html, (name, metadata, html)).result()
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, Tuple
+
+from scrapy.http import HtmlResponse
+
+from mtgscrapper.items import MtgArticle
+
+logger = logging.getLogger(__name__)
+
+# Name, metadata of the listing page and HTML page of an article
+CorpusEntry = Tuple[str, Dict, bytes]
+
+_SPIDER: Any = None
+
+
+def init_worker(
+    spider_cls: Any,
+    content_ids: bool = False,
+    spider_kwargs: Dict | None = None,
+) -> None:
+    """Creates the spider of the worker process, initializer of the pool of workers
+
+    Args:
+        spider_cls (type): SiteSpider class parsing the pages.
+        content_ids (bool): derives the ids of the content from the content, see hashing.
+        spider_kwargs (Dict | None): other arguments of the spider, such as fast_parse.
+    """
+    global _SPIDER  # pylint: disable=global-statement
+    _SPIDER = spider_cls(content_ids=content_ids, **(spider_kwargs or {}))
+
+
+def parse_html(entry: CorpusEntry) -> MtgArticle | None:
+    """Parses the HTML page of an article the same way the spider does
+
+    Returns the parsed article, or None if the page or its metadata cannot be parsed. Any
+    error is logged and only fails its article, so that a malformed page does not stop a corpus.
+    """
+    if _SPIDER is None:
+        raise RuntimeError('the worker has no spider, see init_worker.')
+    name, metadata, html = entry
+
+    try:
+        article = MtgArticle(**metadata)
+        response = HtmlResponse(url=article.url, body=html, encoding='utf-8')
+        return _SPIDER.parse_article_page(response, article)
+    except Exception:  # pylint: disable=broad-exception-caught
+        logger.exception('cannot parse article %s.', name)
+        return None
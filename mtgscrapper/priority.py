@@ -0,0 +1,57 @@
+"""Priority of the article requests, so that the newest and most useful articles are fetched first
+
+The priority of an article is the sum of:
+- a recency bonus, RECENCY_DAYS for an article of the day down to 0 for the articles older than
+  RECENCY_DAYS days, from its listing date,
+- FORMAT_TAG_BONUS if one of its tags is a MTG format, see MtgFormatEnum,
+- the bonus of the best signal of its title, see TITLE_SIGNALS, such as a decklist or a tier list.
+
+Scrapy fetches the requests of higher priority first. The listing pages have priority 0 or less,
+see listing_page_priority, so the new articles of a page are fetched before the older pages.
+"""
+
+from __future__ import annotations
+
+from datetime import date as Date
+from typing import Dict, List
+
+from mtgscrapper.items import parse_date
+from mtgscrapper.mtg_format_enum import MtgFormatEnum
+
+RECENCY_DAYS = 60
+FORMAT_TAG_BONUS = 20
+# Bonus of the titles containing these words, case insensitive
+TITLE_SIGNALS: Dict[str, int] = {
+    'decklist': 30,
+    'tier list': 30,
+    'metagame': 25,
+    'deck guide': 15,
+    'decks': 10,
+}
+
+
+def recency_bonus(date: str | None, today: Date) -> int:
+    """Returns RECENCY_DAYS minus the age of an article in days, 0 if older or without date"""
+    day = parse_date(date)
+    if day is None:
+        return 0
+    return max(0, RECENCY_DAYS - max(0, (today - day).days))
+
+
+def title_bonus(title: str) -> int:
+    """Returns the bonus of the best signal found in a title"""
+    lowered = title.lower()
+    return max((bonus for signal, bonus in TITLE_SIGNALS.items() if signal in lowered), default=0)
+
+
+def article_priority(title: str, tags: List[str], date: str | None, today: Date) -> int:
+    """Returns the priority of the request of an article, from its listing page metadata"""
+    priority = recency_bonus(date, today) + title_bonus(title)
+    if any(MtgFormatEnum.is_format(tag) for tag in tags):
+        priority += FORMAT_TAG_BONUS
+    return priority
+
+
+def listing_page_priority(listing_page: int) -> int:
+    """Returns the priority of a listing page, the deeper pages hold older articles"""
+    return 1 - listing_page
@@ -0,0 +1,163 @@
+"""Runs the article parser of the MTGArenaZoneSpider on a corpus of saved HTML pages
+
+The corpus is a directory, a zip or a tar archive containing, for each article, its HTML page
+'<name>.html' and a metadata file '<name>.json' holding the fields of the MtgArticle found on the
+listing page (id_, title, date, url, tags and author). Such a corpus is saved by the spider when
+run with the 'html_dir' argument.
+
+Usage:
+    python -m mtgscrapper.reparse corpus_dir/ -o articles.jsonl --workers 8
+"""
+
+from __future__ import annotations
+
+import os
+import json
+import logging
+import tarfile
+import zipfile
+import argparse
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from typing import Any, Callable, Deque, Dict, Generator, Iterable, Tuple
+
+from mtgscrapper.parse_workers import CorpusEntry, init_worker, parse_html
+from mtgscrapper.serialization import dumps_item
+from mtgscrapper.spiders.mtgazone import MTGArenaZoneSpider
+
+logger = logging.getLogger(__name__)
+
+
+def iter_corpus(path: str) -> Generator[CorpusEntry, None, None]:
+    """Yields the (name, metadata, html) of each article of a corpus
+
+    Args:
+        path (str): directory, zip or tar archive (optionally compressed) of the corpus.
+    """
+    if os.path.isdir(path):
+        yield from _iter_directory(path)
+    elif zipfile.is_zipfile(path):
+        yield from _iter_zip(path)
+    elif tarfile.is_tarfile(path):
+        yield from _iter_tar(path)
+    else:
+        raise ValueError(f'unsupported corpus {path}, expected a directory, zip or tar archive.')
+
+
+def _iter_directory(path: str) -> Generator[CorpusEntry, None, None]:
+    for filename in sorted(os.listdir(path)):
+        name, extension = os.path.splitext(filename)
+        if extension != '.html':
+            continue
+
+        metadata_path = os.path.join(path, f'{name}.json')
+        if not os.path.exists(metadata_path):
+            logger.warning('skipping %s, metadata file %s not found.', filename, metadata_path)
+            continue
+
+        with open(metadata_path, 'r', encoding='utf-8') as json_file:
+            metadata = json.load(json_file)
+        with open(os.path.join(path, filename), 'rb') as html_file:
+            yield name, metadata, html_file.read()
+
+
+def _iter_zip(path: str) -> Generator[CorpusEntry, None, None]:
+    with zipfile.ZipFile(path) as archive:
+        members = set(archive.namelist())
+        for member in sorted(members):
+            name, extension = os.path.splitext(member)
+            if extension != '.html':
+                continue
+            if f'{name}.json' not in members:
+                logger.warning('skipping %s, metadata file not found.', member)
+                continue
+            yield name, json.loads(archive.read(f'{name}.json')), archive.read(member)
+
+
+def _iter_tar(path: str) -> Generator[CorpusEntry, None, None]:
+    # Tar archives are read sequentially, the pages wait for their metadata and vice versa
+    pending: Dict[str, Dict[str, bytes]] = {}
+    with tarfile.open(path, 'r:*') as archive:
+        for member in archive:
+            name, extension = os.path.splitext(member.name)
+            member_file = archive.extractfile(member) if member.isfile() else None
+            if extension not in ('.html', '.json') or member_file is None:
+                continue
+
+            files = pending.setdefault(name, {})
+            files[extension] = member_file.read()
+            if len(files) == 2:
+                del pending[name]
+                yield name, json.loads(files['.json']), files['.html']
+
+    for name in pending:
+        logger.warning('skipping %s, html page or metadata file not found.', name)
+
+
+def imap_bounded(
+    executor: Executor, func: Callable, iterable: Iterable, max_pending: int
+) -> Generator[Any, None, None]:
+    """Same as executor.map, but keeps at most max_pending tasks in flight
+
+    Executor.map submits the whole iterable at once, which would load the whole corpus in memory.
+    """
+    futures: Deque[Future] = deque()
+    for element in iterable:
+        futures.append(executor.submit(func, element))
+        if len(futures) >= max_pending:
+            yield futures.popleft().result()
+
+    while len(futures) > 0:
+        yield futures.popleft().result()
+
+
+def reparse(
+    corpus_path: str, output_path: str, workers: int | None = None, content_ids: bool = False
+) -> Tuple[int, int]:
+    """Parses all the articles of a corpus in parallel and writes them to a JSONL file
+
+    With content_ids, the ids of the content are derived from the articles, so that parsing the
+    corpus twice gives the same ids, see hashing.assign_content_ids.
+    Returns the number of parsed and failed articles.
+    """
+    workers = workers or os.cpu_count() or 1
+    nb_parsed, nb_failed = 0, 0
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=init_worker,
+        initargs=(MTGArenaZoneSpider, content_ids),
+    ) as executor:
+        with open(output_path, 'w', encoding='utf-8') as output_file:
+            for article in imap_bounded(
+                executor, parse_html, iter_corpus(corpus_path), max_pending=4 * workers
+            ):
+                if article is None:
+                    nb_failed += 1
+                    continue
+                output_file.write(dumps_item(article) + '\n')
+                nb_parsed += 1
+
+    return nb_parsed, nb_failed
+
+
+def main() -> None:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n', maxsplit=1)[0])
+    parser.add_argument('corpus', help='directory, zip or tar archive of saved article pages.')
+    parser.add_argument('-o', '--output', required=True, help='path of the output JSONL file.')
+    parser.add_argument('-w', '--workers', type=int, default=None, help='number of processes.')
+    parser.add_argument(
+        '--content-ids', action='store_true', help='derive the content ids from the articles.'
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    nb_parsed, nb_failed = reparse(
+        args.corpus, args.output, workers=args.workers, content_ids=args.content_ids
+    )
+    logger.info('parsed %d articles, %d failed.', nb_parsed, nb_failed)
+
+
+if __name__ == '__main__':
+    main()
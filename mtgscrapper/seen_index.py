@@ -0,0 +1,64 @@
+"""Keeps track of the articles already crawled between two runs of a spider"""
+
+from __future__ import annotations
+
+import os
+import json
+from typing import Dict
+
+
+class SeenArticleIndex:
+    """Persistent index of the articles already crawled
+
+    The index maps the id of an article (the 'id' attribute of its card on the listing page) to
+    its url and date. It is stored as a JSON file so that a nightly crawl can skip the articles it
+    already knows and stop paginating once it reaches them.
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        self.path = path
+        self.articles: Dict[str, Dict[str, str | None]] = {}
+        self.urls: set[str] = set()
+
+        if path is not None and os.path.exists(path):
+            self.load()
+
+    def __contains__(self, article_id: str) -> bool:
+        return article_id in self.articles
+
+    def __len__(self) -> int:
+        return len(self.articles)
+
+    def is_known(self, article_id: str, url: str | None = None) -> bool:
+        """Returns True if the article was already crawled, either from its id or its url"""
+        return article_id in self.articles or (url is not None and url in self.urls)
+
+    def add(self, article_id: str, url: str | None = None, date: str | None = None) -> None:
+        """Marks an article as crawled"""
+        self.articles[article_id] = {'url': url, 'date': date}
+        if url is not None:
+            self.urls.add(url)
+
+    def load(self) -> None:
+        """Loads the index from its JSON file"""
+        if self.path is None:
+            raise ValueError('cannot load a seen article index without a path.')
+
+        with open(self.path, 'r', encoding='utf-8') as json_file:
+            self.articles = json.load(json_file)
+
+        self.urls = {entry['url'] for entry in self.articles.values() if entry['url'] is not None}
+
+    def save(self) -> None:
+        """Writes the index to its JSON file
+
+        The index is first written to a temporary file then moved, so that an interrupted crawl
+        never leaves a truncated index behind.
+        """
+        if self.path is None:
+            raise ValueError('cannot save a seen article index without a path.')
+
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as json_file:
+            json.dump(self.articles, json_file)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,117 @@
+"""Streaming JSON serialization of the Magic The Gathering items
+
+dumps_item serializes the dictionaries of item.to_dict() with orjson, or json if it is not
+installed, the fastest way to get the JSON of an item. MtgContent.to_dict builds the whole nested
+tree of dictionaries before it is serialized: dump_item instead writes the JSON of an item straight
+to a text stream, reading the attributes of the objects without copying them. It is about twice as
+slow as json.dumps and several times slower than orjson, but never holds the dictionaries of the
+item in memory (see benchmarks.bench_serialization). Both write the compact JSON of
+item.to_dict(), as produced by json.dumps(..., separators=(',', ':'), ensure_ascii=False) or
+orjson.
+
+The matching deserializer builds the items while the JSON is decoded, instead of decoding the
+whole dictionary tree and converting it afterwards with MtgArticle.from_dict.
+"""
+
+from __future__ import annotations
+
+import json
+from json.encoder import encode_basestring  # type: ignore
+from typing import Any, Dict, Generator, Iterable, TextIO
+
+from mtgscrapper.items import MtgItem, MtgArticle, MtgSection, MtgBlock, Decklist
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+
+def dump_item(item: MtgItem, stream: TextIO) -> None:
+    """Writes the JSON of an item, and its content, to a text stream"""
+    write = stream.write
+    write('{')
+    first = True
+    for key, value in vars(item).items():
+        if not first:
+            write(',')
+        first = False
+
+        write(encode_basestring(key))
+        write(':')
+        if key == 'content':
+            _dump_content(value, stream)
+        else:
+            _dump_value(value, stream)
+    write('}')
+
+
+def _dump_content(content_list: Iterable[MtgItem], stream: TextIO) -> None:
+    stream.write('[')
+    for i, content in enumerate(content_list):
+        if i > 0:
+            stream.write(',')
+        dump_item(content, stream)
+    stream.write(']')
+
+
+def _dump_value(value: Any, stream: TextIO) -> None:
+    if isinstance(value, str):
+        stream.write(encode_basestring(value))
+    elif isinstance(value, (list, tuple)):
+        stream.write('[')
+        for i, element in enumerate(value):
+            if i > 0:
+                stream.write(',')
+            _dump_value(element, stream)
+        stream.write(']')
+    else:
+        # None, booleans and numbers
+        stream.write(json.dumps(value))
+
+
+def dumps_item(item: MtgItem) -> str:
+    """Returns the JSON of an item as a string, see dump_item to stream it instead"""
+    if orjson is not None:
+        return orjson.dumps(item.to_dict()).decode('utf-8')  # pylint: disable=no-member
+    return json.dumps(item.to_dict(), separators=(',', ':'), ensure_ascii=False)
+
+
+def _item_hook(dict_: Dict) -> Any:
+    """Creates the items from the dictionaries as soon as they are decoded
+
+    The content of a section or an article is decoded before the section or the article itself, so
+    it is already a list of items.
+    """
+    match dict_.get('item_type'):
+        case 'block':
+            return MtgBlock(**dict_)
+        case 'decklist':
+            return Decklist(**dict_)
+        case 'section':
+            return MtgSection(**_content_args(dict_))
+        case 'article':
+            return MtgArticle(**_content_args(dict_))
+    return dict_
+
+
+def _content_args(dict_: Dict) -> Dict:
+    # Like MtgContent.from_dict, the unknown item types are skipped
+    dict_.pop('length', None)
+    dict_['content'] = [content for content in dict_['content'] if isinstance(content, MtgItem)]
+    return dict_
+
+
+def loads_article(json_string: str | bytes) -> MtgArticle:
+    """Creates an article from its JSON, same result as MtgArticle.from_dict(json.loads(...))"""
+    article = json.loads(json_string, object_hook=_item_hook)
+    if not isinstance(article, MtgArticle):
+        raise ValueError('the JSON does not contain an article.')
+    return article
+
+
+def load_articles(stream: Iterable[str | bytes]) -> Generator[MtgArticle, None, None]:
+    """Yields the articles of a JSON lines stream, such as an open file"""
+    for line in stream:
+        if line.strip():
+            yield loads_article(line)
@@ -27,10 +27,32 @@ CONCURRENT_REQUESTS = 16
 # Configure a delay for requests for the same website (default: 0)
 # See https://docs.scrapy.org/en/latest/topics/settings.html#download-delay
 # See also autothrottle settings and docs
+# Delay of the domains that are not handled by the AdaptiveThrottle extension
 DOWNLOAD_DELAY = 2
 # The download delay setting will honor only one of:
 CONCURRENT_REQUESTS_PER_DOMAIN = 16
-CONCURRENT_REQUESTS_PER_IP = 16
+# Per IP slots are deprecated and the default DownloaderAwarePriorityQueue of Scrapy refuses to
+# start with them. They would also bypass the per-domain slots of the AdaptiveThrottle extension
+CONCURRENT_REQUESTS_PER_IP = 0
+
+# Persist the scheduler queues and the seen requests in this directory, so that a crawl paused with
+# Ctrl-C resumes where it stopped, such as 'scrapy crawl mtgazone -s JOBDIR=crawls/mtgazone'
+# The requests of higher priority are dequeued first, see mtgscrapper.priority
+JOBDIR = None
+
+# Distributed crawl: the workers share the queue and the seen requests of a frontier, a SQLite file
+# ('sqlite:///crawls/frontier.sqlite') or a Redis database ('redis://host:6379/0'), see frontier
+FRONTIER_URI = None
+# Number of workers of the crawl, each one gets its share of the concurrency and delay of a domain
+FRONTIER_WORKERS = 1
+# Seconds without news of a worker after which its claimed requests are queued again
+FRONTIER_LEASE = 300
+# Name of the worker in the frontier, '<hostname>-<pid>' if None
+FRONTIER_WORKER_ID = None
+# Sets the FrontierScheduler and the budget of the workers when FRONTIER_URI is set
+ADDONS = {
+    'mtgscrapper.frontier.DistributedCrawl': 0,
+}
 
 # Disable cookies (enabled by default)
 COOKIES_ENABLED = False
@@ -55,18 +77,81 @@ COOKIES_ENABLED = False
 # DOWNLOADER_MIDDLEWARES = {
 #    'mtgscrapper.middlewares.MtgscrapperDownloaderMiddleware': 543,
 # }
+DOWNLOADER_MIDDLEWARES = {
+    # Runs after the HttpCompressionMiddleware (590) so that decoded bodies are cached
+    'mtgscrapper.conditional_cache.ConditionalCacheMiddleware': 580,
+}
 
 # Enable or disable extensions
 # See https://docs.scrapy.org/en/latest/topics/extensions.html
 # EXTENSIONS = {
 #    'scrapy.extensions.telnet.TelnetConsole': None,
 # }
+EXTENSIONS = {
+    'mtgscrapper.extensions.AdaptiveThrottle': 500,
+    'mtgscrapper.extensions.Instrumentation': 510,
+}
+
+# Adapt the delay and the concurrency of mtgazone.com to its latency and 429/503 responses
+ADAPTIVE_THROTTLE_ENABLED = True
+ADAPTIVE_THROTTLE_DOMAINS = ['mtgazone.com']
+ADAPTIVE_THROTTLE_START_DELAY = 2.0
+ADAPTIVE_THROTTLE_MIN_DELAY = 0.25
+ADAPTIVE_THROTTLE_MAX_DELAY = 60.0
+ADAPTIVE_THROTTLE_MIN_CONCURRENCY = 1
+ADAPTIVE_THROTTLE_MAX_CONCURRENCY = 8
+ADAPTIVE_THROTTLE_TARGET_LATENCY = 1.0
+ADAPTIVE_THROTTLE_MAX_ERROR_RATE = 0.05
+ADAPTIVE_THROTTLE_HTTP_CODES = [429, 503]
+
+# Time the stages of the spider, see mtgscrapper.instrumentation (disabled by default)
+INSTRUMENTATION_ENABLED = False
+INSTRUMENTATION_STAGES = [
+    'parse',
+    'parse_article_content',
+    'content_parser.parse_decklist',
+    'content_parser.add_package_content',
+    'content_parser.format_handler.process_article',
+]
+# Append a JSON snapshot of the measures to this file every INSTRUMENTATION_DUMP_INTERVAL seconds
+INSTRUMENTATION_DUMP_PATH = None
+INSTRUMENTATION_DUMP_INTERVAL = 60.0
+# Keep the cProfile profiles of the N slowest articles (every article is then profiled)
+INSTRUMENTATION_PROFILE_SLOWEST = 0
+INSTRUMENTATION_PROFILE_DIR = 'profiles'
 
 # Configure item pipelines
 # See https://docs.scrapy.org/en/latest/topics/item-pipeline.html
 # ITEM_PIPELINES = {
 #    'mtgscrapper.pipelines.MtgscrapperPipeline': 300,
 # }
+ITEM_PIPELINES = {
+    'mtgscrapper.item_pipelines.ContentDedupPipeline': 800,
+    'mtgscrapper.item_pipelines.CorpusStorePipeline': 850,
+    'mtgscrapper.item_pipelines.JsonLinesExportPipeline': 900,
+}
+
+# Drop the articles whose content did not change since the previous crawl (disabled if not set)
+CONTENT_HASH_INDEX = None
+
+# Store the articles in an indexed SQLite database (disabled if CORPUS_STORE_PATH is not set)
+CORPUS_STORE_PATH = None
+# Number of articles written in each transaction
+CORPUS_STORE_COMMIT_EVERY = 100
+
+# Stream the items to compressed JSONL files (disabled if JSONL_EXPORT_DIR is not set)
+JSONL_EXPORT_DIR = None
+# 'gzip', 'zstd' (requires the zstandard package) or None
+JSONL_EXPORT_COMPRESSION = 'gzip'
+# Start a new file after this number of items or uncompressed bytes
+JSONL_EXPORT_MAX_ITEMS = 10000
+JSONL_EXPORT_MAX_BYTES = 256 * 1024**2
+# Stream the items to the files without building their dictionaries, slower but uses less memory
+JSONL_EXPORT_STREAM_ITEMS = False
+# Writes the items from the newest to the oldest once the crawl is over. Every item is kept in
+# memory until then, only enable it for the article metadata of a listing sweep. Enabled by the
+# spiders sweeping the listing without parsing the articles (sweep_listing=true parse_article=false)
+JSONL_EXPORT_SORT_BY_DATE = False
 
 # Enable and configure the AutoThrottle extension (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/autothrottle.html
@@ -89,6 +174,14 @@ COOKIES_ENABLED = False
 # HTTPCACHE_IGNORE_HTTP_CODES = []
 # HTTPCACHE_STORAGE = 'scrapy.extensions.httpcache.FilesystemCacheStorage'
 
+# Revalidate the cached pages with ETag/Last-Modified conditional requests (disabled by default)
+CONDITIONAL_CACHE_ENABLED = False
+CONDITIONAL_CACHE_DIR = '.conditional_cache'
+# Maximum size of the compressed bodies, in bytes
+CONDITIONAL_CACHE_MAX_BYTES = 1024**3
+# Entries not revalidated since this number of seconds are evicted
+CONDITIONAL_CACHE_MAX_AGE = 30 * 24 * 3600
+
 # Set settings whose default value is deprecated to a future-proof value
 REQUEST_FINGERPRINTER_IMPLEMENTATION = '2.7'
 TWISTED_REACTOR = 'twisted.internet.asyncioreactor.AsyncioSelectorReactor'
@@ -0,0 +1,153 @@
+"""Declarative selectors of the sites crawled by the SiteSpider subclasses
+
+A site is described by a SiteConfig: its domain and start urls, and the XPath expressions finding
+the articles of its listing pages, the content of its articles and the fields of its decklists.
+The expressions are compiled once per site into lxml XPath objects, see compile_site, and shared by
+all the spiders and responses of the site, instead of being parsed again for each selector call.
+
+The expressions of the article cards are relative to a card, the ones of the decklists to a deck
+block and content_elements to an entry content element, the others to the page.
+"""
+
+from __future__ import annotations
+
+import re
+import functools
+from dataclasses import dataclass, fields
+from typing import Any, Callable, Dict, List, Tuple
+
+from lxml import etree
+
+from mtgscrapper.article_parser import iter_entry_content, parse_decklist
+
+# Fields of a SiteConfig that are not XPath expressions
+NOT_XPATH_FIELDS = frozenset(['domain', 'listing_page_pattern', 'decklist_tag', 'table_tag'])
+
+
+@dataclass(frozen=True, kw_only=True)
+class SiteConfig:  # pylint: disable=too-many-instance-attributes
+    """Selectors and crawl parameters of a site
+
+    Args:
+        domain (str): domain of the site, its downloader slot.
+        start_urls (Tuple[str, ...]): first listing pages.
+        concurrency (int | None): concurrent requests to the domain, CONCURRENT_REQUESTS_PER_DOMAIN
+            if None.
+        listing_page_pattern (str): regular expression of the page number in a listing page url,
+            replaced to build the urls of the other listing pages.
+        decklist_tag, table_tag (str): tags of the decklists and tables among the content elements,
+            the headings are the h1-h6 tags and the other elements are paragraphs.
+        entry_parser (Callable | None): single pass parser of the entry content elements yielding
+            the sections of an article, such as article_parser.iter_entry_content. The XPath
+            selectors are used if None. It is called with the decklist_parser keyword argument,
+            the parser of its deck blocks, and assign_ids, see MtgItem.assign_id.
+        decklist_parser (Callable | None): single pass parser of a deck block returning its
+            Decklist, such as article_parser.parse_decklist, used along entry_parser. It is called
+            with the assign_id keyword argument.
+    """
+
+    domain: str
+    start_urls: Tuple[str, ...]
+    concurrency: int | None = None
+
+    # Listing pages
+    article_cards: str
+    article_id: str
+    article_title: str
+    article_url: str
+    article_date: str
+    article_author: str
+    article_tags: str
+    next_page: str
+    page_links: str
+    page_link_number: str = './text()'
+    page_link_url: str = './@href'
+    listing_page_pattern: str = r'/page/\d+/'
+
+    # Articles
+    entry_content: str
+    content_elements: str
+    element_text: str = './/text()'
+    table_rows: str = './/tr'
+    decklist_tag: str = 'div'
+    table_tag: str = 'figure'
+    entry_parser: Callable | None = None
+    decklist_parser: Callable | None = None
+
+    # Decklists
+    decklist_title: str
+    decklist_format: str
+    decklist_best_of: str
+    decklist_archetype: str
+    decklist_main_cards: str
+    decklist_sideboard_cards: str
+
+
+class CompiledSite:
+    """XPath objects of the selectors of a site, see compile_site
+
+    The expressions are evaluated on lxml elements, such as the root of a Scrapy selector, and
+    return plain strings for the text and attribute nodes.
+    """
+
+    def __init__(self, config: SiteConfig) -> None:
+        self.config = config
+        self.xpaths: Dict[str, etree.XPath] = {
+            field.name: etree.XPath(getattr(config, field.name), smart_strings=False)
+            for field in fields(config)
+            if field.type == 'str' and field.name not in NOT_XPATH_FIELDS
+        }
+        self.listing_page_pattern = re.compile(config.listing_page_pattern)
+
+    def all(self, name: str, element: Any) -> List:
+        """Returns all the results of a selector, from an element"""
+        return self.xpaths[name](element)
+
+    def first(self, name: str, element: Any, default: Any = None) -> Any:
+        """Returns the first result of a selector from an element, or default, like Selector.get"""
+        results = self.xpaths[name](element)
+        return results[0] if len(results) > 0 else default
+
+    def text(self, name: str, element: Any) -> str:
+        """Returns the concatenated text nodes of a selector, from an element"""
+        return ''.join(self.xpaths[name](element))
+
+
+@functools.lru_cache(maxsize=None)
+def compile_site(config: SiteConfig) -> CompiledSite:
+    """Compiles the selectors of a site, once per configuration"""
+    return CompiledSite(config)
+
+
+MTGAZONE = SiteConfig(
+    domain='mtgazone.com',
+    start_urls=('https://mtgazone.com/articles/',),
+    concurrency=8,
+    article_cards='//article[contains(@class, "entry-card post")]',
+    article_id='./@id',
+    article_title='./h2[@class="entry-title"]/a/text()',
+    article_url='./h2[@class="entry-title"]/a/@href',
+    article_date='./ul[@data-type="icons:none"]/descendant-or-self::time/text()',
+    article_author='./ul[@data-type="icons:none"]/descendant-or-self::span/text()',
+    article_tags='./ul[@data-type="simple:none"]/li/a/text()',
+    next_page='//a[@class="next page-numbers"]/@href',
+    page_links='//a[@class="page-numbers"]',
+    entry_content='//article[contains(@class, "post type-post")]/div[@class="entry-content"]',
+    content_elements=(
+        './p|h1|h2|h3|h4|h6|ul|div[@class="deck-block"]|figure[@class="wp-block-table"]'
+    ),
+    entry_parser=iter_entry_content,
+    decklist_parser=parse_decklist,
+    decklist_title='.//div[@class="name"]/text()',
+    decklist_format='.//div[@class="format"]/text()',
+    decklist_best_of='.//div[@class="bo"]/text()',
+    decklist_archetype='.//div[@class="archetype"]/text()',
+    decklist_main_cards=(
+        './/div[@class="decklist main"]//div[contains(@class,"card")]'
+        '/@*[name()="data-quantity" or name()="data-name"]'
+    ),
+    decklist_sideboard_cards=(
+        './/div[@class="decklist sideboard"]//div[contains(@class,"card")]'
+        '/@*[name()="data-quantity" or name()="data-name"]'
+    ),
+)
@@ -0,0 +1,384 @@
+"""Contains the base Spider of the sites described by a SiteConfig, see mtgscrapper.sites"""
+
+import os
+import json
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date as Date
+from typing import Any, Dict, List
+
+from scrapy import Spider
+from scrapy.crawler import Crawler
+from scrapy.settings import BaseSettings
+
+from mtgscrapper.article_filter import ArticleFilter, FilterRules
+from mtgscrapper.content_parser import ContentParser
+from mtgscrapper.items import MtgArticle
+from mtgscrapper.parse_workers import init_worker, parse_html
+from mtgscrapper.priority import article_priority, listing_page_priority
+from mtgscrapper.seen_index import SeenArticleIndex
+from mtgscrapper.sites import CompiledSite, SiteConfig, compile_site
+
+# Settings of the item pipelines needing the content of the articles, which are not streamed
+STREAMING_UNSUPPORTED = ('CONTENT_HASH_INDEX', 'CORPUS_STORE_PATH')
+
+
+def to_bool(value: bool | str, name: str) -> bool:
+    """Converts a boolean spider argument, which is a string when given on the command line"""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.lower() in ('true', 'false'):
+        return value.lower() == 'true'
+    raise ValueError(f'wrong type for {name} variable.')
+
+
+class SiteSpider(Spider):  # pylint: disable=too-many-instance-attributes
+    """Scrapy Spider crawling the listing pages and the articles of the site of a SiteConfig
+
+    The subclasses set the name and the site of the spider. The selectors of the site are compiled
+    once and shared by the instances of the spider.
+    """
+
+    site: SiteConfig
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-locals
+        self,
+        *args: Any,
+        forbidden_tags: List[str] | None = None,
+        forbidden_titles: List[str] | None = None,
+        filter_rules: str | None = None,
+        parse_article: bool | str = True,
+        seen_index: str | None = None,
+        html_dir: str | None = None,
+        fast_parse: bool | str = True,
+        sweep_listing: bool | str = False,
+        content_ids: bool | str = False,
+        stream_sections: bool | str = False,
+        prioritize: bool | str = True,
+        parse_workers: int | str = 0,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.selectors: CompiledSite = compile_site(self.site)
+
+        # Include and exclude rules of the articles, from a JSON file or from the forbidden lists
+        if filter_rules is not None:
+            rules = FilterRules.from_json(filter_rules)
+        else:
+            rules = FilterRules(
+                exclude={
+                    'tags': forbidden_tags or ['Premium'],
+                    'titles': forbidden_titles or ['Teamfight', 'Genshin', 'Spellslingers'],
+                }
+            )
+        self.article_filter = ArticleFilter(rules)
+
+        # Incremental mode: skips the known articles and stops paginating once a page is known
+        self.seen_index = SeenArticleIndex(seen_index) if seen_index is not None else None
+
+        # Saves the article pages to be parsed again offline, see mtgscrapper.reparse
+        self.html_dir = html_dir
+        if self.html_dir is not None:
+            os.makedirs(self.html_dir, exist_ok=True)
+
+        self.parse_article = to_bool(parse_article, 'parse_article')
+
+        # Parses the article content with the single pass parser of the site, if it has one
+        self.fast_parse = to_bool(fast_parse, 'fast_parse') and self.site.entry_parser is not None
+
+        # Queues all the listing pages from the first one instead of following the next page links
+        self.sweep_listing = to_bool(sweep_listing, 'sweep_listing')
+
+        # Derives the ids of the sections, blocks and decklists from their content, see hashing
+        self.content_ids = to_bool(content_ids, 'content_ids')
+
+        # Created once, its stages can then be timed by the Instrumentation extension
+        self.content_parser = ContentParser(
+            self.site, self.selectors, fast_parse=self.fast_parse, content_ids=self.content_ids
+        )
+
+        # Yields each top-level section of an article once parsed, then the article, see streaming
+        self.stream_sections = to_bool(stream_sections, 'stream_sections')
+
+        # Fetches the newest and most useful articles first, see mtgscrapper.priority
+        self.prioritize = to_bool(prioritize, 'prioritize')
+        self.today = Date.today()
+
+        # Parses the articles in a pool of processes instead of the reactor thread (0: inline), at
+        # most two pending pages per process, see parse_article_content_offloaded
+        self.parse_workers = int(parse_workers)
+        self.parse_pool: ProcessPoolExecutor | None = None
+        self.parse_slots: asyncio.Semaphore | None = None
+        if self.parse_workers > 0:
+            self.parse_slots = asyncio.Semaphore(2 * self.parse_workers)
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler, *args: Any, **kwargs: Any) -> Any:
+        """Creates the spider, the articles of a sweep without their content are written by date
+
+        The listing pages of a sweep arrive in any order. The article metadata is small enough to
+        be buffered until the end of the crawl, see JSONL_EXPORT_SORT_BY_DATE, which can still be
+        disabled on the command line. A sweep of the full articles needs the setting explicitly.
+
+        Raises a ValueError if the sections are streamed to the content dedup or the corpus store,
+        which need the content of the articles, see mtgscrapper.streaming.
+        """
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        for setting in STREAMING_UNSUPPORTED:
+            if spider.stream_sections and crawler.settings.get(setting) is not None:
+                raise ValueError(
+                    f'stream_sections cannot be used with {setting}, '
+                    'the streamed articles have no content.'
+                )
+        if spider.sweep_listing and not spider.parse_article:
+            crawler.settings.set('JSONL_EXPORT_SORT_BY_DATE', True, priority='spider')
+        return spider
+
+    @classmethod
+    def update_settings(cls, settings: BaseSettings) -> None:
+        """Limits the concurrent requests to the domain of the site, see DOWNLOAD_SLOTS
+
+        A slot configured in the settings is left untouched.
+        """
+        super().update_settings(settings)
+        site = getattr(cls, 'site', None)
+        if site is None or site.concurrency is None:
+            return
+        slots = dict(settings.getdict('DOWNLOAD_SLOTS'))
+        slots.setdefault(site.domain, {'concurrency': site.concurrency})
+        settings.set('DOWNLOAD_SLOTS', slots, priority='spider')
+
+    def parse(  # pylint: disable=arguments-differ
+        self, response: Any, listing_page: int = 1
+    ) -> Any:
+        """Overrides parse method of the scrapy.Spider class
+
+        Parses the articles from the listing page and runs a spider to crawl the content of the
+        article.
+        The articles rejected by the article filter are skipped, and the pagination stops at the
+        first listing page whose articles are all older than its since rule.
+        In incremental mode, the articles of the seen index are skipped and the pagination stops at
+        the first listing page whose articles are all known. The rejected articles are added to the
+        seen index too, a seen index is only used with the filter rules it was built with.
+        In sweep mode, all the listing pages are requested at once from the first one, see
+        queue_listing_pages.
+        The articles are requested with the priority of article_priority.
+        """
+        selectors = self.selectors
+        nb_articles, nb_known_articles, nb_old_articles = 0, 0, 0
+
+        for card in selectors.all('article_cards', response.selector.root):
+            article = self.listing_article(card)
+
+            nb_articles += 1
+            nb_old_articles += self.article_filter.is_too_old(article.date)
+            if self.seen_index is not None:
+                if self.seen_index.is_known(article.id_, article.url):  # type: ignore
+                    nb_known_articles += 1
+                    continue
+
+            rejection = self.article_filter.rejection(
+                article.title, article.tags, author=article.author, date=article.date
+            )
+            if rejection is not None:
+                self.inc_stats(f'article_filter/{rejection}')
+                # Rejected articles are never crawled with these rules, they are known as soon as
+                # they are seen, so that a listing page of known and rejected articles stops
+                self.mark_as_seen(article.id_, article.url, article.date)  # type: ignore
+                continue
+
+            if self.parse_article:
+                yield response.follow(
+                    article.url,
+                    self.article_callback(),
+                    cb_kwargs={'article': article},
+                    priority=self.article_priority(article),
+                )
+            else:
+                self.mark_as_seen(article.id_, article.url, article.date)  # type: ignore
+                yield article
+
+        if 0 < nb_articles == nb_known_articles:
+            self.logger.info('listing page %s is already known, stopping pagination.', response.url)
+            return
+
+        if 0 < nb_articles == nb_old_articles:
+            self.logger.info('listing page %s is older than the filter, stopping.', response.url)
+            return
+
+        if self.sweep_listing:
+            if listing_page == 1:
+                yield from self.queue_listing_pages(response)
+            return
+
+        next_page = selectors.first('next_page', response.selector.root)
+        if next_page is not None:
+            yield response.follow(next_page, self.parse)
+
+    def listing_article(self, card: Any) -> MtgArticle:
+        """Creates the article of a card of a listing page, without its content"""
+        selectors = self.selectors
+        return MtgArticle(
+            id_=selectors.first('article_id', card),
+            title=selectors.first('article_title', card).strip(),
+            date=selectors.first('article_date', card),
+            url=selectors.first('article_url', card),
+            tags=selectors.all('article_tags', card),
+            author=selectors.first('article_author', card),
+        )
+
+    def queue_listing_pages(self, response: Any) -> Any:
+        """Requests the listing pages 2 to N at once, N being the last page number of the first page
+
+        The page URLs are built from the link to the last page, such as '/articles/page/523/'. The
+        pages are crawled in parallel, in any order: the JSONL_EXPORT_SORT_BY_DATE setting writes
+        the articles by date, it is enabled by from_crawler when the articles are not parsed. The
+        incremental mode does not stop the pagination of a sweep.
+        """
+        selectors = self.selectors
+        last_page, last_page_url = 1, None
+        for page_link in selectors.all('page_links', response.selector.root):
+            page_number = selectors.first('page_link_number', page_link, '').strip()
+            if page_number.isdigit() and int(page_number) > last_page:
+                last_page, last_page_url = int(page_number), selectors.first(
+                    'page_link_url', page_link
+                )
+
+        if last_page_url is None:
+            return
+
+        self.logger.info('sweeping %d listing pages.', last_page)
+        for page in range(2, last_page + 1):
+            page_url = selectors.listing_page_pattern.sub(f'/page/{page}/', last_page_url)
+            yield response.follow(
+                page_url,
+                self.parse,
+                cb_kwargs={'listing_page': page},
+                priority=listing_page_priority(page) if self.prioritize else 0,
+            )
+
+    def article_priority(self, article: MtgArticle) -> int:
+        """Returns the priority of the request of an article, 0 if the spider does not prioritize"""
+        if not self.prioritize:
+            return 0
+        return article_priority(article.title, article.tags, article.date, self.today)
+
+    def article_callback(self) -> Any:
+        """Returns the callback of the article requests, offloaded if the spider has parse workers
+
+        The streamed articles are always parsed inline, their items are yielded as they are built.
+        """
+        if self.parse_workers > 0 and not self.stream_sections:
+            return self.parse_article_content_offloaded
+        return self.parse_article_content
+
+    async def parse_article_content_offloaded(self, response: Any, article: MtgArticle) -> Any:
+        """Same as parse_article_content, but the page is parsed in the pool of parse workers
+
+        The reactor thread only waits for the result, so the downloads go on during the parse of
+        long articles and the parses of a crawl run on several cores. The workers parse the pages
+        with a spider of the same class and options, see mtgscrapper.parse_workers.
+        """
+        if self.html_dir is not None:
+            self.save_html(response, article, self.html_dir)
+
+        if self.parse_slots is None:
+            raise RuntimeError('the spider has no parse workers, see the parse_workers argument.')
+        async with self.parse_slots:
+            future = self.start_parse_pool().submit(
+                parse_html, (str(article.id_), self.listing_metadata(article), response.body)
+            )
+            parsed_article = await asyncio.wrap_future(future)
+
+        if parsed_article is None:
+            self.inc_stats('parse_workers/failed')
+            return None
+        self.mark_as_seen(article.id_, article.url, article.date)  # type: ignore
+        return [parsed_article]
+
+    def start_parse_pool(self) -> ProcessPoolExecutor:
+        """Returns the pool of parse workers, started on the first offloaded article"""
+        if self.parse_pool is None:
+            # Spawned rather than forked, the workers do not inherit the state of the reactor
+            self.parse_pool = ProcessPoolExecutor(
+                max_workers=self.parse_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=init_worker,
+                initargs=(type(self), self.content_ids, {'fast_parse': self.fast_parse}),
+            )
+        return self.parse_pool
+
+    def parse_article_content(self, response: Any, article: MtgArticle) -> Any:
+        """Crawls the content of an article
+
+        Returns the parsed article in a list: the article is yielded as is and serialized by the
+        exporters (see mtgscrapper.serialization). Scrapy iterates over the output of the
+        callbacks and an article iterates over its sections, hence the list.
+        In streaming mode, returns the generator of stream_article_content.
+        """
+        if self.html_dir is not None:
+            self.save_html(response, article, self.html_dir)
+
+        if self.stream_sections:
+            return self.stream_article_content(self._entry_content(response, article), article)
+        return [self.parse_article_page(response, article)]
+
+    def _entry_content(self, response: Any, article: MtgArticle) -> List:
+        """Returns the content elements of an article page, raises a ValueError if there is none"""
+        content = self.selectors.all('entry_content', response.selector.root)
+        if len(content) == 0:
+            raise ValueError(f'article not found for url {article.url}')
+        return content
+
+    def parse_article_page(self, response: Any, article: MtgArticle) -> MtgArticle:
+        """Fills the content of an article from its page, formats and ids included, returns it"""
+        self.content_parser.parse(self._entry_content(response, article), article)
+        self.mark_as_seen(article.id_, article.url, article.date)  # type: ignore
+        return article
+
+    def stream_article_content(self, content: List, article: MtgArticle) -> Any:
+        """Yields the top-level sections of an article and their decklists as they are parsed
+
+        See ContentParser.stream, the article is yielded last without its content.
+        """
+        yield from self.content_parser.stream(content, article)
+        self.mark_as_seen(article.id_, article.url, article.date)  # type: ignore
+
+    def listing_metadata(self, article: MtgArticle) -> Dict[str, Any]:
+        """Returns the fields of an article found on the listing page"""
+        return {
+            'id_': article.id_,
+            'title': article.title,
+            'date': article.date,
+            'url': article.url,
+            'tags': article.tags,
+            'author': article.author,
+        }
+
+    def save_html(self, response: Any, article: MtgArticle, html_dir: str) -> None:
+        """Saves the page of an article and the metadata found on the listing page"""
+        with open(os.path.join(html_dir, f'{article.id_}.json'), 'w') as json_file:
+            json.dump(self.listing_metadata(article), json_file)
+        with open(os.path.join(html_dir, f'{article.id_}.html'), 'wb') as html_file:
+            html_file.write(response.body)
+
+    def mark_as_seen(self, article_id: str, url: str | None, date: str | None) -> None:
+        """Adds an article to the seen index, if the spider runs in incremental mode"""
+        if self.seen_index is not None:
+            self.seen_index.add(article_id, url=url, date=date)
+
+    def closed(self, reason: str) -> None:
+        """Called by Scrapy when the spider closes, saves the seen index and stops the workers"""
+        if self.parse_pool is not None:
+            self.parse_pool.shutdown(wait=True, cancel_futures=True)
+            self.parse_pool = None
+        if self.seen_index is not None:
+            self.logger.info('saving %d seen articles (%s).', len(self.seen_index), reason)
+            self.seen_index.save()
+
+    def inc_stats(self, key: str) -> None:
+        """Increments a stat of the crawl, if the spider runs in a crawler"""
+        crawler = getattr(self, 'crawler', None)
+        if crawler is not None and crawler.stats is not None:
+            crawler.stats.inc_value(key)
@@ -0,0 +1,160 @@
+"""Splits an article into section and decklist items, and assembles them back
+
+In streaming mode (the 'stream_sections' argument of the MTGArenaZoneSpider), an article is not
+returned as a single dictionary once it is fully parsed: each top-level section is yielded as soon
+as the next one starts, then the article itself, without its content.
+
+The items are linked to their article:
+- a section item is the dictionary of a top-level section, without its decklists, with the
+  'article_id' and its 'position' in the content of the article,
+- a decklist item is the dictionary of a decklist, with the 'article_id', the 'parent_id' of its
+  section and its 'position' in the content of that section,
+- the article item has an empty content, the number of sections 'nb_sections', and the
+  'content_format' given to all its content when the formats found in the whole article agree (see
+  FormatHandler.finish_article), which could not be known when the sections were yielded.
+
+The consumers of the whole articles do not take the streamed items: the spider refuses to stream
+with the ContentDedupPipeline or the CorpusStorePipeline enabled, and the CorpusReader refuses a
+file of streamed items. Such a file is read with assemble_article first.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Generator, Iterable, List
+
+from mtgscrapper.hashing import assign_node_ids
+from mtgscrapper.items import MtgArticle, MtgSection, SectionTreeBuilder
+from mtgscrapper.mtg_format_enum import MtgFormatEnum
+from mtgscrapper.mtg_format_handler import FormatHandler
+
+
+def iter_article_items(
+    sections: Iterable[MtgSection],
+    article: MtgArticle,
+    format_handler: FormatHandler,
+    content_ids: bool = False,
+) -> Generator[Dict, None, None]:
+    """Yields the items of the top-level sections of an article as they are parsed, then the article
+
+    A top-level section is complete, formats and ids included, once the next one starts. It is then
+    yielded and dropped from the article, which is yielded last without its content. Only the
+    current top-level section of the article is kept in memory.
+
+    Args:
+        sections (Iterable[MtgSection]): flat sections of the article, as they are parsed.
+        article (MtgArticle): article of the sections, without content.
+        format_handler (FormatHandler): finds the formats of the sections.
+        content_ids (bool): derives the ids of the sections from their content, see hashing.
+    """
+    builder = SectionTreeBuilder(article)
+    priority_format, known_formats = format_handler.start_article(article)
+    position = 0
+
+    def finish_section() -> List[Dict]:
+        section = article.content.pop(0)
+        format_handler.process_content(section, known_formats, format_=priority_format)
+        if content_ids:
+            assign_node_ids(section, article.id_, position)  # type: ignore
+        return split_section(section, article.id_, position)  # type: ignore
+
+    for section in sections:
+        builder.add(section)
+        if len(article.content) > 1:
+            yield from finish_section()
+            position += 1
+
+    if len(article.content) == 0:
+        raise ValueError(f'article of id {article.id_} with url {article.url} is empty.')
+    yield from finish_section()
+
+    content_format = format_handler.finish_article(article, priority_format, known_formats)
+    yield article_item(article, position + 1, content_format)
+
+
+def split_section(section: MtgSection, article_id: str, position: int) -> List[Dict]:
+    """Returns the items of a top-level section: the section, then its decklists"""
+    section_dict = section.to_dict()
+    section_dict['article_id'] = article_id
+    section_dict['position'] = position
+
+    decklists: List[Dict] = []
+    _pop_decklists(section_dict, article_id, decklists)
+    return [section_dict] + decklists
+
+
+def _pop_decklists(node: Dict, article_id: str, decklists: List[Dict]) -> None:
+    content = []
+    for position, child in enumerate(node['content']):
+        if child['item_type'] == 'decklist':
+            child['article_id'] = article_id
+            child['parent_id'] = node['id_']
+            child['position'] = position
+            decklists.append(child)
+            continue
+        if child['item_type'] == 'section':
+            _pop_decklists(child, article_id, decklists)
+        content.append(child)
+    node['content'] = content
+
+
+def article_item(
+    article: MtgArticle, nb_sections: int, content_format: MtgFormatEnum | None
+) -> Dict:
+    """Returns the item of a streamed article, once its sections were yielded"""
+    article_dict = article.to_dict()
+    article_dict['content'] = []
+    article_dict['length'] = 0
+    article_dict['nb_sections'] = nb_sections
+    article_dict['content_format'] = content_format
+    return article_dict
+
+
+def assemble_article(items: Iterable[Dict]) -> Dict:
+    """Rebuilds the dictionary of an article from its streamed items, in any order
+
+    Gives the same dictionary as the spider without streaming.
+    """
+    article: Dict | None = None
+    sections: Dict[int, Dict] = {}
+    decklists: List[Dict] = []
+    for item in items:
+        match item['item_type']:
+            case 'article':
+                article = dict(item)
+            case 'section':
+                sections[item['position']] = dict(item)
+            case 'decklist':
+                decklists.append(dict(item))
+
+    if article is None:
+        raise ValueError('the article item is missing.')
+
+    nodes: Dict[str, Dict] = {}
+    for section in sections.values():
+        _index_sections(section, nodes)
+    for decklist in sorted(decklists, key=lambda decklist: decklist['position']):
+        nodes[decklist.pop('parent_id')]['content'].insert(decklist.pop('position'), decklist)
+        del decklist['article_id']
+
+    content_format = article.pop('content_format')
+    nb_sections = article.pop('nb_sections')
+    article['content'] = [sections[position] for position in range(nb_sections)]
+    article['length'] = nb_sections
+    for section in article['content']:
+        del section['article_id'], section['position']
+        if content_format is not None:
+            _set_format(section, content_format)
+    return article
+
+
+def _index_sections(section: Dict, nodes: Dict[str, Dict]) -> None:
+    nodes[section['id_']] = section
+    for child in section['content']:
+        if child['item_type'] == 'section':
+            _index_sections(child, nodes)
+
+
+def _set_format(node: Dict, format_: str) -> None:
+    node['format_'] = format_
+    for child in node.get('content', []):
+        _set_format(child, format_)
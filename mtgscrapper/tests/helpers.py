@@ -0,0 +1,119 @@
+"""Helpers shared by the tests: the test pages and the comparison of the article dictionaries"""
+
+import os
+import re
+import sys
+import json
+from typing import Any, Dict, List, Tuple
+
+from scrapy.http import HtmlResponse
+
+from mtgscrapper.items import MtgArticle
+
+# Fields of an article found on the listing page
+LISTING_FIELDS = ('id_', 'title', 'date', 'url', 'tags', 'author')
+
+# Crawls the stand-in site in a separate process, the reactor cannot be restarted
+SPIDER_SCRIPT = '''
+import sys
+import json
+import resource
+
+from scrapy.crawler import CrawlerProcess
+from scrapy.utils.project import get_project_settings
+
+from mtgscrapper.spiders.mtgazone import MTGArenaZoneSpider
+
+start_url, extra_settings, stats_path = sys.argv[1], json.loads(sys.argv[2]), sys.argv[3]
+
+settings = get_project_settings()
+settings.setdict(
+    {
+        'ROBOTSTXT_OBEY': False,
+        'DOWNLOAD_DELAY': 0,
+        'ADAPTIVE_THROTTLE_ENABLED': False,
+        'LOG_LEVEL': 'WARNING',
+        **extra_settings,
+    },
+    priority='cmdline',
+)
+process = CrawlerProcess(settings)
+crawler = process.create_crawler(MTGArenaZoneSpider)
+process.crawl(crawler, start_urls=[start_url])
+process.start()
+
+stats = crawler.stats.get_stats()
+stats['process/peak_rss_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+with open(stats_path, 'w') as stats_file:
+    json.dump(stats, stats_file, default=str)
+'''
+
+
+def listing_response() -> HtmlResponse:
+    """Loads the listing page stored in the data folder"""
+    with open(os.path.join('data', 'test_listing.html'), 'rb') as html_file:
+        body = html_file.read()
+    return HtmlResponse(url='https://mtgazone.com/articles/', body=body, encoding='utf-8')
+
+
+def load_article_dict() -> Dict:
+    """Loads the reference dictionary of the test article"""
+    with open(os.path.join('data', 'test_article.json'), 'r') as json_file:
+        return json.load(json_file)
+
+
+def article_response() -> Tuple[HtmlResponse, MtgArticle]:
+    """Returns the response of the test article page and the article of its listing"""
+    article_dict = load_article_dict()
+    with open(os.path.join('data', 'test_article.html'), 'rb') as html_file:
+        html = html_file.read()
+
+    response = HtmlResponse(url=article_dict['url'], body=html, encoding='utf-8')
+    return response, MtgArticle(**{key: article_dict[key] for key in LISTING_FIELDS})
+
+
+def spider_command(start_url: str, settings: Dict[str, Any], stats_path: str) -> List[str]:
+    """Returns the command crawling the stand-in site from start_url, see SPIDER_SCRIPT
+
+    The settings override the project settings and the stats of the crawl are written to
+    stats_path as JSON, with the peak RSS of the crawl process in 'process/peak_rss_kb'.
+    """
+    return [sys.executable, '-c', SPIDER_SCRIPT, start_url, json.dumps(settings), stats_path]
+
+
+def build_site(base_url: str, nb_listing_pages: int) -> Dict[str, bytes]:
+    """Returns the listing pages of a stand-in site and their articles
+
+    Each listing page is a copy of the test listing page, its links are prefixed with '/p<n>/' so
+    that the articles of the pages are distinct, and all the articles are the test article.
+    """
+    with open(os.path.join('data', 'test_listing.html'), 'r', encoding='utf-8') as html_file:
+        listing = html_file.read()
+    with open(os.path.join('data', 'test_article.html'), 'rb') as html_file:
+        article = html_file.read()
+
+    pages = {}
+    for page in range(1, nb_listing_pages + 1):
+        html = listing.replace(
+            'https://mtgazone.com/articles/page/2/', f'{base_url}/articles/page/{page + 1}/'
+        )
+        if page == nb_listing_pages:
+            html = html.replace('class="next page-numbers"', 'class="last-page"')
+        html = html.replace('https://mtgazone.com/', f'{base_url}/p{page}/')
+        pages['/articles/' if page == 1 else f'/articles/page/{page}/'] = html.encode('utf-8')
+        for path in re.findall(f'"{base_url}(/p{page}/[^"]+)"', html):
+            pages[path] = article
+    return pages
+
+
+def without_ids(element: Any) -> Any:
+    """Removes the randomly generated ids and the lengths from an article dictionary"""
+    if isinstance(element, dict):
+        return {
+            key: without_ids(value)
+            for key, value in element.items()
+            if key not in ('id_', 'length')
+        }
+    if isinstance(element, list):
+        return [without_ids(value) for value in element]
+    return element
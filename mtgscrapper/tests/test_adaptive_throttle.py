@@ -0,0 +1,157 @@
+"""Tests for the adaptive throttling of the requests"""
+
+import sys
+import json
+import subprocess
+from typing import Any, Dict
+
+import pytest
+from scrapy.core.downloader import Downloader
+from scrapy.exceptions import ScrapyDeprecationWarning
+from scrapy.http import Request
+from scrapy.pqueues import DownloaderAwarePriorityQueue
+from scrapy.utils.misc import load_object
+from scrapy.utils.project import get_project_settings
+from scrapy.utils.test import get_crawler
+
+from mtgscrapper.extensions import ThrottleController
+from mtgscrapper.local_server import StandInServer
+from mtgscrapper.spiders.mtgazone import MTGArenaZoneSpider
+
+NB_PAGES = 12
+
+# Crawls the pages of a stand-in server in a separate process, the reactor cannot be restarted
+CRAWL_SCRIPT = '''
+import sys
+import json
+
+import scrapy
+from scrapy.crawler import CrawlerProcess
+from scrapy.utils.project import get_project_settings
+
+base_url, nb_pages, stats_path = sys.argv[1], int(sys.argv[2]), sys.argv[3]
+
+
+class PagesSpider(scrapy.Spider):
+    name = 'pages'
+
+    async def start(self):
+        for page in range(nb_pages):
+            yield scrapy.Request(f'{base_url}/page-{page}/')
+
+    def parse(self, response):
+        yield {'url': response.url}
+
+
+settings = get_project_settings()
+settings.setdict(
+    {
+        'ROBOTSTXT_OBEY': False,
+        'ITEM_PIPELINES': {},
+        'LOG_LEVEL': 'WARNING',
+        'ADAPTIVE_THROTTLE_DOMAINS': ['127.0.0.1'],
+        'ADAPTIVE_THROTTLE_START_DELAY': 0.2,
+        'ADAPTIVE_THROTTLE_MIN_DELAY': 0.0,
+        'ADAPTIVE_THROTTLE_MAX_DELAY': 0.5,
+        'ADAPTIVE_THROTTLE_TARGET_LATENCY': 0.5,
+        'RETRY_TIMES': 10,
+    },
+    priority='cmdline',
+)
+process = CrawlerProcess(settings)
+crawler = process.create_crawler(PagesSpider)
+process.crawl(crawler)
+process.start()
+
+with open(stats_path, 'w') as stats_file:
+    json.dump(crawler.stats.get_stats(), stats_file, default=str)
+'''
+
+
+def crawl(server: StandInServer, tmp_path: Any) -> Dict[str, Any]:
+    """Crawls the pages of the server, returns the stats of the crawl"""
+    stats_path = str(tmp_path / 'stats.json')
+    subprocess.run(
+        [sys.executable, '-c', CRAWL_SCRIPT, server.url, str(NB_PAGES), stats_path],
+        check=True,
+        timeout=120,
+    )
+    with open(stats_path, 'r') as stats_file:
+        return json.load(stats_file)
+
+
+def test_throttle_controller() -> None:
+    """
+    - speeds up while the responses are fast, within the bounds
+    - slows down on a throttled response, following the Retry-After header
+    - does not speed up again while the error rate is high
+    - slows down when the latency is high"""
+    controller = ThrottleController(
+        start_delay=2.0, min_delay=0.1, max_delay=30.0, max_concurrency=4, target_latency=1.0
+    )
+    assert controller.state() == {'delay': 2.0, 'concurrency': 1, 'latency': 0.0, 'error_rate': 0}
+
+    for _ in range(20):
+        controller.on_response(0.2, throttled=False)
+    assert controller.concurrency == 4
+    assert controller.delay == 0.1
+
+    controller.on_response(0.2, throttled=True)
+    assert controller.concurrency == 2
+    assert controller.delay == 0.2
+
+    controller.on_response(0.2, throttled=True, retry_after=10)
+    assert controller.concurrency == 1
+    assert controller.delay == 10
+
+    controller.on_response(0.2, throttled=False)
+    assert controller.concurrency == 1, 'the error rate is still high.'
+
+    for _ in range(20):
+        controller.on_response(5.0, throttled=False)
+    assert controller.concurrency == 1
+    assert controller.delay == pytest.approx(5.0, rel=0.05), 'one request in flight at a time.'
+
+
+def test_adaptive_throttle_crawl(tmp_path: Any) -> None:
+    """
+    - crawls a fast server and checks that several requests are sent in parallel
+    - crawls a server answering 429 to half of the requests and checks that the crawl slows down
+    - checks the stats exposing the state of the throttling"""
+    pages = {f'/page-{page}/': b'<html><body>page</body></html>' for page in range(NB_PAGES)}
+
+    with StandInServer(pages, latency=0.2) as server:
+        stats = crawl(server, tmp_path)
+    assert stats['item_scraped_count'] == NB_PAGES
+    assert stats['adaptive_throttle/127.0.0.1/responses'] == NB_PAGES
+    assert stats['adaptive_throttle/127.0.0.1/max_concurrency'] > 1
+    assert server.max_in_flight > 1
+
+    with StandInServer(pages, latency=0.05, error_rate=0.5, seed=0) as server:
+        stats = crawl(server, tmp_path)
+    assert stats['item_scraped_count'] == NB_PAGES
+    assert stats['adaptive_throttle/127.0.0.1/throttled'] > 0
+    assert stats['adaptive_throttle/127.0.0.1/max_delay'] > 0.2
+    assert 0 < stats['adaptive_throttle/127.0.0.1/error_rate'] <= 1
+
+
+def test_domain_slots() -> None:
+    """
+    - checks that the default priority queue of Scrapy does not start with per IP slots, which are
+      deprecated
+    - checks that with the project settings the requests of a site share the downloader slot of
+      its domain, the slot throttled by the AdaptiveThrottle extension"""
+    crawler = get_crawler(MTGArenaZoneSpider, {'CONCURRENT_REQUESTS_PER_IP': 16})
+    assert crawler.settings['SCHEDULER_PRIORITY_QUEUE'] == (
+        'scrapy.pqueues.DownloaderAwarePriorityQueue'
+    )
+    with pytest.warns(ScrapyDeprecationWarning), pytest.raises(ValueError):
+        DownloaderAwarePriorityQueue.from_crawler(
+            crawler, load_object(crawler.settings['SCHEDULER_MEMORY_QUEUE']), key=''
+        )
+
+    per_ip = get_project_settings().getint('CONCURRENT_REQUESTS_PER_IP')
+    crawler = get_crawler(MTGArenaZoneSpider, {'CONCURRENT_REQUESTS_PER_IP': per_ip})
+    assert per_ip == 0
+    request = Request('https://mtgazone.com/articles/')
+    assert Downloader(crawler).get_slot_key(request) == 'mtgazone.com'
@@ -0,0 +1,74 @@
+"""Tests for the include and exclude rules of the articles"""
+
+import os
+import json
+from typing import Any
+
+import pytest
+from scrapy.http import Request
+from scrapy.utils.test import get_crawler
+
+from mtgscrapper.article_filter import ArticleFilter, FilterRules
+from mtgscrapper.items import MtgArticle
+from mtgscrapper.spiders.mtgazone import MTGArenaZoneSpider
+from mtgscrapper.tests.helpers import listing_response
+
+
+def test_article_filter() -> None:
+    """
+    - checks each kind of include and exclude rules on an article card
+    - loads the rules of the previous exclude-only format"""
+    article_filter = ArticleFilter(
+        FilterRules(
+            include={'formats': ['explorer'], 'titles': ['Decklist', 'deck guide']},
+            exclude={'tags': ['Premium'], 'authors': ['Spammer']},
+            since='2023-02-01',
+        )
+    )
+    title, tags = 'Explorer Rakdos Sacrifice Deck Guide', ['Explorer', 'Decks']
+    assert article_filter.accepts(title, tags, author='Paul', date='February 12, 2023')
+    assert article_filter.accepts('Rakdos Decklist', ['explorer'], date='February 12, 2023')
+    assert article_filter.rejection(title, tags + ['premium']) == 'exclude_tags'
+    assert article_filter.rejection(title, tags, author=' spammer') == 'exclude_authors'
+    assert article_filter.rejection('Standard Deck Guide', ['Standard']) == 'include_formats'
+    assert article_filter.rejection('Explorer News', tags) == 'include_titles'
+    assert article_filter.rejection(title, tags, date='January 31, 2023') == 'since'
+    assert article_filter.rejection(title, tags, date=None) == 'date'
+    assert article_filter.is_too_old('January 31, 2023')
+    assert not article_filter.is_too_old('February 1, 2023')
+
+    legacy = ArticleFilter(FilterRules.from_json(os.path.join('data', 'args_filter_articles.json')))
+    assert legacy.rejection('Weekly Podcast', []) == 'exclude_titles'
+    assert legacy.rejection('Explorer Deck Guide', ['news']) == 'exclude_tags'
+    assert legacy.accepts('Explorer Deck Guide', ['Explorer'])
+
+    with pytest.raises(ValueError):
+        FilterRules(include={'formats': ['vintage']})
+    with pytest.raises(ValueError):
+        FilterRules(exclude={'colors': ['red']})
+
+
+def test_filtered_crawl(tmp_path: Any) -> None:
+    """
+    - crawls the listing page with rules keeping the recent Historic and Explorer articles
+    - checks the requested articles, the stats of the rejections and the end of the pagination"""
+    rules_path = str(tmp_path / 'rules.json')
+    with open(rules_path, 'w', encoding='utf-8') as json_file:
+        json.dump(
+            {'include': {'formats': ['historic', 'explorer']}, 'since': '2023-02-01'}, json_file
+        )
+
+    crawler = get_crawler(MTGArenaZoneSpider)
+    spider = MTGArenaZoneSpider.from_crawler(crawler, filter_rules=rules_path, parse_article=False)
+    results = list(spider.parse(listing_response()))
+    assert [result.title for result in results if isinstance(result, MtgArticle)] == [
+        'Explorer Rakdos Sacrifice Deck Guide',
+        'Historic BO1 Decklist Tier List',
+    ]
+    assert crawler.stats.get_value('article_filter/include_formats') == 3
+    assert any(isinstance(result, Request) for result in results)
+
+    with open(rules_path, 'w', encoding='utf-8') as json_file:
+        json.dump({'since': '2023-03-01'}, json_file)
+    spider = MTGArenaZoneSpider(filter_rules=rules_path)
+    assert not list(spider.parse(listing_response())), 'older listing pages must not be requested.'
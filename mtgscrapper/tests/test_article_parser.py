@@ -0,0 +1,40 @@
+"""Tests for the single pass parser of the content of an article"""
+
+import re
+
+from scrapy.http import HtmlResponse
+
+from mtgscrapper.spiders.mtgazone import MTGArenaZoneSpider
+from mtgscrapper.tests.helpers import article_response, load_article_dict, without_ids
+
+
+def test_fast_parse_equal() -> None:
+    """
+    - parses the test article page with the XPath selectors and with the single pass parser
+    - compares both articles with the reference article
+    - moves a decklist before the first heading and checks that both parsers still agree"""
+    original_dict = load_article_dict()
+    xpath_article = MTGArenaZoneSpider(fast_parse=False).parse_article_page(*article_response())
+    fast_article = MTGArenaZoneSpider(fast_parse=True).parse_article_page(*article_response())
+    xpath_dict = without_ids(xpath_article.to_dict())
+    assert xpath_dict == without_ids(original_dict)
+    assert without_ids(fast_article.to_dict()) == xpath_dict, 'both parsers must be identical.'
+
+    response, article = article_response()
+    html = re.sub(
+        r'(<div class="entry-content">).*?(<div class="deck-block">)',
+        r'\1\2',
+        response.text,
+        count=1,
+        flags=re.DOTALL,
+    )
+    parsed_dicts = []
+    for fast_parse in (False, True):
+        response = HtmlResponse(url=article.url, body=html, encoding='utf-8')  # type: ignore
+        _, article = article_response()
+        spider = MTGArenaZoneSpider(fast_parse=fast_parse)
+        parsed_dicts.append(without_ids(spider.parse_article_page(response, article).to_dict()))
+
+    first_section = parsed_dicts[0]['content'][0]
+    assert first_section['title'] == '' and first_section['content'][0]['item_type'] == 'decklist'
+    assert parsed_dicts[1] == parsed_dicts[0], 'both parsers must be identical.'
@@ -0,0 +1,26 @@
+"""Tests for the compact representation of the articles"""
+
+import os
+import json
+
+from mtgscrapper.compact_items import CompactArticle
+from mtgscrapper.items import MtgArticle
+from mtgscrapper.tests.test_article_load_equal import deep_equal
+
+
+def test_compact_article_load_equal() -> None:
+    """
+    - loads an article from json into a CompactArticle
+    - dumps it to dict and compares it with the original dict and with MtgArticle.to_dict"""
+    test_filepath = os.path.join('data', 'test_article.json')
+
+    with open(test_filepath, 'r') as json_file:
+        original_dict = json.load(json_file)
+
+    compact_article = CompactArticle.from_dict(original_dict)
+    infered_dict = compact_article.to_dict()
+
+    assert deep_equal(original_dict, infered_dict), 'loaded article must be the same as the source.'
+    assert infered_dict == MtgArticle.from_dict(original_dict).to_dict()
+
+    assert deep_equal(compact_article.to_article().to_dict(), infered_dict)
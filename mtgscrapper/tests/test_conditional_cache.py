@@ -0,0 +1,51 @@
+"""Tests for the ConditionalCacheMiddleware"""
+
+from typing import Any
+
+from scrapy import Spider
+from scrapy.http import HtmlResponse, Request, Response
+from scrapy.utils.test import get_crawler
+
+from mtgscrapper.conditional_cache import ConditionalCacheMiddleware
+
+ARTICLE_URL = 'https://mtgazone.com/the-autonomous-furnace-event-guide-and-decklists/'
+
+
+def test_conditional_cache(tmp_path: Any) -> None:
+    """
+    - stores a response with an ETag
+    - checks that the next request is conditional
+    - checks that a 304 response is replaced by the cached body
+    - evicts the cache"""
+    crawler = get_crawler(
+        Spider,
+        settings_dict={
+            'CONDITIONAL_CACHE_ENABLED': True,
+            'CONDITIONAL_CACHE_DIR': str(tmp_path),
+            'CONDITIONAL_CACHE_MAX_BYTES': 0,
+        },
+    )
+    spider = Spider('test')
+    middleware = ConditionalCacheMiddleware.from_crawler(crawler)
+
+    request = Request(ARTICLE_URL)
+    middleware.process_request(request, spider)
+    assert 'If-None-Match' not in request.headers, 'first request must not be conditional.'
+
+    body = b'<html><body><p>Decklists</p></body></html>'
+    response = HtmlResponse(ARTICLE_URL, body=body, headers={'ETag': '"abc"'})
+    middleware.process_response(request, response, spider)
+
+    request = Request(ARTICLE_URL)
+    middleware.process_request(request, spider)
+    assert request.headers['If-None-Match'] == b'"abc"', 'cached request must be conditional.'
+
+    cached_response = middleware.process_response(
+        request, Response(ARTICLE_URL, status=304), spider
+    )
+    assert cached_response.status == 200
+    assert cached_response.body == body, 'a 304 response must reuse the cached body.'
+    assert isinstance(cached_response, HtmlResponse)
+
+    assert middleware.storage.evict() == 1, 'the cache must be bounded by its maximum size.'
+    assert middleware.storage.load_metadata(request.meta['conditional_cache_key']) is None
@@ -0,0 +1,134 @@
+"""Tests for the content hashes and the deduplication of the articles"""
+
+import copy
+from typing import Any, Iterator, List
+
+import pytest
+from scrapy.exceptions import DropItem
+
+from mtgscrapper.hashing import assign_content_ids, content_hash
+from mtgscrapper.items import MtgArticle, MtgBlock
+from mtgscrapper.item_pipelines import ContentDedupPipeline
+from mtgscrapper.spiders.mtgazone import MTGArenaZoneSpider
+from mtgscrapper.tests.helpers import article_response, load_article_dict, without_ids
+
+
+def test_content_hash() -> None:
+    """
+    - hashes the test article as a dictionary and as a MtgArticle with new ids
+    - checks that the hashes are equal and that an edit of a block changes the hash"""
+    article_dict = load_article_dict()
+
+    hash_, children = content_hash(article_dict)
+    assert len(children) == len(article_dict['content'])
+
+    article = MtgArticle.from_dict(without_ids(article_dict))
+    assert article.content[0].id_ != article_dict['content'][0]['id_']  # type: ignore
+    assert content_hash(article) == (hash_, children)
+
+    article.content[3].content[0].text += ' Edited.'  # type: ignore
+    edited_hash, edited_children = content_hash(article)
+    assert edited_hash != hash_
+    assert [i for i in range(len(children)) if children[i] != edited_children[i]] == [3]
+
+
+def iter_ids(node: Any) -> Iterator[str]:
+    """Yields the ids of the content of an article dictionary, depth first"""
+    for child in node['content']:
+        yield child['id_']
+        if child['item_type'] == 'section':
+            yield from iter_ids(child)
+
+
+def test_content_ids() -> None:
+    """
+    - parses the test article page twice with content ids
+    - checks that the ids are unique, derived from the article id and equal between the two parses
+    - edits a block and checks that only the ids of the block and its parent section change"""
+    article_dict = load_article_dict()
+    spider = MTGArenaZoneSpider(content_ids='true')
+    parsed_dicts = [spider.parse_article_page(*article_response()).to_dict() for _ in range(2)]
+
+    ids = list(iter_ids(parsed_dicts[0]))
+    assert len(set(ids)) == len(ids)
+    assert all(id_.startswith(f'{article_dict["id_"]}/') for id_ in ids)
+    assert list(iter_ids(parsed_dicts[1])) == ids
+    assert without_ids(parsed_dicts[0]) == without_ids(article_dict)
+
+    article = MtgArticle.from_dict(parsed_dicts[0])
+    article.content[3].content[0].text += ' Edited.'  # type: ignore
+    assert assign_content_ids(article) == content_hash(article)
+
+    edited_ids = list(iter_ids(article.to_dict()))
+    assert [i for i, id_ in enumerate(ids) if id_ != edited_ids[i]] == [
+        ids.index(parsed_dicts[0]['content'][3]['id_']),
+        ids.index(parsed_dicts[0]['content'][3]['content'][0]['id_']),
+    ]
+
+
+def test_content_ids_without_uuid(monkeypatch: Any) -> None:
+    """
+    - parses the test article page with content ids, with and without streaming
+    - checks that no uuid4 is generated, and that the other items get one unless told otherwise"""
+    uuids: List[str] = []
+
+    def fake_uuid4() -> str:
+        uuids.append('uuid')
+        return 'uuid'
+
+    monkeypatch.setattr('mtgscrapper.items.uuid4', fake_uuid4)
+    for stream_sections in (False, True):
+        for fast_parse in (False, True):
+            spider = MTGArenaZoneSpider(
+                content_ids=True, fast_parse=fast_parse, stream_sections=stream_sections
+            )
+            assert len(list(spider.parse_article_content(*article_response()))) > 0
+    assert len(uuids) == 0
+
+    assert MtgBlock(date='', text='').id_ == 'uuid'
+    assert MtgBlock(date='', text='', assign_id=False).id_ is None
+
+
+def test_content_dedup_pipeline(tmp_path: Any) -> None:
+    """
+    - processes the test article, then the same article with other ids
+    - checks that the second one is dropped, and that an edited article gets a new version
+    - checks that the same content under another article id is dropped
+    - reloads the index and checks that the known article is still dropped
+    - checks that a kept MtgArticle gets the new fields without being converted"""
+    article_dict = load_article_dict()
+
+    index_path = str(tmp_path / 'hashes.json')
+    spider = MTGArenaZoneSpider()
+    pipeline = ContentDedupPipeline(index_path)
+
+    item = pipeline.process_item(copy.deepcopy(article_dict), spider)
+    assert item['content_version'] == 1
+    assert 'changed_content' not in item
+
+    with pytest.raises(DropItem):
+        pipeline.process_item(MtgArticle.from_dict(without_ids(article_dict)), spider)
+
+    edited_dict = copy.deepcopy(article_dict)
+    edited_dict['content'][3]['content'][0]['text'] += ' Edited.'
+    article = MtgArticle.from_dict(copy.deepcopy(edited_dict))
+    item = pipeline.process_item(edited_dict, spider)
+    assert item['content_version'] == 2
+    assert item['changed_content'] == [3]
+
+    syndicated_dict = copy.deepcopy(edited_dict)
+    syndicated_dict['id_'] = 'post-1'
+    with pytest.raises(DropItem):
+        pipeline.process_item(syndicated_dict, spider)
+
+    pipeline.close_spider(spider)
+
+    pipeline = ContentDedupPipeline(index_path)
+    assert len(pipeline.index) == 1
+    with pytest.raises(DropItem):
+        pipeline.process_item(copy.deepcopy(edited_dict), spider)
+
+    article.content[0].content[0].text += ' Edited.'  # type: ignore[union-attr]
+    assert pipeline.process_item(article, spider) is article
+    assert vars(article)['content_version'] == 3
+    assert vars(article)['changed_content'] == [0]
@@ -0,0 +1,55 @@
+"""Tests for the memory-mapped reader of a JSONL corpus"""
+
+import os
+import copy
+import json
+from typing import Any
+
+from mtgscrapper.corpus_reader import CorpusReader
+from mtgscrapper.items import MtgArticle, MtgSection
+
+
+def test_corpus_reader(tmp_path: Any) -> None:
+    """
+    - writes three versions of the test article to a JSONL file
+    - filters the articles on the index and loads one article with its content built lazily, at each
+      level of its sections
+    - appends an article and checks that only the new line is indexed when the file is reopened"""
+    with open(os.path.join('data', 'test_article.json'), 'r') as json_file:
+        article_dict = json.load(json_file)
+
+    older_dict = copy.deepcopy(article_dict)
+    older_dict.update(id_='older', date='January 2, 2023', formats=['alchemy'], tags=['alchemy'])
+    edited_dict = copy.deepcopy(older_dict)
+    edited_dict['title'] = 'edited title'
+
+    corpus_path = tmp_path / 'articles.jsonl'
+    with open(corpus_path, 'w', encoding='utf-8') as jsonl_file:
+        for item in (older_dict, {'item_type': 'section', 'content': []}, article_dict):
+            jsonl_file.write(json.dumps(item) + '\n')
+
+    with CorpusReader(str(corpus_path)) as reader:
+        assert len(reader) == 2 and reader.nb_indexed_lines == 3
+        assert [entry.id_ for entry in reader.find(format_='standard')] == [article_dict['id_']]
+        assert [entry.id_ for entry in reader.find(tag='alchemy', until='2023-01-31')] == ['older']
+        assert not reader.find(since='2023-03-01')
+
+        article = reader[article_dict['id_']]
+        assert isinstance(list.__getitem__(article.content, 3), dict)
+        assert isinstance(article.content[3], MtgSection)
+        assert isinstance(list.__getitem__(article.content, 3), MtgSection)
+        assert isinstance(list.__getitem__(article.content, 0), dict)
+        assert isinstance(list.__getitem__(article.content[3].content, 1), dict)
+        assert isinstance(article.content[3].content[1], MtgSection)
+        assert article.to_dict() == MtgArticle.from_dict(copy.deepcopy(article_dict)).to_dict()
+
+    with open(corpus_path, 'a', encoding='utf-8') as jsonl_file:
+        jsonl_file.write(json.dumps(edited_dict) + '\n')
+
+    with CorpusReader(str(corpus_path)) as reader:
+        assert len(reader) == 2 and reader.nb_indexed_lines == 1
+        assert reader['older'].title == 'edited title'
+        assert [article.id_ for article in reader.articles()] == [article_dict['id_'], 'older']
+
+    with CorpusReader(str(corpus_path)) as reader:
+        assert reader.nb_indexed_lines == 0
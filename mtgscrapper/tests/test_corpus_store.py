@@ -0,0 +1,56 @@
+"""Tests for the indexed SQLite store of the articles"""
+
+import os
+import json
+from typing import Any
+
+
+from mtgscrapper.corpus_store import CorpusStore
+from mtgscrapper.items import MtgArticle
+from mtgscrapper.item_pipelines import CorpusStorePipeline
+from mtgscrapper.spiders.mtgazone import MTGArenaZoneSpider
+from mtgscrapper.tests.helpers import without_ids
+
+
+def test_corpus_store(tmp_path: Any) -> None:
+    """
+    - stores the test article twice, through the pipeline then directly
+    - queries the articles by format, tag and date
+    - queries the decklists by format, date and card, and the blocks by full-text search
+    - rebuilds the article from the store and compares it with the original"""
+    with open(os.path.join('data', 'test_article.json'), 'r') as json_file:
+        article_dict = json.load(json_file)
+    article = MtgArticle.from_dict(article_dict)
+
+    store_path = str(tmp_path / 'corpus.sqlite')
+    pipeline = CorpusStorePipeline(store_path)
+    spider = MTGArenaZoneSpider()
+    pipeline.open_spider(spider)
+    assert pipeline.process_item(article, spider) is article
+    pipeline.close_spider(spider)
+
+    with CorpusStore(store_path) as store:
+        store.add(article_dict)
+        assert len(store) == 1
+
+        rows = store.find_articles(format_='standard', tag=article.tags[0], since='2023-02-13')
+        assert [(row['id'], row['day']) for row in rows] == [(article.id_, '2023-02-13')]
+        assert not store.find_articles(format_='alchemy')
+        assert not store.find_articles(until='2023-02-12')
+
+        decklists = store.find_decklists(format_='standard', since='2023-01-01', until='2023-03-01')
+        assert len(decklists) > 0
+        assert decklists[0]['title'] == 'Esper Midrange'
+        cards = store.cards(decklists[0]['rowid'])
+        assert cards[0] == (1, 'Kaito Shizuki', False)
+        assert len(store.find_decklists(card='Kaito Shizuki')) == 1
+        assert not store.find_decklists(card='Kaito Shizuki', format_='historic')
+
+        results = store.search('discard AND connive')
+        assert len(results) > 0
+        assert all(result['article_id'] == article.id_ for result in results)
+
+        articles = list(store.hydrate(decklists))
+        assert len(articles) == 1
+        assert without_ids(articles[0].to_dict()) == without_ids(article_dict)
+        assert articles[0].content[0].id_ == article_dict['content'][0]['id_']
@@ -0,0 +1,95 @@
+"""Tests for the detection of the MTG formats"""
+
+import os
+import copy
+import json
+from typing import Any, List
+
+
+from mtgscrapper.items import MtgArticle, MtgSection, Decklist
+from mtgscrapper.mtg_format_enum import MtgFormatEnum
+from mtgscrapper.mtg_format_handler import FormatHandler, FormatMatcher
+from mtgscrapper.tests.helpers import without_ids
+
+
+def test_format_matcher() -> None:
+    """
+    - counts the formats of a text in a single pass
+    - checks that the formats only match whole words
+    - counts the formats of several texts at once, with a title longer once lowercased"""
+    matcher = FormatMatcher()
+
+    text = 'Explorer decks: the Standard staples are Explorer legal. Substandard prehistoric deck.'
+    assert matcher.count(text) == {MtgFormatEnum.EXPLORER: 2, MtgFormatEnum.STANDARD: 1}
+    assert matcher.most_common(text) == MtgFormatEnum.EXPLORER
+    assert matcher.most_common('Standard or Historic?') == MtgFormatEnum.STANDARD
+
+    assert matcher.single('Historic BO1 Decklist Tier List') == MtgFormatEnum.HISTORIC
+    assert matcher.single('Standard to Explorer Upgrade Guide') is None
+    assert matcher.single('A substandard prehistoric title') is None
+
+    # 'İ' is lowercased to two characters, the matches must still be found in the right text
+    texts = ['İSTANBUL İİİİİİİİİ Historic', 'Explorer', 'Standard']
+    assert matcher.count_matrix(texts).tolist() == [
+        [int(format_ == MtgFormatEnum.HISTORIC) for format_ in matcher.formats],
+        [int(format_ == MtgFormatEnum.EXPLORER) for format_ in matcher.formats],
+        [int(format_ == MtgFormatEnum.STANDARD) for format_ in matcher.formats],
+    ]
+
+
+def load_variants() -> List[MtgArticle]:
+    """Returns the test article with various tags, titles and decklist formats"""
+    with open(os.path.join('data', 'test_article.json'), 'r') as json_file:
+        original_dict = json.load(json_file)
+
+    variants = []
+    for tags, title, decklist_format in [
+        (original_dict['tags'], original_dict['title'], 'keep'),
+        ([], original_dict['title'], None),
+        ([], 'A title without format', None),
+        (['Standard', 'Explorer'], 'Standard and Explorer', 'keep'),
+        (['Decks'], 'A title without format', 'Traditional Standard'),
+    ]:
+        article_dict = copy.deepcopy(original_dict)
+        article_dict['tags'], article_dict['title'] = tags, title
+        article = MtgArticle.from_dict(article_dict)
+        reset_formats(article, decklist_format)
+        variants.append(article)
+
+    # Formats only found with search_in_text
+    variants[2].content[0].content[0].text += ' Explorer and Historic decks for Explorer events.'  # type: ignore
+    variants[2].content[1].content[0].text += ' Historic'  # type: ignore
+    return variants  # type: ignore
+
+
+def reset_formats(content: Any, decklist_format: str | None) -> None:
+    """Removes the formats found by the spider, the decklists keep their format if 'keep'"""
+    for child in content:
+        if not isinstance(child, Decklist):
+            child.format_ = None
+        elif decklist_format != 'keep':
+            child.format_ = decklist_format  # type: ignore
+        if isinstance(child, MtgSection):
+            reset_formats(child, decklist_format)
+
+
+def test_process_corpus() -> None:
+    """
+    - processes variants of the test article one by one with process_article
+    - processes the same variants at once with process_corpus, in process and with a process pool
+    - compares the formats found in both cases"""
+    for search_in_text in (False, True):
+        handler = FormatHandler(search_in_text=search_in_text)
+
+        expected = load_variants()
+        for article in expected:
+            handler.process_article(article)
+        expected_dicts = [without_ids(article.to_dict()) for article in expected]
+
+        articles = load_variants()
+        handler.process_corpus(articles)
+        assert [without_ids(article.to_dict()) for article in articles] == expected_dicts
+
+        articles = load_variants()
+        handler.process_corpus(articles, workers=2, chunk_size=4)
+        assert [without_ids(article.to_dict()) for article in articles] == expected_dicts
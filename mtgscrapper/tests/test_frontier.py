@@ -0,0 +1,122 @@
+"""Tests for the distributed crawl, the workers sharing a frontier"""
+
+import json
+import subprocess
+from collections import Counter
+from typing import Any
+
+import pytest
+from scrapy.exceptions import NotConfigured
+from scrapy.utils.project import get_project_settings
+from scrapy.utils.test import get_crawler
+
+from mtgscrapper.frontier import DistributedCrawl, SqliteFrontier
+from mtgscrapper.local_server import StandInServer
+from mtgscrapper.spiders.mtgazone import MTGArenaZoneSpider
+from mtgscrapper.tests.helpers import build_site, spider_command
+
+NB_LISTING_PAGES = 4
+NB_WORKERS = 2
+
+
+def test_sqlite_frontier(tmp_path: Any) -> None:
+    """
+    - queues requests from two connections and checks that a request is only queued once
+    - claims the requests by priority then queuing order from two workers
+    - checks that a retried request is queued again only by the worker claiming it
+    - checks that the claims of a worker without news are queued again"""
+    path = str(tmp_path / 'frontier.sqlite')
+    first, second = SqliteFrontier(path), SqliteFrontier(path)
+
+    assert first.add('a', 0, b'request a')
+    assert first.add('b', 10, b'request b')
+    assert second.add('c', 0, b'request c')
+    assert not second.add('a', 20, b'request a')
+    assert first.nb_pending() == 3 and not first.is_finished()
+
+    assert first.claim('worker 1') == b'request b'
+    assert second.claim('worker 2') == b'request a'
+    assert not first.add('a', 0, b'retried a', worker='worker 1')
+    assert second.add('a', 0, b'retried a', worker='worker 2')
+    assert first.nb_pending() == 2 and first.nb_claimed() == 1
+
+    # With a lease of 0 seconds, the claim of the first worker is queued again
+    expired = SqliteFrontier(path, lease=0.0)
+    assert expired.claim('worker 2') == b'request b'
+    assert first.nb_claimed() == 1
+    assert [first.claim('worker 1'), first.claim('worker 1'), first.claim('worker 1')] == [
+        b'retried a',
+        b'request c',
+        None,
+    ]
+
+    first.release('worker 1')
+    second.release('worker 2')
+    assert first.is_finished()
+    assert not first.add('c', 0, b'request c')
+    for frontier in (first, second, expired):
+        frontier.close()
+
+
+def test_worker_budget() -> None:
+    """
+    - checks that the addon is disabled without frontier
+    - splits the concurrency and the delays of the project settings among the workers"""
+    with pytest.raises(NotConfigured):
+        DistributedCrawl(get_crawler(MTGArenaZoneSpider))
+
+    settings = get_project_settings()
+    settings.setdict({'FRONTIER_URI': 'frontier.sqlite', 'FRONTIER_WORKERS': 4}, priority='cmdline')
+    worker_settings = settings.copy()
+    MTGArenaZoneSpider.update_settings(worker_settings)
+    crawler = get_crawler(MTGArenaZoneSpider, {'FRONTIER_URI': 'frontier.sqlite'})
+    DistributedCrawl(crawler).update_settings(worker_settings)
+
+    assert worker_settings['SCHEDULER'] == 'mtgscrapper.frontier.FrontierScheduler'
+    assert worker_settings.getint('CONCURRENT_REQUESTS') == 4
+    assert worker_settings.getfloat('DOWNLOAD_DELAY') == 4 * settings.getfloat('DOWNLOAD_DELAY')
+    assert worker_settings.getint('ADAPTIVE_THROTTLE_MAX_CONCURRENCY') == 2
+    assert worker_settings.getfloat('ADAPTIVE_THROTTLE_MIN_DELAY') == 1.0
+    assert worker_settings.getdict('DOWNLOAD_SLOTS')['mtgazone.com'] == {'concurrency': 2}
+
+
+def test_distributed_crawl(tmp_path: Any) -> None:
+    """
+    - crawls the stand-in site with two worker processes sharing a SQLite frontier, each one
+      downloading a page at a time
+    - checks that each page is downloaded once and that the workers scraped all the articles"""
+    frontier_uri = f'sqlite:///{tmp_path / "frontier.sqlite"}'
+    with StandInServer({}, latency=0.5) as server:
+        server.pages = build_site(server.url, NB_LISTING_PAGES)
+        workers = [
+            subprocess.Popen(  # pylint: disable=consider-using-with
+                spider_command(
+                    f'{server.url}/articles/',
+                    {
+                        'CONCURRENT_REQUESTS': 2,
+                        'FRONTIER_URI': frontier_uri,
+                        'FRONTIER_WORKERS': NB_WORKERS,
+                    },
+                    str(tmp_path / f'stats_{worker_id}.json'),
+                )
+            )
+            for worker_id in range(NB_WORKERS)
+        ]
+        for worker in workers:
+            assert worker.wait(timeout=120) == 0
+
+    stats = []
+    for worker_id in range(NB_WORKERS):
+        with open(tmp_path / f'stats_{worker_id}.json', 'r') as stats_file:
+            stats.append(json.load(stats_file))
+
+    # The listing pages and their 3 articles accepted by the default filter rules
+    downloads = Counter(request['path'] for request in server.requests)
+    assert len(downloads) == 4 * NB_LISTING_PAGES
+    assert max(downloads.values()) == 1, 'a page must be downloaded by a single worker.'
+    assert sum(stat.get('item_scraped_count', 0) for stat in stats) == 3 * NB_LISTING_PAGES
+    assert sum(stat.get('frontier/claimed', 0) for stat in stats) == len(downloads)
+    assert all(stat.get('frontier/claimed', 0) > 0 for stat in stats)
+    assert server.max_in_flight <= NB_WORKERS, 'each worker must download a page at a time.'
+    assert all(stat['finish_reason'] == 'finished' for stat in stats)
+    assert SqliteFrontier(frontier_uri.removeprefix('sqlite:///')).is_finished()
@@ -0,0 +1,64 @@
+"""Tests for the incremental crawl mode of the MTGArenaZoneSpider"""
+
+import json
+from typing import Any, List
+
+from scrapy.http import Request
+
+from mtgscrapper.items import MtgArticle
+from mtgscrapper.seen_index import SeenArticleIndex
+from mtgscrapper.spiders.mtgazone import MTGArenaZoneSpider
+from mtgscrapper.tests.helpers import listing_response
+
+
+def crawl_listing(spider: MTGArenaZoneSpider) -> List[Any]:
+    """Runs the parse method of the spider on the listing page"""
+    return list(spider.parse(listing_response()))
+
+
+def test_incremental_crawl(tmp_path: Any) -> None:
+    """
+    - crawls a listing page in incremental mode
+    - saves the seen index
+    - crawls the same listing page again and checks that the pagination stops"""
+    index_path = str(tmp_path / 'seen.json')
+
+    spider = MTGArenaZoneSpider(parse_article='false', seen_index=index_path)
+    results = crawl_listing(spider)
+
+    articles = [result for result in results if isinstance(result, MtgArticle)]
+    requests = [result for result in results if isinstance(result, Request)]
+    assert len(articles) == 3, 'forbidden articles must be filtered out.'
+    assert len(requests) == 1, 'the next listing page must be followed on the first crawl.'
+
+    spider.closed('finished')
+    assert len(SeenArticleIndex(index_path)) == 5, 'filtered articles must be marked as seen.'
+
+    spider = MTGArenaZoneSpider(parse_article='false', seen_index=index_path)
+    assert not crawl_listing(spider), 'a known listing page must stop the crawl.'
+
+
+def test_incremental_filtered_crawl(tmp_path: Any) -> None:
+    """
+    - crawls a listing page in incremental mode with include rules
+    - checks that the articles rejected by the include rules are marked as seen
+    - crawls the same listing page again and checks that the pagination stops"""
+    index_path = str(tmp_path / 'seen.json')
+    rules_path = str(tmp_path / 'rules.json')
+    with open(rules_path, 'w', encoding='utf-8') as json_file:
+        json.dump({'include': {'formats': ['historic', 'explorer']}}, json_file)
+
+    spider = MTGArenaZoneSpider(
+        parse_article='false', seen_index=index_path, filter_rules=rules_path
+    )
+    results = crawl_listing(spider)
+    assert len([result for result in results if isinstance(result, MtgArticle)]) == 2
+    assert any(isinstance(result, Request) for result in results)
+
+    spider.closed('finished')
+    assert len(SeenArticleIndex(index_path)) == 5, 'rejected articles must be marked as seen.'
+
+    spider = MTGArenaZoneSpider(
+        parse_article='false', seen_index=index_path, filter_rules=rules_path
+    )
+    assert not crawl_listing(spider), 'a known listing page must stop the crawl.'
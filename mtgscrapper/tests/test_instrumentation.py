@@ -0,0 +1,118 @@
+"""Tests for the timing of the stages of the spider"""
+
+import os
+import json
+import pstats
+import subprocess
+from typing import Any
+
+from scrapy.http import Request
+from scrapy.utils.test import get_crawler
+
+from mtgscrapper.extensions import Instrumentation
+from mtgscrapper.instrumentation import SlowestProfiles
+from mtgscrapper.local_server import StandInServer
+from mtgscrapper.settings import INSTRUMENTATION_STAGES  # type: ignore[attr-defined]
+from mtgscrapper.spiders.mtgazone import MTGArenaZoneSpider
+from mtgscrapper.tests.helpers import (
+    article_response,
+    build_site,
+    listing_response,
+    spider_command,
+)
+
+NB_LISTING_PAGES = 2
+
+
+def test_instrumentation(tmp_path: Any) -> None:
+    """
+    - instruments the spider through the extension, with the profiling of the slowest article
+    - parses a listing page and two article pages
+    - checks the stats of the stages, the JSON snapshot and the profile"""
+    dump_path = str(tmp_path / 'instrumentation.jsonl')
+    profile_dir = str(tmp_path / 'profiles')
+    crawler = get_crawler(
+        MTGArenaZoneSpider,
+        {
+            'INSTRUMENTATION_ENABLED': True,
+            'INSTRUMENTATION_STAGES': INSTRUMENTATION_STAGES,
+            'INSTRUMENTATION_DUMP_PATH': dump_path,
+            'INSTRUMENTATION_DUMP_INTERVAL': 0,
+            'INSTRUMENTATION_PROFILE_SLOWEST': 1,
+            'INSTRUMENTATION_PROFILE_DIR': profile_dir,
+        },
+    )
+    spider = MTGArenaZoneSpider(fast_parse='false')
+    extension = Instrumentation.from_crawler(crawler)
+    extension.spider_opened(spider)
+    # The crawler has no engine outside of a crawl
+    extension.queue_depth = lambda: 3  # type: ignore[method-assign]
+
+    requests = list(spider.parse(listing_response()))
+    assert requests[0].callback.__self__ is spider
+    assert requests[0].callback.__name__ == 'parse_article_content'
+
+    for _ in range(2):
+        response, article = article_response()
+        [parsed_article] = spider.parse_article_content(response, article=article)
+        assert parsed_article.formats == ['standard']
+        extension.response_downloaded(response, Request(response.url), spider)
+    extension.spider_closed(spider, 'finished')
+
+    stats = crawler.stats.get_stats()
+    assert stats['instrumentation/parse/calls'] == 1
+    assert stats['instrumentation/parse/wall_time'] > 0
+    assert stats['instrumentation/parse_article_content/calls'] == 2
+    assert stats['instrumentation/process_article/calls'] == 2
+    assert stats['instrumentation/add_package_content/calls'] == 2
+    assert stats['instrumentation/parse_decklist/calls'] > 0
+    assert (
+        stats['instrumentation/parse_article_content/cpu_time']
+        >= stats['instrumentation/process_article/cpu_time']
+    )
+    assert stats['instrumentation/bytes_downloaded'] == 2 * len(response.body)
+    assert stats['instrumentation/max_queue_depth'] == 3
+
+    with open(dump_path, 'r') as dump_file:
+        snapshots = [json.loads(line) for line in dump_file]
+    assert snapshots[-1]['instrumentation/parse_article_content/calls'] == 2
+
+    profiles = os.listdir(profile_dir)
+    assert profiles == [f'001-{article.id_}.prof']
+    profile = pstats.Stats(os.path.join(profile_dir, profiles[0])).get_stats_profile()
+    assert len(profile.func_profiles) > 0
+
+
+def test_instrumented_crawl(tmp_path: Any) -> None:
+    """
+    - crawls the stand-in site with the instrumentation and the default single pass parser
+    - checks the timing of the callbacks and of the decklists, and the measures of the engine"""
+    stats_path = str(tmp_path / 'stats.json')
+    with StandInServer({}) as server:
+        server.pages = build_site(server.url, NB_LISTING_PAGES)
+        subprocess.run(
+            spider_command(
+                f'{server.url}/articles/', {'INSTRUMENTATION_ENABLED': True}, stats_path
+            ),
+            check=True,
+            timeout=120,
+        )
+    with open(stats_path, 'r') as stats_file:
+        stats = json.load(stats_file)
+
+    # The listing pages and their 3 articles accepted by the default filter rules
+    assert stats['instrumentation/parse/calls'] == NB_LISTING_PAGES
+    assert stats['instrumentation/parse_article_content/calls'] == 3 * NB_LISTING_PAGES
+    assert stats['instrumentation/parse_decklist/calls'] > 0, 'the fast parser must be timed.'
+    assert stats['instrumentation/bytes_downloaded'] > 0
+    assert 0 <= stats['instrumentation/max_queue_depth'] < len(server.pages)
+
+
+def test_slowest_profiles() -> None:
+    """
+    - profiles calls of increasing durations
+    - checks that only the slowest ones are kept"""
+    profiles = SlowestProfiles(2)
+    for i in range(5):
+        profiles.call(f'call-{i}', sum, range(10000 * 2**i))
+    assert [key for key, _ in profiles.slowest()] == ['call-4', 'call-3']
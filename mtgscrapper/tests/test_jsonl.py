@@ -0,0 +1,56 @@
+"""Tests for the JsonLinesWriter"""
+
+import os
+import gzip
+import json
+from typing import Any
+
+import pytest
+
+from mtgscrapper.items import MtgArticle
+from mtgscrapper.jsonl import JsonLinesWriter
+from mtgscrapper.serialization import dumps_item
+from mtgscrapper.tests.helpers import load_article_dict
+
+
+def test_jsonl_rotation(tmp_path: Any) -> None:
+    """
+    - writes items to gzip compressed files of at most 2 items
+    - checks that the files are complete and contain all the items in order"""
+    items = [{'id_': f'post-{i}', 'title': f'Explorer Deck Guide {i}'} for i in range(5)]
+
+    with JsonLinesWriter(str(tmp_path), prefix='mtgazone', max_items=2) as writer:
+        for item in items:
+            writer.write(item)
+
+    assert len(writer.paths) == 3
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(path) for path in writer.paths)
+
+    loaded_items = []
+    for path in writer.paths:
+        with gzip.open(path, 'rt', encoding='utf-8') as jsonl_file:
+            loaded_items += [json.loads(line) for line in jsonl_file]
+    assert loaded_items == items
+
+
+@pytest.mark.parametrize('stream_items', [False, True])
+def test_jsonl_items(tmp_path: Any, stream_items: bool) -> None:
+    """
+    - writes articles, serialized or streamed to the file, and dictionaries to uncompressed files
+    - checks the lines and the uncompressed size used to rotate the files"""
+    article = MtgArticle.from_dict(load_article_dict())  # type: ignore
+    article_line = dumps_item(article) + '\n'
+
+    with JsonLinesWriter(
+        str(tmp_path), compression=None, max_bytes=len(article_line), stream_items=stream_items
+    ) as writer:
+        writer.write({'id_': 'post-1'})
+        assert writer.nb_bytes == len('{"id_":"post-1"}\n')
+        writer.write(article)
+        writer.write(article)
+
+    assert len(writer.paths) == 2
+    with open(writer.paths[0], 'r', encoding='utf-8') as jsonl_file:
+        assert jsonl_file.readlines() == ['{"id_":"post-1"}\n', article_line]
+    with open(writer.paths[1], 'r', encoding='utf-8') as jsonl_file:
+        assert jsonl_file.read() == article_line
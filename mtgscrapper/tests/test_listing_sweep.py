@@ -0,0 +1,65 @@
+"""Tests for the listing sweep mode of the MTGArenaZoneSpider"""
+
+import json
+from typing import Any
+
+from scrapy.crawler import Crawler
+from scrapy.http import HtmlResponse, Request
+
+from mtgscrapper.items import MtgArticle
+from mtgscrapper.item_pipelines import JsonLinesExportPipeline
+from mtgscrapper.spiders.mtgazone import MTGArenaZoneSpider
+from mtgscrapper.tests.helpers import listing_response
+
+
+def test_listing_sweep(tmp_path: Any) -> None:
+    """
+    - parses the first listing page in sweep mode
+    - checks that all the listing pages are requested at once
+    - parses a later listing page and checks that no page is requested again
+    - exports the articles in reverse order and checks that they are written by date"""
+    spider = MTGArenaZoneSpider(parse_article='false', sweep_listing='true')
+    results = list(spider.parse(listing_response()))
+
+    articles = [result for result in results if isinstance(result, MtgArticle)]
+    requests = [result for result in results if isinstance(result, Request)]
+    assert len(articles) == 3
+    assert [request.url for request in requests] == [
+        f'https://mtgazone.com/articles/page/{page}/' for page in range(2, 524)
+    ]
+    assert requests[-1].cb_kwargs == {'listing_page': 523}
+
+    later_page = HtmlResponse(url=requests[0].url, body=listing_response().body, encoding='utf-8')
+    later_results = list(spider.parse(later_page, **requests[0].cb_kwargs))
+    assert not any(isinstance(result, Request) for result in later_results)
+
+    pipeline = JsonLinesExportPipeline(str(tmp_path), compression=None, sort_by_date=True)
+    pipeline.open_spider(spider)
+    for article in reversed(articles):
+        pipeline.process_item(article, spider)
+    pipeline.close_spider(spider)
+
+    assert pipeline.writer is not None and len(pipeline.writer.paths) == 1
+    with open(pipeline.writer.paths[0], 'r', encoding='utf-8') as jsonl_file:
+        written_ids = [json.loads(line)['id_'] for line in jsonl_file]
+    assert written_ids == [article.id_ for article in articles]
+
+
+def test_sweep_sorts_by_date() -> None:
+    """
+    - creates a spider sweeping the article metadata and checks that the export is sorted by date
+    - checks that a sweep of the full articles or a command line setting leaves the export as is"""
+    for spider_kwargs, settings, sort_by_date in [
+        ({'parse_article': 'false', 'sweep_listing': 'true'}, {}, True),
+        ({'sweep_listing': 'true'}, {}, False),
+        ({'parse_article': 'false'}, {}, False),
+        (
+            {'parse_article': 'false', 'sweep_listing': 'true'},
+            {'JSONL_EXPORT_SORT_BY_DATE': False},
+            False,
+        ),
+    ]:
+        crawler = Crawler(MTGArenaZoneSpider)
+        crawler.settings.setdict(settings, priority='cmdline')
+        MTGArenaZoneSpider.from_crawler(crawler, **spider_kwargs)
+        assert crawler.settings.getbool('JSONL_EXPORT_SORT_BY_DATE') == sort_by_date
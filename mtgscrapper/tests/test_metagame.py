@@ -0,0 +1,111 @@
+"""Tests for the metagame statistics of the decklists"""
+
+import os
+import json
+import random
+from typing import Dict, List
+
+import pytest
+
+from mtgscrapper.items import Decklist
+from mtgscrapper.metagame import DeckMatrix
+from mtgscrapper.mtg_format_enum import MtgFormatEnum
+
+CARDS = [f'Card {i}' for i in range(40)]
+ARCHETYPES = ['Esper Midrange', 'Mono Red Aggro', 'Azorius Control']
+DATES = ['January 30, 2023', 'February 6, 2023', 'February 13, 2023']
+
+
+def random_decklists(rng: random.Random, nb_decklists: int) -> List[Decklist]:
+    """Creates decklists of random cards, formats, archetypes and dates"""
+    return [
+        Decklist(
+            title=rng.choice(ARCHETYPES),
+            date=rng.choice(DATES),
+            format_=rng.choice([MtgFormatEnum.STANDARD, MtgFormatEnum.EXPLORER]),
+            deck=[(str(rng.randint(1, 4)), card) for card in rng.sample(CARDS, 12)],
+            sideboard=[(str(rng.randint(1, 2)), card) for card in rng.sample(CARDS, 4)],
+        )
+        for _ in range(nb_decklists)
+    ]
+
+
+def expected_card_stats(decklists: List[Decklist]) -> Dict[str, tuple]:
+    """Computes the inclusion rate and average copies of the main deck cards in Python"""
+    copies: Dict[str, List[int]] = {}
+    for decklist in decklists:
+        for quantity, card in decklist.deck:
+            copies.setdefault(card, []).append(int(quantity))
+    return {
+        card: (len(card_copies) / len(decklists), sum(card_copies) / len(card_copies))
+        for card, card_copies in copies.items()
+    }
+
+
+def test_deck_matrix() -> None:
+    """
+    - adds random decklists in two batches
+    - compares the card statistics and archetype shares of a format and date window with a scan
+      of the decklists, after each batch
+    - adds the decklists of the test article"""
+    rng = random.Random(0)
+    metagame = DeckMatrix()
+    decklists: List[Decklist] = []
+
+    for _ in range(2):
+        batch = random_decklists(rng, 200)
+        metagame.extend(batch)
+        decklists += batch
+        assert len(metagame) == len(decklists)
+
+        selected = [
+            decklist
+            for decklist in decklists
+            if decklist.format_ == 'explorer' and decklist.date != 'January 30, 2023'
+        ]
+        card_stats = metagame.card_stats(format_='explorer', since='2023-02-01')
+        expected = expected_card_stats(selected)
+        assert {card: (rate, copies) for card, rate, copies in card_stats} == pytest.approx(
+            expected
+        )
+        rates = [rate for _, rate, _ in card_stats]
+        assert rates == sorted(rates, reverse=True)
+
+        shares = metagame.archetype_shares(format_='explorer', since='2023-02-01')
+        assert shares == pytest.approx(
+            {
+                archetype: sum(decklist.title == archetype for decklist in selected) / len(selected)
+                for archetype in {decklist.title for decklist in selected}
+            }
+        )
+
+    all_cards = metagame.card_stats(include_sideboard=True)
+    assert all(rate <= 1 for _, rate, _ in all_cards)
+    assert metagame.card_stats(format_='historic') == []
+
+    with open(os.path.join('data', 'test_article.json'), 'r') as json_file:
+        article_dict = json.load(json_file)
+    nb_decklists = metagame.add_article(article_dict)
+    assert nb_decklists > 0
+    assert len(metagame) == len(decklists) + nb_decklists
+
+    shares = metagame.archetype_shares(since='2023-02-13', until='2023-02-13', format_='standard')
+    assert 'Esper Midrange' in shares
+
+
+def test_deck_matrix_bad_date() -> None:
+    """
+    - adds decklists with a malformed date, an impossible date and no date
+    - checks that they are added with no day, and that all the arrays have one row per decklist"""
+    metagame = DeckMatrix()
+    decklists = random_decklists(random.Random(0), 4)
+    decklists[0].date = 'Feb 13th 2023'
+    decklists[1].date = '2023-02-30'
+    metagame.extend(decklists[:2])
+    metagame.add(vars(decklists[2]) | {'date': None})
+    metagame.add(decklists[3], date='February 13, 2023')
+
+    assert len(metagame) == 4
+    assert metagame.deck_archetypes.size == metagame.deck_days.size == 4
+    assert [str(day) for day in metagame.deck_days.values] == ['NaT', 'NaT', 'NaT', '2023-02-13']
+    assert len(metagame.card_stats(since='2023-01-01')) > 0
@@ -0,0 +1,46 @@
+"""Tests for the parsing of the articles in a pool of worker processes"""
+
+import asyncio
+from typing import Any
+
+from scrapy.http import Request
+
+from mtgscrapper.seen_index import SeenArticleIndex
+from mtgscrapper.spiders.mtgazone import MTGArenaZoneSpider
+from mtgscrapper.tests.helpers import article_response, listing_response
+
+
+def test_parse_workers(tmp_path: Any) -> None:
+    """
+    - checks that the article requests use the offloaded callback when the spider has workers
+    - parses the test article page inline and in two worker processes, with content ids
+    - compares both articles and checks that the article is marked as seen"""
+    requests = [
+        result
+        for result in MTGArenaZoneSpider(parse_workers='2').parse(listing_response())
+        if isinstance(result, Request) and result.cb_kwargs
+    ]
+    assert requests[0].callback.__name__ == 'parse_article_content_offloaded'  # type: ignore
+
+    inline_article = MTGArenaZoneSpider(content_ids=True).parse_article_page(*article_response())
+
+    index_path = str(tmp_path / 'seen.json')
+    spider = MTGArenaZoneSpider(content_ids=True, parse_workers=2, seen_index=index_path)
+
+    async def parse_twice() -> Any:
+        return await asyncio.gather(
+            *[spider.parse_article_content_offloaded(*article_response()) for _ in range(2)]
+        )
+
+    try:
+        offloaded_results = asyncio.run(parse_twice())
+    finally:
+        spider.closed('finished')
+
+    inline_dict = inline_article.to_dict()
+    assert [[article.to_dict() for article in result] for result in offloaded_results] == [
+        [inline_dict],
+        [inline_dict],
+    ]
+    assert spider.parse_pool is None
+    assert inline_dict['id_'] in SeenArticleIndex(index_path)
@@ -0,0 +1,99 @@
+"""Tests for the priority of the requests and the persistence of the scheduler queues"""
+
+from datetime import date as Date
+from typing import Any, Dict, List
+
+import pytest
+from scrapy.core.engine import ExecutionEngine
+from scrapy.core.scheduler import Scheduler
+from scrapy.http import Request
+from scrapy.utils.test import get_crawler
+
+from mtgscrapper.priority import RECENCY_DAYS, article_priority
+from mtgscrapper.spiders.mtgazone import MTGArenaZoneSpider
+from mtgscrapper.tests.helpers import listing_response
+
+
+def test_article_priority() -> None:
+    """
+    - checks that the recent articles, the format tags and the title signals come first
+    - checks the priorities of the article requests of the listing page"""
+    today = Date(2023, 2, 13)
+    fresh = article_priority('Standard Tier List', ['standard'], 'February 13, 2023', today)
+    older = article_priority('Standard Tier List', ['standard'], 'January 14, 2023', today)
+    untagged = article_priority('Standard Tier List', ['news'], 'February 13, 2023', today)
+    plain = article_priority('Weekly News', ['news'], 'February 13, 2023', today)
+    assert fresh > older > article_priority('Standard Tier List', ['standard'], None, today)
+    assert fresh > untagged > plain == RECENCY_DAYS
+
+    spider = MTGArenaZoneSpider()
+    spider.today = today
+    requests = [
+        result for result in spider.parse(listing_response()) if isinstance(result, Request)
+    ]
+    articles = [request.cb_kwargs['article'] for request in requests if request.cb_kwargs]
+    assert len(articles) == 3
+    for request in requests[:3]:
+        article = request.cb_kwargs['article']
+        assert request.priority == article_priority(
+            article.title, article.tags, article.date, today
+        )
+
+    assert all(
+        request.priority == 0
+        for request in MTGArenaZoneSpider(prioritize=False).parse(listing_response())
+        if isinstance(request, Request)
+    )
+
+
+def open_crawler(settings: Dict[str, Any]) -> Any:
+    """Returns a crawler with its spider and its engine, both set by the crawl
+
+    The disk queues find the callbacks of the requests on the spider, and the default
+    DownloaderAwarePriorityQueue the slots of the requests on the downloader of the engine.
+    """
+    crawler = get_crawler(MTGArenaZoneSpider, settings)
+    crawler.spider = MTGArenaZoneSpider.from_crawler(crawler)
+    crawler.engine = ExecutionEngine(crawler, lambda _: None)
+    return crawler
+
+
+@pytest.mark.parametrize(
+    'priority_queue',
+    ['scrapy.pqueues.ScrapyPriorityQueue', 'scrapy.pqueues.DownloaderAwarePriorityQueue'],
+)
+def test_resume_crawl(tmp_path: Any, priority_queue: str) -> None:
+    """
+    - queues the requests of the listing page in a scheduler persisted in a job directory
+    - closes the scheduler and opens another one on the same directory
+    - dequeues the article requests by priority, and checks that a seen request is not queued"""
+    settings = {'JOBDIR': str(tmp_path / 'job'), 'SCHEDULER_PRIORITY_QUEUE': priority_queue}
+    crawler = open_crawler(settings)
+    spider = crawler.spider
+    spider.today = Date(2023, 2, 13)
+    requests = [
+        result for result in spider.parse(listing_response()) if isinstance(result, Request)
+    ]
+
+    scheduler = Scheduler.from_crawler(crawler)
+    scheduler.open(spider)
+    for request in requests:
+        assert scheduler.enqueue_request(request)
+    scheduler.close('shutdown')
+    assert crawler.stats.get_value('scheduler/enqueued/disk') == len(requests)
+
+    resumed_crawler = open_crawler(settings)
+    resumed_spider = resumed_crawler.spider
+    resumed = Scheduler.from_crawler(resumed_crawler)
+    resumed.open(resumed_spider)
+    assert len(resumed) == len(requests)
+
+    dequeued: List[Any] = [resumed.next_request() for _ in requests]
+    assert all(isinstance(request, Request) for request in dequeued)
+    by_priority = sorted(requests, key=lambda request: -request.priority)
+    assert [request.url for request in dequeued] == [request.url for request in by_priority]
+    assert dequeued[0].callback.__name__ == 'parse_article_content'
+    assert dequeued[0].callback.__self__ is resumed_spider
+    assert vars(dequeued[0].cb_kwargs['article']) == vars(by_priority[0].cb_kwargs['article'])
+    assert not resumed.enqueue_request(requests[0].replace())
+    resumed.close('finished')
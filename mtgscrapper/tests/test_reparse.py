@@ -0,0 +1,46 @@
+"""Tests for the offline re-parsing of a corpus of article pages"""
+
+import os
+import json
+import shutil
+import tarfile
+from typing import Any
+
+from mtgscrapper.reparse import reparse
+from mtgscrapper.tests.helpers import without_ids
+
+
+def test_reparse(tmp_path: Any) -> None:
+    """
+    - builds a corpus archive from the test article page and its metadata, and two malformed pages
+    - parses the corpus with a process pool and checks that only the malformed pages fail
+    - compares the parsed article with the reference article"""
+    with open(os.path.join('data', 'test_article.json'), 'r') as json_file:
+        original_dict = json.load(json_file)
+
+    corpus_dir = tmp_path / 'corpus'
+    corpus_dir.mkdir()
+    metadata = {
+        key: original_dict[key] for key in ('id_', 'title', 'date', 'url', 'tags', 'author')
+    }
+    (corpus_dir / 'post-172366.json').write_text(json.dumps(metadata))
+    shutil.copy(os.path.join('data', 'test_article.html'), corpus_dir / 'post-172366.html')
+    # Malformed pages, the errors of their metadata only fail their own article
+    for name, broken in (('no-title', {'title': None}), ('no-url', {'url': None})):
+        (corpus_dir / f'{name}.json').write_text(json.dumps({**metadata, **broken}))
+        shutil.copy(os.path.join('data', 'test_article.html'), corpus_dir / f'{name}.html')
+
+    archive_path = str(tmp_path / 'corpus.tar.gz')
+    with tarfile.open(archive_path, 'w:gz') as archive:
+        archive.add(str(corpus_dir), arcname='corpus')
+
+    output_path = str(tmp_path / 'articles.jsonl')
+    assert reparse(archive_path, output_path, workers=2) == (1, 2)
+
+    with open(output_path, 'r') as jsonl_file:
+        lines = jsonl_file.readlines()
+    assert len(lines) == 1
+
+    parsed_dict = json.loads(lines[0])
+    assert parsed_dict['id_'] == original_dict['id_']
+    assert without_ids(parsed_dict) == without_ids(original_dict)
@@ -0,0 +1,57 @@
+"""Tests for the nesting of the sections of an article"""
+
+import random
+from typing import Any, List
+
+from mtgscrapper.items import MtgArticle, MtgBlock, MtgSection, SectionTreeBuilder
+
+
+def random_sections(rng: random.Random, nb_headings: int) -> List[MtgSection]:
+    """Creates a flat list of sections of random levels, some of them with blocks"""
+    sections = [MtgSection(date='', title='', level=int(1e4))]
+    for i in range(nb_headings):
+        sections.append(MtgSection(date='', title=f'heading {i}', level=rng.randint(1, 6)))
+    for section in sections:
+        for j in range(rng.randint(0, 2)):
+            section.content.append(MtgBlock(date='', text=f'{section.title} block {j}'))
+    return sections
+
+
+def nest_with_section_add(sections: List[MtgSection], article: MtgArticle) -> None:
+    """Reference nesting, adds each section to the last top-level section with MtgSection.add"""
+    previous_section = sections[0]
+    for section in sections[1:]:
+        if section.level <= previous_section.level:
+            article.add(previous_section)
+            previous_section = section
+        else:
+            previous_section.add(section)
+    article.add(previous_section)
+
+
+def without_content_ids(element: Any) -> Any:
+    """Removes the random ids from an article dictionary, unlike without_ids the lengths are kept"""
+    if isinstance(element, dict):
+        return {key: without_content_ids(value) for key, value in element.items() if key != 'id_'}
+    if isinstance(element, list):
+        return [without_content_ids(value) for value in element]
+    return element
+
+
+def test_section_tree_builder() -> None:
+    """
+    - nests random lists of sections with the builder and with MtgSection.add
+    - compares the trees, lengths included"""
+    rng = random.Random(0)
+    for nb_headings in [0, 1, 2, 5, 20, 200]:
+        for _ in range(10):
+            seed = rng.random()
+            reference = MtgArticle(date='', title='', url='', tags=[], author='')
+            nest_with_section_add(random_sections(random.Random(seed), nb_headings), reference)
+
+            article = MtgArticle(date='', title='', url='', tags=[], author='')
+            SectionTreeBuilder(article).extend(random_sections(random.Random(seed), nb_headings))
+
+            assert without_content_ids(article.to_dict()) == without_content_ids(
+                reference.to_dict()
+            )
@@ -0,0 +1,33 @@
+"""Tests for the streaming serialization of the articles"""
+
+import io
+import os
+import json
+
+from mtgscrapper.items import MtgArticle
+from mtgscrapper.mtg_format_handler import FormatHandler
+from mtgscrapper.serialization import dump_item, dumps_item, loads_article
+from mtgscrapper.tests.test_article_load_equal import deep_equal
+
+
+def test_streaming_serialization() -> None:
+    """
+    - checks that to_dict does not modify the article, which can be processed again
+    - compares the streamed JSON and the JSON of dumps_item with the JSON of to_dict
+    - loads the streamed JSON and compares it with the original article"""
+    with open(os.path.join('data', 'test_article.json'), 'r') as json_file:
+        original_dict = json.load(json_file)
+
+    mtg_article = MtgArticle.from_dict(original_dict)  # type: ignore
+    first_dict = mtg_article.to_dict()
+    FormatHandler().process_article(mtg_article)  # type: ignore
+    assert first_dict == mtg_article.to_dict(), 'to_dict must not modify the article.'
+
+    json_string = dumps_item(mtg_article)
+    assert json_string == json.dumps(first_dict, separators=(',', ':'), ensure_ascii=False)
+    stream = io.StringIO()
+    dump_item(mtg_article, stream)
+    assert stream.getvalue() == json_string
+
+    loaded_article = loads_article(json_string)
+    assert deep_equal(original_dict, loaded_article.to_dict())
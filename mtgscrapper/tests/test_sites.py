@@ -0,0 +1,73 @@
+"""Tests for the site configurations and the base site spider"""
+
+import dataclasses
+from typing import Any
+
+from scrapy.http import HtmlResponse
+from scrapy.settings import Settings
+
+from mtgscrapper.crawl_sites import crawler_settings
+from mtgscrapper.items import MtgArticle
+from mtgscrapper.sites import MTGAZONE, compile_site
+from mtgscrapper.spiders.mtgazone import MTGArenaZoneSpider
+from mtgscrapper.spiders.site_spider import SiteSpider
+from mtgscrapper.tests.helpers import listing_response
+
+# The MTGAZone listing page with renamed classes, to check that the spiders follow their config
+RENAMED_SITE = dataclasses.replace(
+    MTGAZONE,
+    domain='renamed.example',
+    concurrency=None,
+    article_cards='//article[contains(@class, "renamed-card")]',
+    article_title='./h2[@class="renamed-title"]/a/text()',
+    article_url='./h2[@class="renamed-title"]/a/@href',
+)
+
+
+class RenamedSpider(SiteSpider):
+    """Spider of the renamed listing page"""
+
+    name = 'renamed'
+    site = RENAMED_SITE
+    start_urls = ['https://renamed.example/articles/']
+
+
+def test_site_config() -> None:
+    """
+    - compiles the MTGAZone config once for all the spiders
+    - parses the listing page with another config and renamed classes
+    - checks the concurrency of the domains and the share of the requests of each site"""
+    assert compile_site(MTGAZONE) is MTGArenaZoneSpider().selectors
+    assert MTGArenaZoneSpider().selectors is MTGArenaZoneSpider().selectors
+
+    mtgazone_articles = [
+        result
+        for result in MTGArenaZoneSpider(parse_article=False).parse(listing_response())
+        if isinstance(result, MtgArticle)
+    ]
+    body = (
+        listing_response()
+        .body.replace(b'entry-card post', b'renamed-card post')
+        .replace(b'"entry-title"', b'"renamed-title"')
+    )
+    response: Any = HtmlResponse(url=RenamedSpider.start_urls[0], body=body, encoding='utf-8')
+    renamed_articles = [
+        result
+        for result in RenamedSpider(parse_article=False).parse(response)
+        if isinstance(result, MtgArticle)
+    ]
+    assert len(renamed_articles) == 3
+    assert [vars(article) for article in renamed_articles] == [
+        vars(article) for article in mtgazone_articles
+    ]
+    assert not any(
+        isinstance(result, MtgArticle)
+        for result in MTGArenaZoneSpider(parse_article=False).parse(response)
+    )
+
+    settings = Settings({'CONCURRENT_REQUESTS': 16})
+    MTGArenaZoneSpider.update_settings(settings)
+    RenamedSpider.update_settings(settings)
+    assert settings.getdict('DOWNLOAD_SLOTS') == {'mtgazone.com': {'concurrency': 8}}
+    assert crawler_settings(settings, 3).getint('CONCURRENT_REQUESTS') == 5
+    assert settings.getint('CONCURRENT_REQUESTS') == 16
@@ -0,0 +1,66 @@
+"""Tests for the streaming of the sections and decklists of an article"""
+
+import json
+import random
+from typing import Any, Dict, List
+
+import pytest
+from scrapy.utils.test import get_crawler
+
+from mtgscrapper.corpus_reader import CorpusReader
+from mtgscrapper.spiders.mtgazone import MTGArenaZoneSpider
+from mtgscrapper.streaming import assemble_article
+from mtgscrapper.tests.helpers import article_response
+
+
+def parse_test_article(**spider_kwargs: Any) -> Any:
+    """Parses the test article page with a spider created with the given arguments"""
+    response, article = article_response()
+    return MTGArenaZoneSpider(**spider_kwargs).parse_article_content(response, article)
+
+
+def test_stream_sections() -> None:
+    """
+    - parses the test article page with and without streaming, with content ids
+    - checks the links of the section and decklist items to their article and parents
+    - assembles the streamed items in a random order and compares with the whole article"""
+    for fast_parse in (False, True):
+        [article] = parse_test_article(fast_parse=fast_parse, content_ids=True)
+        article_dict = article.to_dict()
+        items: List[Dict] = list(
+            parse_test_article(fast_parse=fast_parse, content_ids=True, stream_sections=True)
+        )
+
+        assert items[-1]['item_type'] == 'article' and items[-1]['content'] == []
+        assert items[-1]['nb_sections'] == len(article_dict['content'])
+        assert items[-1]['formats'] == article_dict['formats']
+
+        sections = [item for item in items if item['item_type'] == 'section']
+        decklists = [item for item in items if item['item_type'] == 'decklist']
+        assert [section['position'] for section in sections] == list(range(len(sections)))
+        assert len(decklists) > 0
+        for item in sections + decklists:
+            assert item['article_id'] == article_dict['id_']
+        for decklist in decklists:
+            assert decklist['parent_id'].startswith(f'{article_dict["id_"]}/')
+
+        random.Random(0).shuffle(items)
+        assert assemble_article(items) == article_dict
+
+
+def test_stream_unsupported(tmp_path: Any) -> None:
+    """
+    - checks that the spider does not stream the sections to the content dedup or the store
+    - checks that the corpus reader refuses the streamed items"""
+    for setting in ('CONTENT_HASH_INDEX', 'CORPUS_STORE_PATH'):
+        crawler = get_crawler(MTGArenaZoneSpider, {setting: str(tmp_path / 'index')})
+        with pytest.raises(ValueError, match=setting):
+            MTGArenaZoneSpider.from_crawler(crawler, stream_sections='true')
+        assert MTGArenaZoneSpider.from_crawler(crawler).stream_sections is False
+
+    corpus_path = tmp_path / 'articles.jsonl'
+    with open(corpus_path, 'w', encoding='utf-8') as jsonl_file:
+        for item in parse_test_article(stream_sections=True):
+            jsonl_file.write(json.dumps(item) + '\n')
+    with pytest.raises(ValueError, match='streamed'):
+        CorpusReader(str(corpus_path))